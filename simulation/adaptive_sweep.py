@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+AIRM Adaptive Threshold Search — adaptive_sweep.py
+--------------------------------------------------
+Finds the alpha at which SNR_vs_null crosses the GO threshold instead of
+spending the same number of realizations on every point of a fixed
+logspace grid (SimConfig.sweep_mode = "adaptive").
+
+1. Evaluate alpha_min and alpha_max. If they do not bracket the threshold
+   the crossing lies outside the configured range and the search stops.
+2. At every evaluated alpha, keep adding realizations (doubling, up to
+   adaptive_max_realizations) while the SNR confidence interval
+   SNR +/- CI_Z * SE, SE = std(A) / sqrt(n) / sigma_null,
+   still contains the threshold.
+3. Bisect geometrically between the highest alpha below and the lowest
+   alpha above the threshold until alpha_hi / alpha_lo - 1 <=
+   adaptive_rel_precision, or a midpoint stays ambiguous at the
+   realization cap (statistics-limited), or adaptive_max_evals is hit.
+4. The threshold estimate steps linearly from the final bracket point
+   whose SNR is closest to the threshold, using the slope of the bracket
+   chord. Its uncertainty combines that point's SNR standard error
+   (through the slope) with the size of the step / sqrt(3) (curvature of
+   SNR(alpha) over the step).
+
+Every alpha sits at a dyadic position p = m / 2^d in [0, 1],
+alpha = alpha_min * (alpha_max / alpha_min)^p, and its alpha_index (the
+key of its noise streams and checkpoint entries) is a function of p alone.
+Adding realizations never changes the ones already drawn, and a resumed or
+extended search reuses every alpha it revisits even if its path changes.
+"""
+
+from __future__ import annotations
+
+import math
+from fractions import Fraction
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Two-sided ~95% interval on the SNR estimate
+CI_Z = 1.96
+
+
+def position_index(pos: Fraction) -> int:
+    """
+    Unique alpha_index >= 1 for a dyadic position m / 2^d: the ends are 1 and
+    2, level d >= 1 midpoints (m odd) take 2^d + (m + 1) / 2.
+    """
+    d = pos.denominator.bit_length() - 1
+    if d == 0:
+        return 1 + pos.numerator
+    return 2 ** d + (pos.numerator + 1) // 2
+
+
+class _Point:
+    """All draws so far at one alpha."""
+
+    def __init__(self, pos: Fraction, alpha: float, alpha_index: int, theta: np.ndarray) -> None:
+        self.pos = pos
+        self.alpha = float(alpha)
+        self.alpha_index = alpha_index
+        self.theta = theta
+        self.amps_true = np.empty(0)
+        self.amps_false = np.empty(0)
+
+    @property
+    def n(self) -> int:
+        return int(self.amps_true.size)
+
+    def snr(self, null_mu: float, null_sigma: float) -> float:
+        return (float(np.mean(self.amps_true)) - null_mu) / null_sigma
+
+    def snr_se(self, null_sigma: float) -> float:
+        if self.n < 2:
+            return math.inf
+        return float(np.std(self.amps_true, ddof=1)) / math.sqrt(self.n) / null_sigma
+
+
+def _draw(point: _Point, n_add: int, cfg, dp: Dict[str, float], plan, checkpoint=None, pool=None) -> None:
+    """Append realizations point.n .. point.n + n_add - 1."""
+    from sensitivity_analysis import run_realization_tasks
+
+    thetas = {point.alpha_index: point.theta}
+    a_true, a_false = run_realization_tasks(
+        thetas, cfg, dp, plan, pool=pool, n=n_add, rows=[point.alpha_index], start=point.n,
+        checkpoint=checkpoint, ship_thetas=True,
+    )
+    point.amps_true = np.concatenate((point.amps_true, a_true[0]))
+    point.amps_false = np.concatenate((point.amps_false, a_false[0]))
+
+
+def adaptive_threshold_search(
+    cfg,
+    dp: Dict[str, float],
+    plan,
+    null_mu: float,
+    null_sigma: float,
+    snr_threshold: float,
+    checkpoint=None,
+    theta_cache: Optional[Dict[float, np.ndarray]] = None,
+    pool: Optional[ProcessPoolExecutor] = None,
+) -> Dict[str, object]:
+    """
+    Returns {"points": [(alpha, amps_true, amps_false), ...] sorted by alpha,
+    "summary": JSON-ready threshold estimate and per-alpha statistics}.
+
+    With a checkpoint, trajectories and draws of an interrupted search are
+    reused for every alpha the search revisits. Without one, theta_cache
+    ({alpha: theta}) shares trajectories between searches whose configs
+    differ only in the noise (hardware_map.py).
+
+    With cfg.workers > 1 every draw runs on one pool (`pool`, or one opened
+    here for the whole search); trajectories travel with their tasks since
+    the alphas are only known as the search goes.
+    """
+    from sensitivity_analysis import _init_worker, checkpointed_thetas, integrate_theta
+
+    if pool is None and cfg.workers > 1:
+        initargs = ({}, cfg, dp, plan)
+        with ProcessPoolExecutor(max_workers=cfg.workers, initializer=_init_worker, initargs=initargs) as pool:
+            return adaptive_threshold_search(
+                cfg, dp, plan, null_mu, null_sigma, snr_threshold,
+                checkpoint=checkpoint, theta_cache=theta_cache, pool=pool,
+            )
+
+    if null_sigma <= 0:
+        raise ValueError("Adaptive search needs a null distribution with non-zero spread (n_null >= 2).")
+    n_cap = max(int(cfg.adaptive_max_realizations), int(cfg.n_realizations))
+    points: List[_Point] = []
+
+    def evaluate(pos: Fraction) -> _Point:
+        alpha = cfg.alpha_min * (cfg.alpha_max / cfg.alpha_min) ** float(pos)
+        alpha_index = position_index(pos)
+        if checkpoint is None and theta_cache is not None:
+            if alpha not in theta_cache:
+                theta_cache[alpha] = integrate_theta(alpha, cfg, dp, plan.t_eval)
+            theta = theta_cache[alpha]
+        elif checkpoint is None:
+            theta = integrate_theta(alpha, cfg, dp, plan.t_eval)
+        else:
+            theta = checkpointed_thetas([alpha], cfg, dp, plan.t_eval, checkpoint, first_index=alpha_index)[0]
+        point = _Point(pos, alpha, alpha_index, theta)
+        points.append(point)
+        _draw(point, int(cfg.n_realizations), cfg, dp, plan, checkpoint, pool)
+        # Refine only while the interval still straddles the threshold
+        while point.n < n_cap and ambiguous(point):
+            _draw(point, min(point.n, n_cap - point.n), cfg, dp, plan, checkpoint, pool)
+        snr = point.snr(null_mu, null_sigma)
+        print(
+            f"[adaptive] alpha={alpha:.3e} | n={point.n:4d} | SNR_vs_null={snr:.2f} "
+            f"+/- {point.snr_se(null_sigma):.2f}"
+        )
+        return point
+
+    def ambiguous(point: _Point) -> bool:
+        return abs(point.snr(null_mu, null_sigma) - snr_threshold) < CI_Z * point.snr_se(null_sigma)
+
+    def above(point: _Point) -> bool:
+        return point.snr(null_mu, null_sigma) >= snr_threshold
+
+    lo = evaluate(Fraction(0))
+    hi = evaluate(Fraction(1))
+
+    status = "converged"
+    if above(lo):
+        status = "below_alpha_min"
+    elif not above(hi):
+        status = "above_alpha_max"
+    else:
+        while hi.alpha / lo.alpha - 1.0 > cfg.adaptive_rel_precision:
+            if len(points) >= cfg.adaptive_max_evals:
+                status = "max_evals"
+                break
+            mid = evaluate((lo.pos + hi.pos) / 2)
+            if above(mid):
+                hi = mid
+            else:
+                lo = mid
+            if ambiguous(mid):
+                status = "statistics_limited"
+                break
+
+    summary: Dict[str, object] = {
+        "status": status,
+        "snr_threshold": float(snr_threshold),
+        "ci_z": CI_Z,
+        "rel_precision": float(cfg.adaptive_rel_precision),
+        "alpha_lo": lo.alpha,
+        "alpha_hi": hi.alpha,
+        "alpha_threshold": None,
+        "alpha_threshold_sigma": None,
+        "n_evaluations": len(points),
+        "n_realizations_total": int(sum(p.n for p in points)),
+        "evaluations": [
+            {
+                "alpha": p.alpha,
+                "n": p.n,
+                "snr_vs_null": p.snr(null_mu, null_sigma),
+                "snr_se": p.snr_se(null_sigma),
+            }
+            for p in points
+        ],
+    }
+    if status not in ("below_alpha_min", "above_alpha_max"):
+        summary.update(_interpolate(lo, hi, null_mu, null_sigma, snr_threshold))
+
+    points.sort(key=lambda p: p.alpha)
+    return {"points": [(p.alpha, p.amps_true, p.amps_false) for p in points], "summary": summary}
+
+
+def _interpolate(lo: _Point, hi: _Point, null_mu: float, null_sigma: float, snr_threshold: float) -> Dict[str, float]:
+    """
+    Linear step from the bracket point whose SNR is closest to the
+    threshold, with the slope of the bracket chord.
+    """
+    s_lo, s_hi = lo.snr(null_mu, null_sigma), hi.snr(null_mu, null_sigma)
+    if s_hi <= s_lo:
+        width = hi.alpha - lo.alpha
+        return {"alpha_threshold": 0.5 * (lo.alpha + hi.alpha), "alpha_threshold_sigma": width / math.sqrt(12.0)}
+    k = (hi.alpha - lo.alpha) / (s_hi - s_lo)
+    anchor = lo if abs(snr_threshold - s_lo) <= abs(snr_threshold - s_hi) else hi
+    step = (snr_threshold - anchor.snr(null_mu, null_sigma)) * k
+    sigma_stat = k * anchor.snr_se(null_sigma)
+    # The chord slope is exact for a linear SNR(alpha); allow the step to
+    # be off by up to its own size otherwise
+    sigma_interp = abs(step) / math.sqrt(3.0)
+    return {
+        "alpha_threshold": anchor.alpha + step,
+        "alpha_threshold_sigma": math.hypot(sigma_stat, sigma_interp),
+        "alpha_threshold_sigma_stat": sigma_stat,
+    }
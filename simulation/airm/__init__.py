@@ -0,0 +1,19 @@
+"""
+AIRM simulation package — airm/
+-------------------------------
+Importable form of the standalone simulation scripts, behind one CLI:
+
+    python -m airm gate0      # wrong-frequency collapse test (Falsification_test.py)
+    python -m airm baseline   # no-spinner control, deliberate NO-GO (baseline_no_spinner.py)
+    python -m airm full       # spinner sensitivity + null test (airm_full_analysis.py)
+    python -m airm sweep      # alpha sweep / GO decision (sensitivity_analysis.py)
+
+Each command is a plain function taking a SimConfig (gate0.run_gate0,
+baseline.run_baseline, full.run_full) and returning its report as a dict;
+parameters, EOM, integrators and the demodulation chain all come from the
+shared modules in simulation/ (sensitivity_analysis, demod_plan, ...), which
+must be importable (run from simulation/ or put it on PYTHONPATH).
+
+Importing this package, or asking the CLI for --help, loads neither NumPy,
+SciPy nor matplotlib; a command imports what it needs when it runs.
+"""
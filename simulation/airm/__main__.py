@@ -0,0 +1,7 @@
+"""python -m airm <command> ..."""
+
+import sys
+
+from airm.cli import main
+
+sys.exit(main())
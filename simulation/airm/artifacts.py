@@ -0,0 +1,66 @@
+"""
+AIRM CLI Artifacts — airm/artifacts.py
+--------------------------------------
+Output directory, JSON report and figures of one CLI command.
+
+Figures are drawn on a bare matplotlib Figure (Agg canvas, no pyplot) unless
+they are to be shown, so headless runs never select a GUI backend or block
+on a window. matplotlib stays optional: without it, plots are skipped.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+RUNS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "runs")
+
+
+def output_dir(command: str, out_dir: Optional[str] = None) -> str:
+    """out_dir, or a fresh runs/<UTC timestamp>-<command>/ (created)."""
+    if out_dir is None:
+        out_dir = os.path.join(RUNS_DIR, f"{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}-{command}")
+    os.makedirs(out_dir, exist_ok=True)
+    return out_dir
+
+
+def write_report(out_dir: str, report: Dict[str, object]) -> str:
+    path = os.path.join(out_dir, "report.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def plot(
+    draw: Callable[[object], None],
+    path: Optional[str] = None,
+    show: bool = False,
+    figsize=(12, 5),
+) -> bool:
+    """
+    draw(ax) on a new figure, saved to `path` and/or shown interactively.
+    Returns False (and does nothing) if matplotlib is not installed.
+    """
+    if path is None and not show:
+        return True
+    try:
+        if show:
+            import matplotlib.pyplot as plt
+
+            fig = plt.figure(figsize=figsize)
+        else:
+            from matplotlib.figure import Figure
+
+            fig = Figure(figsize=figsize)
+    except ImportError:
+        print("[airm] matplotlib not installed; plot skipped")
+        return False
+    draw(fig.subplots())
+    fig.tight_layout()
+    if path is not None:
+        fig.savefig(path, dpi=160)
+    if show:
+        plt.show()
+    return True
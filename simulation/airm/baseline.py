@@ -0,0 +1,96 @@
+"""
+AIRM Baseline No-Spinner Simulation — airm/baseline.py
+------------------------------------------------------
+Deliberate NO-GO control:
+
+- Injects NO modulation (alpha = 0, epsilon(t) = 0)
+- Performs NO frequency translation
+- Produces NO coherent signal at the target sideband
+
+It establishes the numerical noise floor of the raw readout and motivates
+the spinner-enabled configuration: without controlled rotation there is no
+clean detection channel at f_spin + f_sid. A low SNR here is expected and
+REQUIRED.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import asdict
+from typing import Dict, Optional
+
+import numpy as np
+
+from sensitivity_analysis import SimConfig, derived_params, integrate_theta
+from systematics import add_readout_noise
+from zoom_psd import band_snr, snr_bins, zoom_psd
+
+# Welch segment length and the nominal +/- noise band around f_target. The
+# band is narrower than fs / nperseg, so band_snr widens it to the nearest
+# off-lobe Welch bins (zoom_psd.py)
+BASELINE_NPERSEG = 2**14
+BASELINE_BAND_HZ = 1.0e-5
+
+# +/- span of the plotted (zoomed) PSD around f_target
+BASELINE_PLOT_HZ = 5.0e-4
+
+BASELINE_CONFIG = dict(fs_hz=1.0, run_tag="baseline")
+
+
+def baseline_config(**overrides) -> SimConfig:
+    return SimConfig(**{**BASELINE_CONFIG, **overrides})
+
+
+def run_baseline(cfg: SimConfig, out_dir: Optional[str] = None, show: bool = False) -> Dict[str, object]:
+    """PSD of the unmodulated, noisy readout and its (null) SNR at f_target."""
+    from airm.artifacts import plot, write_report
+
+    dp = derived_params(cfg)
+    t_eval = np.arange(0.0, cfg.duration_s, dp["dt"])
+    theta = integrate_theta(0.0, cfg, dp, t_eval)
+
+    # Readout noise (optical lever model)
+    rng = np.random.default_rng(cfg.seed)
+    theta_noisy = add_readout_noise(theta, cfg, dp, rng)
+
+    f_target = dp["f_target"]
+    nperseg = min(BASELINE_NPERSEG, theta.size)
+    freqs = snr_bins(f_target, cfg.fs_hz, nperseg, BASELINE_BAND_HZ, span_hz=BASELINE_PLOT_HZ)
+    f, pxx = zoom_psd(theta_noisy, cfg.fs_hz, freqs, nperseg)
+    signal_power, noise_power = band_snr(f, pxx, f_target, BASELINE_BAND_HZ, cfg.fs_hz, nperseg)
+
+    report: Dict[str, object] = {
+        "command": "baseline",
+        "natural_period_s": 1.0 / dp["f0"],
+        "f_target_hz": f_target,
+        "signal_power": signal_power,
+        "noise_power": noise_power,
+        "snr": signal_power / noise_power,
+        "config": asdict(cfg),
+    }
+
+    def draw(ax) -> None:
+        ax.semilogy(f, pxx, "k", lw=0.6)
+        ax.axvline(f_target, color="red", ls="--", label="Hypothetical f_spin + f_sid")
+        ax.set_xlim(f_target - BASELINE_PLOT_HZ, f_target + BASELINE_PLOT_HZ)
+        ax.set_xlabel("Frequency [Hz]")
+        ax.set_ylabel("PSD [rad²/Hz]")
+        ax.set_title("Baseline No-Spinner PSD (Deliberate NO-GO)")
+        ax.legend()
+        ax.grid(alpha=0.3)
+
+    if out_dir is not None:
+        write_report(out_dir, report)
+    plot(draw, path=os.path.join(out_dir, "baseline_psd.png") if out_dir is not None else None, show=show)
+    return report
+
+
+def print_baseline(report: Dict[str, object]) -> None:
+    print(f"Natural period T0 = {report['natural_period_s']:.2f} s")
+    print("\n===== BASELINE NO-SPINNER REPORT =====")
+    print("This configuration is EXPECTED to be NO-GO")
+    print("--------------------------------------")
+    print(f"Hypothetical target frequency = {report['f_target_hz']:.6e} Hz")
+    print(f"Signal power = {report['signal_power']:.2e}")
+    print(f"Noise power  = {report['noise_power']:.2e}")
+    print(f"SNR          = {report['snr']:.2f}")
@@ -0,0 +1,393 @@
+"""
+AIRM Command Line — airm/cli.py
+-------------------------------
+    python -m airm gate0    [--alpha A] [--n-realizations N] [--curve] [--memory-budget-mb MB]
+    python -m airm baseline
+    python -m airm full     [--alpha A] [--memory-budget-mb MB]
+    python -m airm sweep    [--n-realizations N] [--workers W] [--sweep-mode grid|adaptive] [--profile]
+    python -m airm map      --range FIELD=LO:HI [...] [--points N | --lhs N] [--workers W]
+    python -m airm solvers  [--alpha A]
+    python -m airm fit      [--alpha A] [--n-realizations N] [--harmonics K] [--poly-order D]
+    python -m airm live     --port DEV --rad-per-adc K [--adc-offset N] [--publish-s S]
+    python -m airm emulate  [--alpha A] [--sink file|pipe|pty] [--path P] [--speed X] [--jitter-ms J]
+    python -m airm replay   LOG [--sink file|pipe|pty] [--path P] [--speed X]
+
+Common options: --solver, --ivp-method, --seed, --duration-h,
+--set FIELD=VALUE (any SimConfig field), --out DIR and --headless.
+
+--headless is the artifact-only mode for batch jobs: results go to --out
+(default runs/<UTC timestamp>-<command>/) as report.json and PNG figures
+drawn without pyplot, and no window is ever opened. Without it, figures
+are shown and artifacts are written only if --out is given. sweep, map and
+live always write their output directory and never open windows.
+
+This module imports nothing beyond the standard library; each command
+loads NumPy / SciPy / matplotlib when it runs, so --help returns at
+interpreter-startup speed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from typing import Dict, List, Optional
+
+
+def _key_value(text: str):
+    key, sep, value = text.partition("=")
+    if not sep or not key:
+        raise argparse.ArgumentTypeError(f"expected FIELD=VALUE, got '{text}'")
+    return key.strip(), value.strip()
+
+
+def _overrides(args: argparse.Namespace, **fields) -> Dict[str, object]:
+    """SimConfig field overrides from the common options, --set and `fields`."""
+    from sensitivity_analysis import SimConfig
+
+    out: Dict[str, object] = {}
+    if args.duration_h is not None:
+        out["duration_s"] = args.duration_h * 3600.0
+    if args.solver is not None:
+        out["solver"] = args.solver
+    if args.ivp_method is not None:
+        out["ivp_method"] = args.ivp_method
+    if args.seed is not None:
+        out["seed"] = args.seed
+    for key, value in args.set:
+        if not hasattr(SimConfig, key):
+            raise SystemExit(f"airm: unknown SimConfig field '{key}'")
+        default = getattr(SimConfig, key)
+        if isinstance(default, bool):
+            out[key] = value.lower() in ("1", "true", "yes", "on")
+        else:
+            out[key] = type(default)(value)
+    out.update({k: v for k, v in fields.items() if v is not None})
+    return out
+
+
+def _range(text: str):
+    key, value = _key_value(text)
+    try:
+        lo, hi = (float(v) for v in value.split(":"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected FIELD=LO:HI, got '{text}'") from None
+    return key, (lo, hi)
+
+
+def _out_dir(args: argparse.Namespace) -> Optional[str]:
+    if args.out is None and not args.headless:
+        return None
+    from airm.artifacts import output_dir
+
+    return output_dir(args.command, args.out)
+
+
+def _cmd_gate0(args: argparse.Namespace) -> int:
+    from airm.gate0 import GATE0_ALPHA, gate0_config, print_gate0, run_gate0
+
+    cfg = gate0_config(**_overrides(args, n_realizations=args.n_realizations))
+    out_dir = _out_dir(args)
+    report = run_gate0(
+        cfg,
+        alpha=GATE0_ALPHA if args.alpha is None else args.alpha,
+        out_dir=out_dir,
+        memory_budget_mb=args.memory_budget_mb,
+        work_dir=args.work_dir,
+        curve=args.curve,
+        curve_span=args.curve_span,
+        curve_step=args.curve_step,
+    )
+    print_gate0(report)
+    if out_dir is not None:
+        print(f"outputs: {out_dir}")
+    return 0 if report["passed"] else 1
+
+
+def _cmd_baseline(args: argparse.Namespace) -> int:
+    from airm.baseline import baseline_config, print_baseline, run_baseline
+
+    cfg = baseline_config(**_overrides(args))
+    out_dir = _out_dir(args)
+    report = run_baseline(cfg, out_dir=out_dir, show=not args.headless)
+    print_baseline(report)
+    if out_dir is not None:
+        print(f"outputs: {out_dir}")
+    return 0
+
+
+def _cmd_full(args: argparse.Namespace) -> int:
+    from airm.full import FULL_ALPHA, full_config, print_full, run_full
+
+    cfg = full_config(**_overrides(args))
+    out_dir = _out_dir(args)
+    report = run_full(
+        cfg,
+        alpha=FULL_ALPHA if args.alpha is None else args.alpha,
+        out_dir=out_dir,
+        memory_budget_mb=args.memory_budget_mb,
+        work_dir=args.work_dir,
+    )
+    print_full(report)
+    if out_dir is not None:
+        print(f"outputs: {out_dir}")
+    return 0
+
+
+def _cmd_sweep(args: argparse.Namespace) -> int:
+    from sensitivity_analysis import SimConfig, run_sensitivity
+
+    cfg = SimConfig(**_overrides(
+        args,
+        n_realizations=args.n_realizations,
+        workers=args.workers,
+        sweep_mode=args.sweep_mode,
+        profile=args.profile or None,
+    ))
+    run_sensitivity(cfg, run_dir=args.out)
+    return 0
+
+
+def _cmd_map(args: argparse.Namespace) -> int:
+    from airm.artifacts import output_dir
+    from hardware_map import print_map, run_hardware_map
+    from sensitivity_analysis import SimConfig
+
+    cfg = SimConfig(**_overrides(args, n_realizations=args.n_realizations, workers=args.workers, run_tag="map"))
+    out_dir = output_dir(args.command, args.out)
+    result = run_hardware_map(
+        cfg,
+        dict(args.range),
+        method="lhs" if args.lhs else "grid",
+        points=args.points,
+        samples=args.lhs,
+        out_dir=out_dir,
+    )
+    print_map(result)
+    print(f"outputs: {out_dir}")
+    return 0
+
+
+def _cmd_solvers(args: argparse.Namespace) -> int:
+    from sensitivity_analysis import SimConfig
+    from solvers import backend_report, print_backend_report
+
+    overrides = _overrides(args)
+    overrides.setdefault("duration_s", 6.0 * 3600.0)
+    report = backend_report(SimConfig(**overrides), alpha=1.0e-10 if args.alpha is None else args.alpha)
+    print_backend_report(report)
+    out_dir = _out_dir(args)
+    if out_dir is not None:
+        from airm.artifacts import write_report
+
+        write_report(out_dir, {"command": "solvers", **report})
+        print(f"outputs: {out_dir}")
+    return 0
+
+
+def _cmd_fit(args: argparse.Namespace) -> int:
+    from joint_fit import joint_fit_report, print_joint_fit_report
+    from sensitivity_analysis import SimConfig
+
+    report = joint_fit_report(
+        SimConfig(**_overrides(args)),
+        alpha=1.0e-7 if args.alpha is None else args.alpha,
+        n_realizations=args.n_realizations,
+        harmonics=args.harmonics,
+        poly_order=args.poly_order,
+    )
+    print_joint_fit_report(report)
+    out_dir = _out_dir(args)
+    if out_dir is not None:
+        from airm.artifacts import write_report
+
+        write_report(out_dir, {"command": "fit", **report})
+        print(f"outputs: {out_dir}")
+    return 0
+
+
+def _cmd_live(args: argparse.Namespace) -> int:
+    import asyncio
+    import signal
+
+    from airm.artifacts import output_dir
+    from live_acquisition import FIRMWARE_FS_HZ, acquisition_from_config, open_serial, print_record
+    from sensitivity_analysis import SimConfig
+
+    overrides = _overrides(args)
+    overrides.setdefault("fs_hz", FIRMWARE_FS_HZ)
+    cfg = SimConfig(**overrides)
+    out_dir = output_dir(args.command, args.out)
+
+    async def acquire() -> Dict[str, object]:
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        fd = open_serial(args.port, args.baud)
+        try:
+            acq = acquisition_from_config(
+                cfg, fd, out_dir, args.rad_per_adc, args.adc_offset, args.publish_s, on_publish=print_record
+            )
+            return await acq.run(stop)
+        finally:
+            os.close(fd)
+
+    summary = asyncio.run(acquire())
+    counts = summary["counts"]
+    print(f"rows={counts['rows']} gaps={counts['gaps']} skipped={counts['skipped_lines']} published={counts['published']}")
+    print(f"outputs: {out_dir}")
+    return 0
+
+
+def _emit(args: argparse.Namespace, blocks) -> int:
+    from firmware_emulator import Sink, emit
+
+    sink = Sink(args.sink, args.path)
+    if sink.path != "-":
+        print(f"[airm] {args.command}: writing to {sink.path}", file=sys.stderr, flush=True)
+    try:
+        rep = emit(blocks, sink.write, args.speed)
+    except BrokenPipeError:
+        return 0  # the reader went away (e.g. `| head`)
+    finally:
+        sink.close()
+    print(
+        f"[airm] {rep['lines']} lines, {rep['firmware_s'] / 3600.0:.2f} h of firmware time "
+        f"in {rep['wall_s']:.1f} s ({rep['speedup']:.0f}x real time)",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def _cmd_emulate(args: argparse.Namespace) -> int:
+    from firmware_emulator import emulated_blocks
+    from live_acquisition import FIRMWARE_FS_HZ
+    from sensitivity_analysis import SimConfig
+
+    overrides = _overrides(args)
+    overrides.setdefault("fs_hz", FIRMWARE_FS_HZ)
+    cfg = SimConfig(**overrides)
+    blocks = emulated_blocks(
+        cfg, 0.0 if args.alpha is None else args.alpha, args.rad_per_adc, args.adc_offset,
+        jitter_ms=args.jitter_ms, millis_start=args.millis_start,
+    )
+    return _emit(args, blocks)
+
+
+def _cmd_replay(args: argparse.Namespace) -> int:
+    from firmware_emulator import replay_blocks
+
+    return _emit(args, replay_blocks(args.log))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--headless", action="store_true", help="artifact-only: write report/figures, never open windows")
+    common.add_argument("--out", default=None, help="output directory (default with --headless: runs/<UTC>-<command>/)")
+    common.add_argument("--solver", default=None, choices=("solve_ivp", "rk4_ensemble", "exact"))
+    common.add_argument(
+        "--ivp-method", default=None, choices=("RK45", "DOP853", "LSODA", "Radau"),
+        help="solve_ivp backend (solvers.py) for --solver solve_ivp",
+    )
+    common.add_argument("--seed", type=int, default=None)
+    common.add_argument("--duration-h", type=float, default=None, help="simulated duration in hours")
+    common.add_argument(
+        "--set", type=_key_value, action="append", default=[], metavar="FIELD=VALUE",
+        help="override any SimConfig field (repeatable)",
+    )
+
+    # Out-of-core mode (gate0, full)
+    ooc = argparse.ArgumentParser(add_help=False)
+    ooc.add_argument(
+        "--memory-budget-mb", type=float, default=0.0,
+        help="RAM budget: integrate/demodulate in chunks via disk-backed arrays (0 = in memory)",
+    )
+    ooc.add_argument("--work-dir", default=None, help="directory for the disk-backed arrays (default: a temp dir)")
+
+    ap = argparse.ArgumentParser(prog="airm", description="AIRM simulation commands.")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("gate0", parents=[common, ooc], help="wrong-frequency collapse test (Gate 0)")
+    p.add_argument("--alpha", type=float, default=None, help="injected amplitude (default 1e-11)")
+    p.add_argument("--n-realizations", type=int, default=None)
+    p.add_argument("--curve", action="store_true", help="also compute the discrimination curve A(f)/A(f_true)")
+    p.add_argument("--curve-span", type=float, default=0.10, help="relative offset span of the curve (default 0.10)")
+    p.add_argument("--curve-step", type=float, default=0.001, help="relative offset step of the curve (default 0.001)")
+    p.set_defaults(func=_cmd_gate0)
+
+    p = sub.add_parser("baseline", parents=[common], help="no-spinner control run (deliberate NO-GO)")
+    p.set_defaults(func=_cmd_baseline)
+
+    p = sub.add_parser("full", parents=[common, ooc], help="spinner sensitivity at one alpha + null test")
+    p.add_argument("--alpha", type=float, default=None, help="injected amplitude (default 1e-10)")
+    p.set_defaults(func=_cmd_full)
+
+    p = sub.add_parser("sweep", parents=[common], help="alpha sweep, null distribution and GO/NO-GO (run directory)")
+    p.add_argument("--n-realizations", type=int, default=None)
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--sweep-mode", default=None, choices=("grid", "adaptive"))
+    p.add_argument("--profile", action="store_true", help="per-stage timings into run_meta.json")
+    p.set_defaults(func=_cmd_sweep)
+
+    p = sub.add_parser("map", parents=[common], help="GO-threshold alpha over hardware parameters (hardware_map.npz)")
+    p.add_argument(
+        "--range", type=_range, action="append", required=True, metavar="FIELD=LO:HI",
+        help="log-sampled range of I0, kappa, Q, noise_asd_rad_sqrt_hz or fs_hz (repeatable)",
+    )
+    p.add_argument("--points", type=int, default=3, help="grid points per axis")
+    p.add_argument("--lhs", type=int, default=0, metavar="N", help="N Latin-hypercube samples instead of the grid")
+    p.add_argument("--n-realizations", type=int, default=None)
+    p.add_argument("--workers", type=int, default=None)
+    p.set_defaults(func=_cmd_map)
+
+    p = sub.add_parser("solvers", parents=[common], help="RHS evaluations, wall time and phase error per solve_ivp backend")
+    p.add_argument("--alpha", type=float, default=None, help="injected amplitude (default 1e-10)")
+    p.set_defaults(func=_cmd_solvers)
+
+    p = sub.add_parser("fit", parents=[common], help="joint fit of f_spin +- f_sid, spin harmonics, f_sid and a trend to delta_f")
+    p.add_argument("--alpha", type=float, default=None, help="injected amplitude (default 1e-7)")
+    p.add_argument("--n-realizations", type=int, default=64)
+    p.add_argument("--harmonics", type=int, default=2, help="spin harmonics k * f_spin in the line set")
+    p.add_argument("--poly-order", type=int, default=2, help="Legendre trend degree (-1: none)")
+    p.set_defaults(func=_cmd_fit)
+
+    p = sub.add_parser("live", parents=[common], help="acquire the firmware stream with rolling delta_f / amplitude / SNR")
+    p.add_argument("--port", required=True, help="serial device, pty or FIFO carrying the firmware CSV")
+    p.add_argument("--baud", type=int, default=9600)
+    p.add_argument("--rad-per-adc", type=float, required=True, help="Gate-4 calibration factor K [rad/count]")
+    p.add_argument("--adc-offset", type=float, default=0.0)
+    p.add_argument("--publish-s", type=float, default=300.0, help="firmware seconds between records (default 300)")
+    p.set_defaults(func=_cmd_live)
+
+    # Byte sink of emulate / replay
+    sink = argparse.ArgumentParser(add_help=False)
+    sink.add_argument("--sink", default="pipe", choices=("file", "pipe", "pty"), help="default: pipe to stdout")
+    sink.add_argument("--path", default=None, help="file or FIFO path ('-' = stdout); a pty prints its device")
+    sink.add_argument("--speed", type=float, default=0.0, help="pace in x real time (0 = as fast as possible)")
+
+    p = sub.add_parser("emulate", parents=[common, sink], help="firmware CSV stream of a simulated run (InertiaSpinner.ino format)")
+    p.add_argument("--alpha", type=float, default=None, help="injected amplitude (default 0)")
+    p.add_argument("--rad-per-adc", type=float, default=1.0e-6, help="calibration factor K [rad/count]")
+    p.add_argument("--adc-offset", type=float, default=512.0)
+    p.add_argument("--jitter-ms", type=int, default=2, help="loop latency added to each 1000 ms log interval")
+    p.add_argument("--millis-start", type=int, default=0, help="millis() at the start (near 2^32 to exercise the wrap)")
+    p.set_defaults(func=_cmd_emulate)
+
+    p = sub.add_parser("replay", parents=[common, sink], help="replay a recorded firmware CSV or .airmlog at a controlled rate")
+    p.add_argument("log", help="raw firmware CSV (replayed verbatim) or .airmlog directory")
+    p.set_defaults(func=_cmd_replay)
+    return ap
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.headless:
+        # Before anything imports matplotlib: pyplot, if used at all, must
+        # never pick an interactive backend
+        os.environ["MPLBACKEND"] = "Agg"
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
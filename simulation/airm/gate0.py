@@ -0,0 +1,236 @@
+"""
+AIRM Falsification Test — airm/gate0.py
+---------------------------------------
+Frequency discrimination (Gate 0), the primary Tier-1 falsification
+requirement: the pipeline must recover a coherent signal ONLY at the
+model-predicted frequency f_target and collapse at the nearby
+f_false = f_target * (1 + delta_false_frac).
+
+PASS condition:
+    A(f_false) / A(f_true) < GATE0_MAX_RATIO
+
+Failure INVALIDATES all sensitivity and GO/NO-GO claims. This is a
+numerical validation only; no physical claims are made.
+
+The noise-free trajectory is integrated once and the realizations differ
+only in their readout noise (drawn from cfg.seed), demodulated in batches
+through the shared DemodPlan.
+
+With curve=True every delta_f series is also projected onto a dense grid
+of relative offsets f_true * (1 + delta), delta in +/- curve_span at
+curve_step, in one pass (a chirp-z transform for grids of >= 128 points,
+see projection.py). The discrimination curve is
+mean A(f) / mean A(f_true), the same ratio of means as the PASS
+criterion, which is unchanged and evaluated on the same draws. The worst
+sidelobe is the curve maximum outside the main lobe |f - f_true| < 1/T
+(T = analysed duration).
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import asdict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from demod_plan import demod_plan_from_config
+from sensitivity_analysis import SimConfig, derived_params, integrate_theta, process_realizations
+from systematics import add_readout_noise
+
+GATE0_MAX_RATIO = 0.1
+
+# Injected test amplitude
+GATE0_ALPHA = 1.0e-11
+
+# Discrimination curve: relative offsets +/- GATE0_CURVE_SPAN at GATE0_CURVE_STEP
+GATE0_CURVE_SPAN = 0.10
+GATE0_CURVE_STEP = 0.001
+
+# Gate-0 settings where they differ from the SimConfig defaults
+GATE0_CONFIG = dict(fs_hz=1.0, lp_cutoff_hz=0.003, n_realizations=10, run_tag="gate0")
+
+
+def gate0_config(**overrides) -> SimConfig:
+    return SimConfig(**{**GATE0_CONFIG, **overrides})
+
+
+def curve_offsets(span: float = GATE0_CURVE_SPAN, step: float = GATE0_CURVE_STEP) -> np.ndarray:
+    """Relative offsets -span .. +span at `step`, with 0 exactly on the grid."""
+    k = int(round(span / step))
+    return step * np.arange(-k, k + 1)
+
+
+def curve_realizations(
+    theta: np.ndarray,
+    cfg: SimConfig,
+    dp: Dict[str, float],
+    rng: np.random.Generator,
+    plan,
+    freqs: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    process_realizations (same draws, same batches) that also projects each
+    delta_f onto `freqs`: (amps_true, amps_false, amps at freqs of shape
+    (n_realizations, F)).
+    """
+    n = cfg.n_realizations
+    amps_true, amps_false = np.empty(n), np.empty(n)
+    curve = np.empty((n, freqs.size))
+    batch = max(1, int(cfg.realization_batch))
+    for start in range(0, n, batch):
+        k = min(batch, n - start)
+        theta_noisy = add_readout_noise(theta, cfg, dp, rng, k)
+        delta_f = plan.delta_f(theta_noisy)
+        pair = plan.project(delta_f, (dp["f_target"], dp["f_false"]))[0]
+        amps_true[start:start + k], amps_false[start:start + k] = pair[:, 0], pair[:, 1]
+        curve[start:start + k] = plan.project(delta_f, freqs)[0]
+    return amps_true, amps_false, curve
+
+
+def grid_index(offsets: np.ndarray, offset: float) -> Optional[int]:
+    """Index of `offset` in a curve_offsets grid, or None if it falls between points."""
+    step = offsets[1] - offsets[0] if offsets.size > 1 else 1.0
+    i = int(round((offset - offsets[0]) / step))
+    if 0 <= i < offsets.size and abs(offsets[i] - offset) <= 1e-6 * step:
+        return i
+    return None
+
+
+def ooc_curve_realizations(
+    ooc,
+    cfg: SimConfig,
+    dp: Dict[str, float],
+    rng: np.random.Generator,
+    offsets: np.ndarray,
+    freqs: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    curve_realizations on an OutOfCoreRun. Only the uniform grid `freqs` is
+    projected (one chirp-z pass per realization); f_true is its zero offset
+    and f_false its delta_false_frac offset. An f_false between grid points
+    is projected separately from the kept delta_f.
+    """
+    n = cfg.n_realizations
+    i_true = grid_index(offsets, 0.0)
+    i_false = grid_index(offsets, cfg.delta_false_frac)
+    amps_false = np.empty(n)
+    curve = np.empty((n, freqs.size))
+    for r in range(n):
+        curve[r] = ooc.realization(rng, freqs, keep_delta_f=i_false is None)[0]
+        amps_false[r] = curve[r, i_false] if i_false is not None else ooc.project((dp["f_false"],))[0][0]
+    return curve[:, i_true].copy(), amps_false, curve
+
+
+def run_gate0(
+    cfg: SimConfig,
+    alpha: float = GATE0_ALPHA,
+    out_dir: Optional[str] = None,
+    memory_budget_mb: float = 0.0,
+    work_dir: Optional[str] = None,
+    curve: bool = False,
+    curve_span: float = GATE0_CURVE_SPAN,
+    curve_step: float = GATE0_CURVE_STEP,
+) -> Dict[str, object]:
+    """
+    Recovered amplitudes at f_true / f_false and the PASS/FAIL verdict,
+    plus the discrimination curve if requested. memory_budget_mb > 0
+    selects the out-of-core path (out_of_core.py).
+    """
+    from airm.artifacts import plot, write_report
+
+    dp = derived_params(cfg)
+    rng = np.random.default_rng(cfg.seed)
+    offsets = curve_offsets(curve_span, curve_step) if curve else np.empty(0)
+    freqs = dp["f_target"] * (1.0 + offsets)
+    amps_curve = None
+    ooc_summary = None
+    if memory_budget_mb > 0:
+        from out_of_core import OutOfCoreRun
+
+        with OutOfCoreRun(cfg, dp, memory_budget_mb, work_dir=work_dir) as ooc:
+            ooc.preflight(freqs if curve else (dp["f_target"], dp["f_false"]))
+            ooc.integrate(alpha)
+            if curve:
+                amps_true, amps_false, amps_curve = ooc_curve_realizations(ooc, cfg, dp, rng, offsets, freqs)
+            else:
+                refs = (dp["f_target"], dp["f_false"])
+                amps = np.array([ooc.realization(rng, refs)[0] for _ in range(cfg.n_realizations)])
+                amps_true, amps_false = amps[:, 0], amps[:, 1]
+            ooc_summary = ooc.summary()
+    else:
+        plan = demod_plan_from_config(cfg, dp)
+        theta = integrate_theta(alpha, cfg, dp, plan.t_eval)
+        if curve:
+            amps_true, amps_false, amps_curve = curve_realizations(theta, cfg, dp, rng, plan, freqs)
+        else:
+            amps_true, amps_false = process_realizations(theta, cfg.n_realizations, cfg, dp, rng, plan=plan)
+
+    a_true = float(np.mean(amps_true))
+    a_false = float(np.mean(amps_false))
+    ratio = a_false / (a_true + 1e-30)
+    report: Dict[str, object] = {
+        "command": "gate0",
+        "alpha": float(alpha),
+        "f_true_hz": dp["f_target"],
+        "f_false_hz": dp["f_false"],
+        "n_realizations": int(cfg.n_realizations),
+        "amp_true_hz": a_true,
+        "amp_false_hz": a_false,
+        "false_over_true": ratio,
+        "max_ratio": GATE0_MAX_RATIO,
+        "passed": bool(ratio < GATE0_MAX_RATIO),
+        "config": asdict(cfg),
+    }
+    if ooc_summary is not None:
+        report["out_of_core"] = ooc_summary
+    if amps_curve is not None:
+        ratio_curve = np.mean(amps_curve, axis=0) / (a_true + 1e-30)
+        # Main lobe of the coherent projection over the analysed span T
+        t_span = cfg.duration_s - 2.0 * cfg.trim_s
+        side = np.abs(freqs - dp["f_target"]) >= 1.0 / t_span
+        worst = int(np.flatnonzero(side)[np.argmax(ratio_curve[side])]) if np.any(side) else None
+        report["curve"] = {
+            "offsets": offsets.tolist(),
+            "ratio": ratio_curve.tolist(),
+            "mainlobe_halfwidth_rel": 1.0 / (t_span * dp["f_target"]),
+            "worst_sidelobe_ratio": None if worst is None else float(ratio_curve[worst]),
+            "worst_sidelobe_offset": None if worst is None else float(offsets[worst]),
+        }
+    if out_dir is not None:
+        write_report(out_dir, report)
+        if amps_curve is not None:
+            np.savez_compressed(
+                os.path.join(out_dir, "gate0_curve.npz"), offsets=offsets, freqs_hz=freqs, amps_hz=amps_curve
+            )
+            plot(lambda ax: _draw_curve(ax, report), path=os.path.join(out_dir, "gate0_curve.png"))
+    return report
+
+
+def _draw_curve(ax, report: Dict[str, object]) -> None:
+    c = report["curve"]
+    ax.plot(100.0 * np.asarray(c["offsets"]), c["ratio"], "k", lw=0.8)
+    ax.axhline(report["max_ratio"], color="red", ls="--", label="Gate-0 limit")
+    ax.axvline(100.0 * (report["f_false_hz"] / report["f_true_hz"] - 1.0), color="gray", ls=":", label="f_false")
+    ax.set_xlabel("offset from f_true [%]")
+    ax.set_ylabel("A(f) / A(f_true)")
+    ax.set_title("Gate-0 discrimination curve")
+    ax.legend()
+    ax.grid(alpha=0.3)
+
+
+def print_gate0(report: Dict[str, object]) -> None:
+    print("\n=== FALSIFICATION TEST — GATE 0 ===")
+    print(f"Recovered amplitude @ f_true :  {report['amp_true_hz']:.3e} Hz")
+    print(f"Recovered amplitude @ f_false: {report['amp_false_hz']:.3e} Hz")
+    print(f"False / True ratio           : {report['false_over_true']:.3e}")
+    if "curve" in report and report["curve"]["worst_sidelobe_ratio"] is not None:
+        c = report["curve"]
+        print(
+            f"Worst sidelobe                : {c['worst_sidelobe_ratio']:.3e} at "
+            f"{100.0 * c['worst_sidelobe_offset']:+.2f} % ({len(c['offsets'])} offsets)"
+        )
+    if report["passed"]:
+        print("✅ PASS: Frequency discrimination confirmed (Gate 0 PASSED)")
+    else:
+        print("⛔ FAIL: Pipeline insufficiently selective (Gate 0 FAILED)")
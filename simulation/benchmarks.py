@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+AIRM Pipeline Benchmarks — benchmarks.py
+----------------------------------------
+Stage-level and end-to-end timings of the simulation / analysis chain over
+a grid of (duration_s, fs_hz, n_realizations), recorded to a JSON history
+and checked against a stored baseline.
+
+Stages (each timed in isolation on the arrays the previous one produces,
+exactly as DemodPlan.delta_f / demod_amplitudes chain them):
+
+    integrate_<solver>   noise-free theta (solve_ivp RK45, exact stepper)
+    noise                add_noise_batch, n realizations
+    mix                  IQ mixing with the plan's carriers
+    filtfilt             zero-phase SOS low-pass of I and Q
+    unwrap_detrend       arctan2 + unwrap + closed-form linear detrend
+    gradient             delta_f = dphi/dt / 2pi
+    projection           coherent projection at f_target and f_false
+    process_realizations end-to-end noise + demod + projection (n draws)
+    process_one          process_one_realization (integration included)
+
+Scripts (--scripts) run Falsification_test.py and airm_full_analysis.py
+end-to-end in a subprocess (headless matplotlib backend).
+
+Each case records the median wall time over --repeat runs, CPU time and
+peak memory: tracemalloc peak for in-process stages (a separate pass, so
+tracing does not distort the timings) and child ru_maxrss for scripts.
+Everything runs offline with the standard library + numpy/scipy.
+
+    python benchmarks.py                       # default grid, append to history
+    python benchmarks.py --quick               # small grid
+    python benchmarks.py --save-baseline       # store this run as the baseline
+    python benchmarks.py --tolerance 0.25      # flag > 25% slower than baseline
+
+Exit status is 1 when any case regressed.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import replace
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.signal import sosfiltfilt
+
+from demod_plan import _derivative, demod_plan_from_config
+from sensitivity_analysis import (
+    SimConfig,
+    add_noise_batch,
+    demod_amplitudes,
+    derived_params,
+    integrate_theta,
+    process_one_realization,
+    process_realizations,
+    realization_rng,
+)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BENCH_DIR = os.path.join(HERE, "bench_results")
+HISTORY_PATH = os.path.join(BENCH_DIR, "history.jsonl")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+DEFAULT_GRID = {"duration_s": (6.0 * 3600.0, 24.0 * 3600.0, 48.0 * 3600.0), "fs_hz": (1.0, 2.0), "n_realizations": (1, 10)}
+QUICK_GRID = {"duration_s": (3.0 * 3600.0,), "fs_hz": (1.0,), "n_realizations": (1, 4)}
+SCRIPTS = ("Falsification_test.py", "airm_full_analysis.py")
+N_INDEPENDENT = ("integrate_solve_ivp", "integrate_exact", "process_one")
+
+# Below this a relative change is timer noise, not a regression
+MIN_REGRESSION_S = 5.0e-3
+
+
+# ----------------------------- Measurement -----------------------------
+
+def measure(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Median wall / CPU time over `repeat` calls, then one traced call for peak memory."""
+    walls, cpus = [], []
+    for _ in range(repeat):
+        c0, w0 = time.process_time(), time.perf_counter()
+        fn()
+        walls.append(time.perf_counter() - w0)
+        cpus.append(time.process_time() - c0)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "wall_s": statistics.median(walls),
+        "wall_min_s": min(walls),
+        "cpu_s": statistics.median(cpus),
+        "peak_mem_mb": peak / 2**20,
+    }
+
+
+def measure_script(script: str, timeout_s: float) -> Dict[str, float]:
+    """Run a pipeline script in a child process; wall, CPU and peak RSS from wait4."""
+    env = dict(os.environ, MPLBACKEND="Agg")
+    stderr = tempfile.TemporaryFile()
+    w0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, script], cwd=HERE, env=env, stdout=subprocess.DEVNULL, stderr=stderr)
+    deadline = time.monotonic() + timeout_s
+    while True:
+        pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+        if pid:
+            break
+        if time.monotonic() > deadline:
+            proc.kill()
+            os.wait4(proc.pid, 0)
+            raise TimeoutError(f"{script} exceeded {timeout_s:.0f} s")
+        time.sleep(0.05)
+    wall = time.perf_counter() - w0
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode != 0:
+        stderr.seek(0)
+        raise RuntimeError(f"{script} failed:\n{stderr.read().decode(errors='replace')[-2000:]}")
+    stderr.close()
+    return {
+        "wall_s": wall,
+        "wall_min_s": wall,
+        "cpu_s": usage.ru_utime + usage.ru_stime,
+        "peak_mem_mb": usage.ru_maxrss / 2**10,  # KiB on Linux
+    }
+
+
+# ----------------------------- Cases -----------------------------
+
+def stage_cases(cfg: SimConfig, alpha: float = 1.0e-10) -> List[Tuple[str, Callable[[], object]]]:
+    """(name, thunk) per stage, each fed the output of the previous stage."""
+    dp = derived_params(cfg)
+    plan = demod_plan_from_config(cfg, dp)
+    n = cfg.n_realizations
+    freqs = (dp["f_target"], dp["f_false"])
+
+    theta = integrate_theta(alpha, replace(cfg, solver="exact"), dp, plan.t_eval)
+
+    def rngs() -> List[np.random.Generator]:
+        return [realization_rng(cfg, 1, r) for r in range(n)]
+
+    noisy = add_noise_batch(theta, dp["noise_rms_per_sample"], rngs())
+    I = noisy * plan.cos_ref
+    Q = -(noisy * plan.sin_ref)
+    I_lp = sosfiltfilt(plan.sos, I, axis=-1)[..., plan.keep]
+    Q_lp = sosfiltfilt(plan.sos, Q, axis=-1)[..., plan.keep]
+
+    def unwrap_detrend():
+        phase = np.unwrap(np.arctan2(Q_lp, I_lp), axis=-1)
+        slope = (phase @ plan.t_centered) / plan.t_ss
+        intercept = np.mean(phase, axis=-1) - slope * plan.t_mean
+        phase -= np.multiply.outer(slope, plan.t) + np.expand_dims(intercept, -1)
+        return phase
+
+    phase = unwrap_detrend()
+    delta_f = _derivative(phase, plan.dt * plan.decimate, high_order=plan.decimate > 1) / (2.0 * np.pi)
+    rng = np.random.default_rng(cfg.seed)
+
+    return [
+        ("integrate_solve_ivp", lambda: integrate_theta(alpha, replace(cfg, solver="solve_ivp"), dp, plan.t_eval)),
+        ("integrate_exact", lambda: integrate_theta(alpha, replace(cfg, solver="exact"), dp, plan.t_eval)),
+        ("noise", lambda: add_noise_batch(theta, dp["noise_rms_per_sample"], rngs())),
+        ("mix", lambda: (noisy * plan.cos_ref, noisy * plan.sin_ref)),
+        ("filtfilt", lambda: (sosfiltfilt(plan.sos, I, axis=-1), sosfiltfilt(plan.sos, Q, axis=-1))),
+        ("unwrap_detrend", unwrap_detrend),
+        ("gradient", lambda: _derivative(phase, plan.dt * plan.decimate, high_order=plan.decimate > 1)),
+        ("projection", lambda: plan.project(delta_f, freqs)),
+        ("demod_amplitudes", lambda: demod_amplitudes(noisy, plan, dp)),
+        ("process_realizations", lambda: process_realizations(theta, n, cfg, dp, rng, plan=plan)),
+        ("process_one", lambda: process_one_realization(alpha, cfg, dp, rng, plan=plan)),
+    ]
+
+
+def case_key(name: str, params: Optional[Dict[str, float]]) -> str:
+    if not params:
+        return name
+    return f"{name}|d={params['duration_s'] / 3600.0:g}h|fs={params['fs_hz']:g}|n={params['n_realizations']}"
+
+
+def run_suite(grid: Dict[str, tuple], repeat: int, scripts: bool, script_timeout_s: float) -> Dict[str, Dict[str, object]]:
+    results: Dict[str, Dict[str, object]] = {}
+    keys = list(grid)
+    for values in itertools.product(*(grid[k] for k in keys)):
+        params = dict(zip(keys, values))
+        cfg = replace(SimConfig(), **params)
+        for name, fn in stage_cases(cfg):
+            # Integration does not depend on n: time it once per (duration, fs)
+            if name in N_INDEPENDENT and params["n_realizations"] != grid["n_realizations"][0]:
+                continue
+            key = case_key(name, params)
+            results[key] = {"stage": name, "params": params, **measure(fn, repeat)}
+            print(f"{key:48s} wall={results[key]['wall_s'] * 1e3:10.2f} ms | peak={results[key]['peak_mem_mb']:8.1f} MiB")
+    if scripts:
+        for script in SCRIPTS:
+            key = case_key(script, None)
+            try:
+                results[key] = {"stage": "script", "params": None, **measure_script(script, script_timeout_s)}
+            except (RuntimeError, TimeoutError) as exc:
+                # Recorded, not fatal: the remaining cases are still useful
+                results[key] = {"stage": "script", "params": None, "error": str(exc).splitlines()[-1]}
+                print(f"{key:48s} ERROR: {results[key]['error']}")
+                continue
+            print(f"{key:48s} wall={results[key]['wall_s']:10.2f} s  | peak RSS={results[key]['peak_mem_mb']:8.1f} MiB")
+    return results
+
+
+# ----------------------------- History / baseline -----------------------------
+
+def environment() -> Dict[str, object]:
+    import scipy
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "host": platform.node(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "cpu_count": os.cpu_count(),
+        "git_commit": commit,
+    }
+
+
+def compare(results: Dict[str, Dict[str, object]], baseline: Dict[str, Dict[str, object]], tolerance: float) -> List[Dict[str, object]]:
+    """Cases whose median wall time exceeds the baseline by more than `tolerance`."""
+    flagged = []
+    for key, res in results.items():
+        base = baseline.get(key)
+        if base is None or "wall_s" not in base or "wall_s" not in res:
+            continue
+        ratio = res["wall_s"] / base["wall_s"] if base["wall_s"] > 0 else float("inf")
+        if ratio > 1.0 + tolerance and res["wall_s"] - base["wall_s"] > MIN_REGRESSION_S:
+            flagged.append({"case": key, "wall_s": res["wall_s"], "baseline_wall_s": base["wall_s"], "ratio": ratio})
+    return flagged
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Stage-level benchmarks of the AIRM simulation pipeline.")
+    ap.add_argument("--quick", action="store_true", help="small grid (one short duration)")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--scripts", action="store_true", help="also time Falsification_test.py and airm_full_analysis.py")
+    ap.add_argument("--script-timeout", type=float, default=3600.0)
+    ap.add_argument("--history", default=HISTORY_PATH)
+    ap.add_argument("--baseline", default=BASELINE_PATH)
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--tolerance", type=float, default=0.2, help="allowed fractional slowdown vs baseline")
+    args = ap.parse_args()
+
+    grid = QUICK_GRID if args.quick else DEFAULT_GRID
+    results = run_suite(grid, args.repeat, args.scripts, args.script_timeout)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    flagged = compare(results, baseline, args.tolerance)
+
+    record = {
+        "timestamp_utc": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "environment": environment(),
+        "grid": {k: list(v) for k, v in grid.items()},
+        "repeat": args.repeat,
+        "tolerance": args.tolerance,
+        "results": results,
+        "regressions": flagged,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+    with open(args.history, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+        print(f"baseline saved: {args.baseline}")
+
+    if not baseline:
+        if not args.save_baseline:
+            print("no baseline to compare against (run with --save-baseline)")
+    elif flagged:
+        print(f"\n{len(flagged)} REGRESSION(S) vs baseline (> {args.tolerance:.0%} slower):")
+        for r in flagged:
+            print(f"  {r['case']:48s} {r['baseline_wall_s'] * 1e3:10.2f} ms -> {r['wall_s'] * 1e3:10.2f} ms (x{r['ratio']:.2f})")
+        sys.exit(1)
+    else:
+        print(f"\nno regressions vs baseline (tolerance {args.tolerance:.0%})")
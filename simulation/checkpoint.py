@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+AIRM Run Checkpoints — checkpoint.py
+------------------------------------
+Incremental, crash-safe state for run_sensitivity in
+simulation/runs/<RUN_ID>/checkpoint/:
+
+    config.json        SimConfig + config hash
+    theta_0000.npz     noise-free trajectory per alpha_index (+ its alpha),
+                       compressed; removed once the run's results are written
+    part_000000.npz    finished (alpha_index, realization, amp_true, amp_false)
+                       records, one file per flush
+
+Every file is written to a temporary name and moved into place with
+os.replace, so a crash leaves either the old state or the new one, never a
+torn file. Records are flushed every CHECKPOINT_FLUSH_S seconds and at the
+end of every batch of tasks.
+
+The config hash covers every field that changes an individual draw; fields
+that only change how many draws exist or how they are scheduled
+(UNHASHED_FIELDS) are excluded, so a run can be resumed with another
+worker count or extended with more realizations.
+
+    python checkpoint.py resume runs/<RUN_ID>
+    python checkpoint.py extend runs/<RUN_ID> --n-realizations 40 [--n-null 10000]
+"""
+
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+CHECKPOINT_DIR = "checkpoint"
+CHECKPOINT_FLUSH_S = 60.0
+
+# Draw counts and scheduling only; everything else is part of the hash
+UNHASHED_FIELDS = (
+    "n_realizations",
+    "n_null",
+    "realization_batch",
+    "workers",
+    "profile",
+    "run_tag",
+    "adaptive_rel_precision",
+    "adaptive_max_realizations",
+    "adaptive_max_evals",
+    "jit_rhs",
+)
+
+# Fields added after runs were first checkpointed: left out of the hash while
+# at their SimConfig default, so older run directories still resume
+DEFAULTED_FIELDS = (
+    "ivp_method",
+    "ivp_rtol",
+    "ivp_atol",
+    "flicker_asd_1hz",
+    "random_walk_asd_1hz",
+    "kappa_thermal_frac",
+    "kappa_creep_per_day",
+    "spin_line_frac",
+    "spin_line_harmonics",
+)
+
+
+def config_hash(cfg) -> str:
+    """sha256 of the result-determining SimConfig fields (canonical JSON)."""
+    fields = {
+        k: v for k, v in asdict(cfg).items()
+        if k not in UNHASHED_FIELDS and not (k in DEFAULTED_FIELDS and v == getattr(type(cfg), k))
+    }
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _atomic_replace(path: str, write) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def atomic_write_json(path: str, obj: object) -> None:
+    _atomic_replace(path, lambda f: f.write(json.dumps(obj, indent=2).encode("utf-8")))
+
+
+class Checkpoint:
+    """Finished trajectories and draws of one run directory."""
+
+    def __init__(self, run_dir: str, cfg, flush_s: float = CHECKPOINT_FLUSH_S) -> None:
+        self.dir = os.path.join(run_dir, CHECKPOINT_DIR)
+        os.makedirs(self.dir, exist_ok=True)
+        self.config_hash = config_hash(cfg)
+        self.flush_s = float(flush_s)
+
+        cfg_path = os.path.join(self.dir, "config.json")
+        if os.path.exists(cfg_path):
+            with open(cfg_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)["config_hash"]
+            if stored != self.config_hash:
+                raise ValueError(
+                    f"SimConfig hash {self.config_hash[:12]} does not match checkpoint {stored[:12]} in {run_dir}; "
+                    f"only {', '.join(UNHASHED_FIELDS)} may change on resume/extend."
+                )
+        atomic_write_json(cfg_path, {"config_hash": self.config_hash, "config": asdict(cfg)})
+
+        # alpha_index -> (realization, amp_true, amp_false) from earlier sessions
+        self._records: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        parts = sorted(glob.glob(os.path.join(self.dir, "part_*.npz")))
+        if parts:
+            cols = [np.load(p) for p in parts]
+            idx = np.concatenate([c["alpha_index"] for c in cols])
+            real = np.concatenate([c["realization"] for c in cols])
+            a_true = np.concatenate([c["amp_true"] for c in cols])
+            a_false = np.concatenate([c["amp_false"] for c in cols])
+            for i in np.unique(idx):
+                sel = idx == i
+                self._records[int(i)] = (real[sel], a_true[sel], a_false[sel])
+        self._seq = len(parts)
+        self._pending: List[Tuple[int, int, np.ndarray, np.ndarray]] = []
+        self._last_flush = time.monotonic()
+
+    @property
+    def n_records(self) -> int:
+        return int(sum(r[0].size for r in self._records.values()))
+
+    # -------- trajectories --------
+
+    def _theta_path(self, alpha_index: int) -> str:
+        return os.path.join(self.dir, f"theta_{alpha_index:04d}.npz")
+
+    def load_theta(self, alpha_index: int, alpha: float) -> Optional[np.ndarray]:
+        path = self._theta_path(alpha_index)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as d:
+            if float(d["alpha"]) != float(alpha):
+                raise ValueError(f"Checkpointed alpha_index {alpha_index} has alpha={float(d['alpha'])}, expected {alpha}.")
+            return d["theta"]
+
+    def save_theta(self, alpha_index: int, alpha: float, theta: np.ndarray) -> None:
+        _atomic_replace(self._theta_path(alpha_index), lambda f: np.savez_compressed(f, alpha=float(alpha), theta=theta))
+
+    def discard_thetas(self) -> None:
+        """
+        Remove the stored trajectories of a finished run. They are
+        deterministic in the config, so an extend recomputes them; the draws
+        (part_*.npz) are what must survive.
+        """
+        for path in glob.glob(os.path.join(self.dir, "theta_*.npz")):
+            os.remove(path)
+
+    # -------- draws --------
+
+    def fill(self, alpha_index: int, start: int, amps_true: np.ndarray, amps_false: np.ndarray, done: np.ndarray) -> None:
+        """Copy finished realizations start .. start + len(done) - 1 into the output rows."""
+        rec = self._records.get(int(alpha_index))
+        if rec is None:
+            return
+        real, a_true, a_false = rec
+        sel = (real >= start) & (real < start + done.size)
+        pos = real[sel] - start
+        amps_true[pos] = a_true[sel]
+        amps_false[pos] = a_false[sel]
+        done[pos] = True
+
+    def add(self, alpha_index: int, start: int, amps_true: np.ndarray, amps_false: np.ndarray) -> None:
+        """Record realizations start .. start + len(amps_true) - 1; flushes when due."""
+        self._pending.append((int(alpha_index), int(start), np.asarray(amps_true), np.asarray(amps_false)))
+        if time.monotonic() - self._last_flush >= self.flush_s:
+            self.flush()
+
+    def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        cols = {
+            "alpha_index": np.concatenate([np.full(a.size, i, dtype=np.int32) for i, _, a, _ in self._pending]),
+            "realization": np.concatenate([np.arange(s, s + a.size, dtype=np.int64) for _, s, a, _ in self._pending]),
+            "amp_true": np.concatenate([a for _, _, a, _ in self._pending]),
+            "amp_false": np.concatenate([b for _, _, _, b in self._pending]),
+        }
+        path = os.path.join(self.dir, f"part_{self._seq:06d}.npz")
+        _atomic_replace(path, lambda f: np.savez(f, **cols))
+        self._seq += 1
+        self._pending = []
+
+
+def missing_batches(done: np.ndarray, batch: int):
+    """(offset, count) runs of not-yet-done realizations, at most `batch` long."""
+    todo = np.flatnonzero(~done)
+    if todo.size == 0:
+        return
+    breaks = np.flatnonzero(np.diff(todo) != 1) + 1
+    for run in np.split(todo, breaks):
+        for s in range(0, run.size, batch):
+            yield int(run[s]), int(min(batch, run.size - s))
+
+
+# ----------------------------- Entry points -----------------------------
+
+def load_run_config(run_dir: str):
+    """SimConfig stored in a run's checkpoint."""
+    from sensitivity_analysis import SimConfig
+
+    with open(os.path.join(run_dir, CHECKPOINT_DIR, "config.json"), "r", encoding="utf-8") as f:
+        return SimConfig(**json.load(f)["config"])
+
+
+def resume_run(run_dir: str, workers: Optional[int] = None) -> Dict[str, object]:
+    """Finish an interrupted run in place; finished work is skipped."""
+    from dataclasses import replace
+
+    from sensitivity_analysis import run_sensitivity
+
+    cfg = load_run_config(run_dir)
+    if workers is not None:
+        cfg = replace(cfg, workers=int(workers))
+    return run_sensitivity(cfg, run_dir=run_dir)
+
+
+def extend_run(
+    run_dir: str,
+    n_realizations: int,
+    n_null: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, object]:
+    """Raise the realization counts of an existing run; only new draws are computed."""
+    from dataclasses import replace
+
+    from sensitivity_analysis import run_sensitivity
+
+    cfg = load_run_config(run_dir)
+    # n_null = 0 means "as many null draws as n_realizations"
+    old_null = cfg.n_null or cfg.n_realizations
+    new_null = (cfg.n_null if n_null is None else n_null) or n_realizations
+    if n_realizations < cfg.n_realizations or new_null < old_null:
+        raise ValueError("extend can only add realizations.")
+    changes = {"n_realizations": int(n_realizations)}
+    if n_null is not None:
+        changes["n_null"] = int(n_null)
+    if workers is not None:
+        changes["workers"] = int(workers)
+    return run_sensitivity(replace(cfg, **changes), run_dir=run_dir)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Resume or extend a checkpointed sensitivity run.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p_resume = sub.add_parser("resume", help="finish an interrupted run")
+    p_resume.add_argument("run_dir")
+    p_resume.add_argument("--workers", type=int, default=None)
+    p_extend = sub.add_parser("extend", help="add realizations to a run")
+    p_extend.add_argument("run_dir")
+    p_extend.add_argument("--n-realizations", type=int, required=True)
+    p_extend.add_argument("--n-null", type=int, default=None)
+    p_extend.add_argument("--workers", type=int, default=None)
+    args = ap.parse_args()
+
+    if args.cmd == "resume":
+        resume_run(args.run_dir, workers=args.workers)
+    else:
+        extend_run(args.run_dir, args.n_realizations, n_null=args.n_null, workers=args.workers)
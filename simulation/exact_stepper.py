@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+AIRM Exact-Discretization Stepper — exact_stepper.py
+----------------------------------------------------
+Closed-form, non-adaptive propagation of the torsion-pendulum EOM
+
+    I0 * (1 + eps(t)) * theta_ddot + gamma * theta_dot + kappa * theta = tau(t)
+
+on a uniform sample grid.
+
+Over one sample interval the oscillator is linear and time-invariant once
+eps and tau are held at their midpoint values, so the state advances by the
+exact damped-oscillator transition matrix:
+
+    y[k+1] = Phi(eps_k) y[k] + Gamma(eps_k) tau_k,     y = (theta, theta_dot)
+
+Because |eps| <= alpha is tiny, Phi(eps) = Phi0 + eps * dPhi/deps + O(eps^2).
+The solution is split into a zeroth-order trajectory (eps = 0) plus a
+first-order correction driven by eps_k. Both are first-order linear
+recurrences in the oscillator's complex modal coordinate, which
+`scipy.signal.lfilter` evaluates in O(N) compiled work — no Python loop over
+time, no adaptive error control.
+
+Discretization error (documented, checked by `error_report`):
+- O(alpha^2) from the first-order expansion in eps (alpha <= 1e-10 -> ~1e-20)
+- O((2*pi*f*dt)^2) from holding eps and tau at their midpoint values
+
+No claims of new physics. This is a numerical tool only.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from scipy.signal import lfilter
+
+# Largest |alpha| for which the first-order expansion in eps is used.
+MAX_ALPHA = 1.0e-6
+
+# Complex-step size for d/deps of the closed-form matrices
+_CS_STEP = 1.0e-30
+
+
+# ----------------------------- Closed form -----------------------------
+
+def transition_matrices(I0: float, kappa: float, gamma: float, dt: float, eps: complex = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact one-step state transition Phi and input vector Gamma (zero-order
+    hold on tau) for an underdamped oscillator with inertia I0 * (1 + eps).
+
+    `eps` may be complex (used for complex-step differentiation).
+    """
+    inertia = I0 * (1.0 + eps)
+    w0_sq = kappa / inertia
+    beta = gamma / (2.0 * inertia)
+    wd = np.sqrt(w0_sq - beta * beta + 0j)
+    if eps == 0.0 and not (wd.real > 0.0):
+        raise ValueError("exact stepper requires an underdamped oscillator (Q > 1/2).")
+
+    decay = np.exp(-beta * dt)
+    c = np.cos(wd * dt)
+    s = np.sin(wd * dt) / wd
+
+    phi = decay * np.array([
+        [c + beta * s, s],
+        [-w0_sq * s, c - beta * s],
+    ])
+    gam = np.array([
+        (1.0 - phi[1, 1] - 2.0 * beta * phi[0, 1]) / kappa,
+        phi[0, 1] / inertia,
+    ])
+    if not np.iscomplexobj(eps):
+        phi, gam = phi.real, gam.real
+    return phi, gam
+
+
+def transition_derivatives(I0: float, kappa: float, gamma: float, dt: float) -> Tuple[np.ndarray, np.ndarray]:
+    """d(Phi)/d(eps) and d(Gamma)/d(eps) at eps = 0 (complex-step, machine precision)."""
+    phi_cs, gam_cs = transition_matrices(I0, kappa, gamma, dt, eps=1j * _CS_STEP)
+    return phi_cs.imag / _CS_STEP, gam_cs.imag / _CS_STEP
+
+
+def _modal_recurrence(lam: complex, w: np.ndarray, z0: complex) -> np.ndarray:
+    """z[0] = z0, z[k+1] = lam * z[k] + w[k], for k = 0..len(w)-2."""
+    z = np.empty(len(w), dtype=complex)
+    z[0] = z0
+    if len(w) > 1:
+        z[1:] = lfilter([1.0], [1.0, -lam], w[:-1], zi=[lam * z0])[0]
+    return z
+
+
+# ----------------------------- Stepper -----------------------------
+
+def run_theta_exact_params(
+    t_eval: np.ndarray,
+    alpha: float,
+    f_mod: float,
+    phi: float,
+    I0: float,
+    kappa: float,
+    gamma: float,
+    y0: Tuple[float, float],
+    drive_torque: float = 0.0,
+    drive_omega: float = 0.0,
+) -> np.ndarray:
+    """
+    theta on the uniform grid t_eval for
+
+        eps(t) = alpha * cos(2*pi*f_mod*t + phi)
+        tau(t) = drive_torque * sin(drive_omega * t)
+
+    Parameter-level entry point for callers without a SimConfig.
+    """
+    z, _ = _exact_modal(t_eval, alpha, f_mod, phi, I0, kappa, gamma, y0, drive_torque, drive_omega)
+    if z is None:
+        return np.full(len(t_eval), float(y0[0]))
+    return 2.0 * z.real
+
+
+def run_state_exact_params(
+    t_eval: np.ndarray,
+    alpha: float,
+    f_mod: float,
+    phi: float,
+    I0: float,
+    kappa: float,
+    gamma: float,
+    y0: Tuple[float, float],
+    drive_torque: float = 0.0,
+    drive_omega: float = 0.0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (theta, theta_dot) on t_eval; the last sample is the state from which
+    a following segment continues (out_of_core.py integrates in segments).
+    """
+    z, s = _exact_modal(t_eval, alpha, f_mod, phi, I0, kappa, gamma, y0, drive_torque, drive_omega)
+    if z is None:
+        n = len(t_eval)
+        return np.full(n, float(y0[0])), np.full(n, float(y0[1]))
+    return 2.0 * z.real, 2.0 * (s * z).real
+
+
+def _exact_modal(t_eval, alpha, f_mod, phi, I0, kappa, gamma, y0, drive_torque, drive_omega):
+    """
+    (z, s): complex modal coordinate on t_eval, theta = 2*Re(z) and
+    theta_dot = 2*Re(s*z); z is None for fewer than two samples.
+    """
+    if abs(alpha) > MAX_ALPHA:
+        raise ValueError(f"|alpha|={abs(alpha):.1e} exceeds MAX_ALPHA={MAX_ALPHA:.0e}; use solve_ivp.")
+
+    t_eval = np.asarray(t_eval, dtype=float)
+    n = len(t_eval)
+    if n < 2:
+        return None, None
+    dt = float(t_eval[1] - t_eval[0])
+    if not np.allclose(np.diff(t_eval), dt):
+        raise ValueError("exact stepper requires a uniform t_eval grid.")
+
+    phi0, gam0 = transition_matrices(I0, kappa, gamma, dt)
+    dphi, dgam = transition_derivatives(I0, kappa, gamma, dt)
+
+    # Continuous-time mode s = -beta + i*wd; eigenvalue of Phi0 is exp(s*dt).
+    # For a real state y = c*v + conj(c*v) with v = (1, s):
+    #   c = (y1 - conj(s) * y0) / (2i*wd),   theta = 2*Re(c)
+    beta = gamma / (2.0 * I0)
+    wd = math.sqrt(kappa / I0 - beta * beta)
+    s = complex(-beta, wd)
+    lam = np.exp(s * dt)
+
+    def project(v0: np.ndarray, v1: np.ndarray) -> np.ndarray:
+        return (v1 - s.conjugate() * v0) / (2j * wd)
+
+    t_mid = t_eval[:-1] + 0.5 * dt
+    tau = np.zeros(n)
+    if drive_torque != 0.0:
+        tau[:-1] = drive_torque * np.sin(drive_omega * t_mid)
+
+    # Zeroth order (eps = 0)
+    c0 = project(np.asarray(y0[0], dtype=float), np.asarray(y0[1], dtype=float))
+    z0 = _modal_recurrence(lam, project(gam0[0] * tau, gam0[1] * tau), complex(c0))
+    if alpha == 0.0:
+        return z0, s
+
+    # First order in eps, driven by the zeroth-order state
+    th0 = 2.0 * z0.real
+    om0 = 2.0 * (s * z0).real
+    eps = np.zeros(n)
+    eps[:-1] = alpha * np.cos(2.0 * math.pi * f_mod * t_mid + phi)
+    f0 = eps * (dphi[0, 0] * th0 + dphi[0, 1] * om0 + dgam[0] * tau)
+    f1 = eps * (dphi[1, 0] * th0 + dphi[1, 1] * om0 + dgam[1] * tau)
+    z1 = _modal_recurrence(lam, project(f0, f1), 0j)
+
+    return z0 + z1, s
+
+
+def run_theta_exact(alpha: float, cfg, dp: Dict[str, float], t_eval: np.ndarray, drive_torque: float = 0.0) -> np.ndarray:
+    """Drop-in replacement for `run_theta` using the exact-discretization stepper."""
+    from systematics import require_constant_stiffness
+
+    require_constant_stiffness(cfg, "solver 'exact'")
+    return run_theta_exact_params(
+        t_eval,
+        alpha,
+        dp["f_target"],
+        cfg.phi,
+        cfg.I0,
+        cfg.kappa,
+        dp["gamma"],
+        (cfg.theta0_rad, cfg.theta_dot0),
+        drive_torque=drive_torque,
+        drive_omega=2.0 * math.pi * dp["f0"],
+    )
+
+
+# ----------------------------- Error report -----------------------------
+
+def error_report(alpha: float, cfg, reference: Optional[np.ndarray] = None) -> Dict[str, float]:
+    """
+    Compare the exact stepper with the production `run_theta` (RK45,
+    rtol=1e-9) and with a tight DOP853 solution (rtol=1e-13).
+
+    theta errors are relative to theta0_rad. The modulation error compares
+    the alpha-induced part theta(alpha) - theta(0) of both paths, which is
+    the only part the sideband analysis sees.
+    """
+    from scipy.integrate import solve_ivp
+    from sensitivity_analysis import airm_eom, derived_params, run_theta
+
+    dp = derived_params(cfg)
+    t_eval = np.arange(0.0, cfg.duration_s, dp["dt"])
+
+    def tight(a: float) -> np.ndarray:
+        return solve_ivp(
+            lambda t, y: airm_eom(t, y, a, cfg, dp),
+            [0.0, cfg.duration_s],
+            [cfg.theta0_rad, cfg.theta_dot0],
+            t_eval=t_eval,
+            method="DOP853",
+            rtol=1e-13,
+            atol=1e-20,
+        ).y[0]
+
+    t_start = time.perf_counter()
+    rk45 = run_theta(alpha, cfg, dp, t_eval)
+    t_rk45 = time.perf_counter() - t_start
+
+    t_start = time.perf_counter()
+    exact = run_theta_exact(alpha, cfg, dp, t_eval)
+    t_exact = time.perf_counter() - t_start
+
+    ref = tight(alpha) if reference is None else reference
+    ref_null = tight(0.0)
+    mod_ref = ref - ref_null
+    mod_exact = exact - run_theta_exact(0.0, cfg, dp, t_eval)
+    mod_scale = float(np.max(np.abs(mod_ref))) or 1.0
+
+    scale = abs(cfg.theta0_rad) if cfg.theta0_rad != 0.0 else 1.0
+    return {
+        "alpha": float(alpha),
+        "n_samples": int(len(t_eval)),
+        "max_rel_err_exact_vs_tight": float(np.max(np.abs(exact - ref)) / scale),
+        "max_rel_err_rk45_vs_tight": float(np.max(np.abs(rk45 - ref)) / scale),
+        "max_rel_err_exact_vs_rk45": float(np.max(np.abs(exact - rk45)) / scale),
+        "max_rel_err_modulation": float(np.max(np.abs(mod_exact - mod_ref)) / mod_scale),
+        "wall_s_rk45": t_rk45,
+        "wall_s_exact": t_exact,
+    }
+
+
+if __name__ == "__main__":
+    from sensitivity_analysis import SimConfig
+
+    cfg = SimConfig(duration_s=6.0 * 3600.0)
+
+    print("\n=== EXACT STEPPER vs solve_ivp ===")
+    print(f"duration={cfg.duration_s / 3600.0:.1f} h | fs={cfg.fs_hz:.2f} Hz | Q={cfg.Q:.1e}")
+    for alpha in (0.0, 1.0e-12, 1.0e-10):
+        rep = error_report(alpha, cfg)
+        print(
+            f"alpha={alpha:.1e} | exact-vs-tight={rep['max_rel_err_exact_vs_tight']:.2e} | "
+            f"rk45-vs-tight={rep['max_rel_err_rk45_vs_tight']:.2e} | "
+            f"modulation err={rep['max_rel_err_modulation']:.2e} | "
+            f"wall rk45={rep['wall_s_rk45']:.2f} s exact={rep['wall_s_exact']:.3f} s"
+        )
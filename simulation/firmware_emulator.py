@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+AIRM Firmware Emulator — firmware_emulator.py
+---------------------------------------------
+Stand-in for InertiaSpinner.ino when there is no pendulum: produces the
+firmware's serial output byte for byte,
+
+    Time_ms,Theta_ADC,Status\\r\\n        (header, printed once in setup())
+    <millis()>,<analogRead()>,OK\\r\\n     (one row per log interval)
+
+from the simulated torsion pendulum:
+
+- theta from the EOM (SimConfig.solver: solve_ivp with the configured
+  backend, or "exact" when the timestamps are uniform), integrated in
+  segments with state handoff so runs of any length use bounded memory
+- readout noise from the noise model (noise_rms_per_sample; kappa(t)
+  systematics act through the EOM, colored readout noise needs the whole
+  series and is rejected)
+- Theta_ADC = clip(rint(theta / K + adc_offset), 0, 1023): 10-bit quantization
+- millis(): the firmware logs at the first loop() pass with
+  now - last_log_ms >= interval, so every interval is 1000 / fs_hz ms plus
+  a loop latency of 0 .. jitter_ms ms, and the stamps drift late as on the
+  board. The pendulum is sampled at those instants. millis_start offsets
+  the counter, so a run can cross the 2^32 ms wraparound within minutes.
+
+replay_blocks() plays a recorded log (raw CSV verbatim, or an .airmlog
+directory re-formatted) in its own time base instead.
+
+emit() writes either source to a file, a pipe / FIFO or a pty, paced at
+`speed` x real time (0 = as fast as possible), so weeks of data can
+exercise ingest or the live service in minutes:
+
+    python -m airm emulate --sink pty --speed 1000 --duration-h 168
+    python -m airm replay  runs/.../raw.csv --sink pipe --speed 5000 | ...
+    python firmware_emulator.py     # round trip through ingest + replay
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import sys
+import time
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+import streaming_demod
+from firmware_log import MILLIS_WRAP, _is_rollover
+from systematics import require_constant_stiffness, require_white_noise
+
+HEADER_LINE = (",".join(streaming_demod.FIRMWARE_HEADER) + "\r\n").encode("ascii")
+
+# analogRead() on the 10-bit AVR ADC
+ADC_MAX = 1023
+DEFAULT_ADC_OFFSET = 512.0
+
+DEFAULT_JITTER_MS = 2
+DEFAULT_CHUNK_ROWS = 65536
+
+# Target wall time between paced writes
+PACE_S = 0.05
+
+SINKS = ("file", "pipe", "pty")
+
+Block = Tuple[List[bytes], np.ndarray]  # (CSV lines, firmware time [s] of each line; NaN before the first row)
+
+
+def format_rows(ms: np.ndarray, adc: np.ndarray) -> List[bytes]:
+    """Firmware CSV rows; ms is wrapped to the 32-bit millis() counter."""
+    return [b"%d,%d,OK\r\n" % row for row in zip((ms % MILLIS_WRAP).tolist(), adc.tolist())]
+
+
+# ----------------------------- Sources -----------------------------
+
+def emulated_blocks(
+    cfg,
+    alpha: float,
+    rad_per_adc: float,
+    adc_offset: float = DEFAULT_ADC_OFFSET,
+    jitter_ms: int = DEFAULT_JITTER_MS,
+    millis_start: int = 0,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> Iterator[Block]:
+    """
+    Header + rows of one emulated run of cfg.duration_s; the pendulum
+    starts from (theta0_rad, theta_dot0) at millis() == millis_start.
+    """
+    from sensitivity_analysis import derived_params
+
+    dp = derived_params(cfg)
+    interval_ms = int(round(1000.0 / cfg.fs_hz))
+    if cfg.solver == "exact" and jitter_ms:
+        raise ValueError("solver 'exact' needs uniform timestamps: use jitter_ms=0 or solver 'solve_ivp'.")
+    if cfg.solver not in ("exact", "solve_ivp"):
+        raise ValueError(f"firmware emulator supports solver 'solve_ivp' or 'exact', not '{cfg.solver}'.")
+    require_white_noise(cfg, "firmware emulator")
+    rng = np.random.default_rng(cfg.seed)
+    noise = dp["noise_rms_per_sample"]
+
+    yield [HEADER_LINE], np.full(1, np.nan)
+    last_ms = int(millis_start)
+    t_prev = 0.0
+    y = (float(cfg.theta0_rad), float(cfg.theta_dot0))
+    n_total = int(cfg.duration_s * 1000.0 // interval_ms)
+    for lo in range(0, n_total, chunk_rows):
+        n = min(chunk_rows, n_total - lo)
+        ms = last_ms + np.cumsum(interval_ms + rng.integers(0, jitter_ms + 1, n))
+        last_ms = int(ms[-1])
+        t = (ms - millis_start) / 1000.0
+        theta, y = _segment(alpha, cfg, dp, np.concatenate(([t_prev], t)), y)
+        t_prev = float(t[-1])
+        theta = theta[1:] + noise * rng.standard_normal(n)
+        adc = np.clip(np.rint(theta / rad_per_adc + adc_offset), 0, ADC_MAX).astype(np.int64)
+        yield format_rows(ms, adc), t
+
+
+def _segment(alpha, cfg, dp, t, y) -> Tuple[np.ndarray, Tuple[float, float]]:
+    """theta on t (t[0] holds state y) and the state at t[-1]."""
+    if cfg.solver == "exact":
+        from exact_stepper import run_state_exact_params
+
+        require_constant_stiffness(cfg, "solver 'exact'")
+
+        theta, theta_dot = run_state_exact_params(t, alpha, dp["f_target"], cfg.phi, cfg.I0, cfg.kappa, dp["gamma"], y)
+        return theta, (float(theta[-1]), float(theta_dot[-1]))
+    from solvers import integrate_ivp
+
+    sol = integrate_ivp(alpha, cfg, dp, t, y0=y, t_span=(t[0], t[-1]))
+    return sol.y[0], (float(sol.y[0, -1]), float(sol.y[1, -1]))
+
+
+def replay_blocks(path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[Block]:
+    """
+    Lines of a recorded log with their firmware times. A raw CSV is replayed
+    verbatim (rollover unwrapped as in streaming_demod; lines without a
+    timestamp inherit the previous one); an .airmlog directory is
+    re-formatted with a header.
+    """
+    if os.path.isdir(path):
+        from firmware_log import FirmwareLog
+
+        yield [HEADER_LINE], np.full(1, np.nan)
+        for time_ms, adc in FirmwareLog(path).iter_chunks():
+            yield format_rows(time_ms.astype(np.int64), adc.astype(np.int64)), time_ms / 1000.0
+        return
+
+    wraps = 0
+    last_ms = -1
+    lines: List[bytes] = []
+    times: List[float] = []
+    with open(path, "rb") as f:
+        for line in f:
+            head = line.split(b",", 1)[0]
+            if head.isdigit():
+                t_ms = int(head) + wraps * MILLIS_WRAP
+                if t_ms <= last_ms and _is_rollover(t_ms, last_ms):
+                    wraps += 1
+                    t_ms += MILLIS_WRAP
+                last_ms = max(last_ms, t_ms)
+            lines.append(line)
+            times.append(last_ms / 1000.0 if last_ms >= 0 else np.nan)
+            if len(lines) >= chunk_rows:
+                yield lines, np.asarray(times)
+                lines, times = [], []
+    if lines:
+        yield lines, np.asarray(times)
+
+
+# ----------------------------- Sinks -----------------------------
+
+class Sink:
+    """Byte sink for emit(): file, pipe / FIFO ('-' = stdout) or a new pty."""
+
+    def __init__(self, kind: str, path: Optional[str] = None) -> None:
+        if kind not in SINKS:
+            raise ValueError(f"Unknown sink '{kind}' (expected one of {', '.join(SINKS)}).")
+        self.kind = kind
+        self.path = path
+        self._slave: Optional[int] = None
+        if kind == "pty":
+            import tty
+
+            self.fd, self._slave = os.openpty()
+            tty.setraw(self._slave)  # no CR/LF translation: the reader sees the firmware bytes
+            self.path = os.ttyname(self._slave)
+        elif kind == "pipe" and path in (None, "-"):
+            self.fd = sys.stdout.fileno()
+            self.path = "-"
+        else:
+            if path is None:
+                raise ValueError(f"sink '{kind}' needs a path.")
+            if kind == "pipe" and not os.path.exists(path):
+                os.mkfifo(path)
+            flags = os.O_WRONLY | (os.O_CREAT | os.O_TRUNC if kind == "file" else 0)
+            self.fd = os.open(path, flags, 0o644)  # a FIFO blocks here until a reader opens it
+
+    def write(self, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self.fd, view):]
+
+    def close(self) -> None:
+        if self.kind == "pty":
+            # Hanging up discards what the reader has not taken from the
+            # slave yet: wait until its input queue stays empty
+            idle = 0
+            while idle < 3:
+                time.sleep(PACE_S)
+                idle = idle + 1 if _input_pending(self._slave) == 0 else 0
+            os.close(self._slave)
+        if self.path != "-":
+            os.close(self.fd)
+
+
+def _input_pending(fd: int) -> int:
+    import fcntl
+    import struct
+    import termios
+
+    return struct.unpack("i", fcntl.ioctl(fd, termios.FIONREAD, b"\0\0\0\0"))[0]
+
+
+def emit(blocks: Iterator[Block], write, speed: float = 0.0) -> dict:
+    """
+    Write every block through write(bytes), paced so that firmware time
+    advances at `speed` x wall time (0 = unpaced). Returns counters.
+    """
+    n_lines = 0
+    n_bytes = 0
+    t_first: Optional[float] = None
+    t_start = time.perf_counter()
+    t_last = 0.0
+    for lines, t in blocks:
+        timed = t[np.isfinite(t)]
+        if t_first is None and timed.size:
+            t_first = float(timed[0])
+        step = len(lines)
+        if speed > 0 and timed.size:
+            step = max(1, int(speed * PACE_S * len(lines) / max(timed[-1] - timed[0], PACE_S)))
+        for lo in range(0, len(lines), step):
+            hi = min(len(lines), lo + step)
+            if speed > 0 and t_first is not None and np.isfinite(t[hi - 1]):
+                delay = t_start + (float(t[hi - 1]) - t_first) / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            data = b"".join(lines[lo:hi])
+            write(data)
+            n_bytes += len(data)
+        n_lines += len(lines)
+        if timed.size:
+            t_last = float(timed[-1])
+    wall = time.perf_counter() - t_start
+    span = t_last - (t_first or 0.0)
+    return {
+        "lines": n_lines,
+        "bytes": n_bytes,
+        "firmware_s": span,
+        "wall_s": wall,
+        "speedup": span / wall if wall > 0 else math.inf,
+    }
+
+
+# ----------------------------- Validation -----------------------------
+
+if __name__ == "__main__":
+    import tempfile
+
+    from firmware_log import FirmwareLog, ingest_csv
+    from sensitivity_analysis import SimConfig
+
+    cfg = SimConfig(fs_hz=1.0, duration_s=48.0 * 3600.0, theta0_rad=4.0e-4, noise_asd_rad_sqrt_hz=1.4e-6, ivp_method="DOP853")
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "emulated.csv")
+        sink = Sink("file", csv_path)
+        # millis() wraps ~24 h into the run
+        rep = emit(emulated_blocks(cfg, 1.0e-6, 1.0e-6, millis_start=MILLIS_WRAP - 24 * 3600 * 1000), sink.write)
+        sink.close()
+        print("\n=== FIRMWARE EMULATOR ===")
+        print(
+            f"emulated {rep['firmware_s'] / 3600.0:.1f} h: {rep['lines']} lines, {rep['bytes'] / 1e6:.1f} MB "
+            f"in {rep['wall_s']:.1f} s ({rep['speedup']:.0f}x real time)"
+        )
+        with open(csv_path, "rb") as f:
+            print(f"first lines: {f.readline()!r} {f.readline()!r}")
+
+        meta = ingest_csv(csv_path)
+        adc = FirmwareLog(os.path.splitext(csv_path)[0] + ".airmlog").adc
+        print(
+            f"ingest: rows={meta['n_rows']} rollovers={meta['n_millis_rollovers']} "
+            f"skipped={meta['n_skipped_lines']} ADC range {int(adc.min())}..{int(adc.max())}"
+        )
+
+        replayed = []
+        rep = emit(replay_blocks(csv_path), replayed.append)
+        with open(csv_path, "rb") as f:
+            same = f.read() == b"".join(replayed)
+        print(f"replay unpaced: {rep['speedup']:.0f}x real time, byte-identical={same}")
+        window = replay_blocks(csv_path, chunk_rows=4096)
+        rep = emit((blk for blk, _ in zip(window, range(2))), lambda data: None, speed=20000.0)
+        print(f"replay at 20000x: {rep['firmware_s']:.0f} s of firmware time in {rep['wall_s']:.2f} s ({rep['speedup']:.0f}x)")
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+AIRM Firmware Log Ingest — firmware_log.py
+------------------------------------------
+One-time conversion of firmware CSV output (`Time_ms,Theta_ADC,Status`,
+Docs/Analysis.md §2) into a compact, memory-mappable columnar layout:
+
+    <name>.airmlog/
+    ├── time.u32     # uint32 ms offsets from the owning chunk's base time
+    ├── adc.u16      # uint16 raw Theta_ADC
+    ├── index.npy    # per-chunk: row_start, n_rows, base_ms, last_ms (unwrapped int64 ms)
+    └── meta.json    # provenance: source path, SHA-256, row counts, rollovers, status counts
+
+`millis()` is an unsigned 32-bit counter that wraps after ~49.7 days. Time is
+unwrapped during ingest; each chunk stores its unwrapped int64 base time in
+the index, so uint32 offsets are always sufficient.
+
+The Status column is constant ("OK") in Tier-1 firmware and is not stored;
+its value counts are kept in meta.json so a non-OK row is never silently lost.
+
+`FirmwareLog` opens a converted log with np.memmap (zero-copy) and slices
+time ranges through the chunk index without touching the rest of the file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import itertools
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+# millis() is an unsigned 32-bit counter: it wraps after ~49.7 days. A
+# backward step is a rollover only if the unwrapped time lands within
+# ROLLOVER_MAX_GAP_MS after the previous row; anything else is a bad row.
+# Every reader of firmware time (streaming_demod, live_acquisition,
+# firmware_emulator) uses these and _is_rollover.
+MILLIS_WRAP = 2**32
+ROLLOVER_MAX_GAP_MS = 10 * 60 * 1000
+
+INDEX_DTYPE = np.dtype([
+    ("row_start", "<i8"),
+    ("n_rows", "<i8"),
+    ("base_ms", "<i8"),
+    ("last_ms", "<i8"),
+])
+
+
+# ----------------------------- Parsing -----------------------------
+
+def _parse_block(lines: list, line_index: bool = False) -> tuple:
+    """
+    Parse raw CSV lines into (time_ms int64, adc int64, status_counts, n_skipped),
+    plus the index of each row's source line when line_index is set.
+
+    Fast path: one vectorized loadtxt call when every row ends in ",OK".
+    Otherwise fall back to per-line parsing (header, partial lines after a
+    serial reconnect, or non-OK status rows).
+    """
+    block = b"".join(lines)
+    n_lines = len(lines)
+    if n_lines and block.count(b",OK") == n_lines:
+        try:
+            arr = np.loadtxt(io.BytesIO(block), delimiter=",", usecols=(0, 1), dtype=np.int64, ndmin=2)
+            if arr.shape[0] == n_lines:
+                out = (arr[:, 0], arr[:, 1], {"OK": n_lines}, 0)
+                return out + (np.arange(n_lines),) if line_index else out
+        except ValueError:
+            pass
+
+    times = []
+    adcs = []
+    rows = []
+    status: Dict[str, int] = {}
+    skipped = 0
+    for i, line in enumerate(lines):
+        parts = line.strip().split(b",")
+        if len(parts) < 2:
+            skipped += 1 if line.strip() else 0
+            continue
+        try:
+            t_raw = int(parts[0])
+            adc = int(parts[1])
+        except ValueError:
+            skipped += 1  # header or corrupted line
+            continue
+        times.append(t_raw)
+        adcs.append(adc)
+        rows.append(i)
+        key = parts[2].decode("ascii", "replace") if len(parts) > 2 else ""
+        status[key] = status.get(key, 0) + 1
+    out = (np.asarray(times, dtype=np.int64), np.asarray(adcs, dtype=np.int64), status, skipped)
+    return out + (np.asarray(rows, dtype=np.int64),) if line_index else out
+
+
+def _is_rollover(t_ms: int, last_ms: int) -> bool:
+    """Whether a backward step from last_ms to t_ms (same wrap count) is a millis() rollover."""
+    return t_ms + MILLIS_WRAP - last_ms <= ROLLOVER_MAX_GAP_MS
+
+
+def _unwrap_millis(t_raw: np.ndarray, state: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Unwrapped int64 ms, keep-mask (strictly increasing rows) and rollover
+    count for one block. `state` carries wrap_offset/last_ms across blocks.
+    """
+    t_ms = t_raw + state["wrap_offset"]
+    if t_ms.size and t_ms[0] > state["last_ms"] and np.all(np.diff(t_ms) > 0):
+        state["last_ms"] = int(t_ms[-1])
+        return t_ms, np.ones(t_ms.size, dtype=bool), 0
+
+    # Rare path (rollover or bad rows in this block): walk it row by row
+    keep = np.ones(t_ms.size, dtype=bool)
+    offset = state["wrap_offset"]
+    last = state["last_ms"]
+    wraps = 0
+    for i, raw in enumerate(t_raw.tolist()):
+        t = raw + offset
+        if t <= last:
+            if _is_rollover(t, last):
+                offset += MILLIS_WRAP
+                t += MILLIS_WRAP
+                wraps += 1
+            else:
+                keep[i] = False
+                continue
+        t_ms[i] = t
+        last = t
+    state["wrap_offset"] = offset
+    state["last_ms"] = last
+    return t_ms, keep, wraps
+
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# ----------------------------- Ingest -----------------------------
+
+def ingest_csv(csv_path: str, out_dir: Optional[str] = None, chunk_rows: int = 65536) -> Dict[str, object]:
+    """
+    Convert a firmware CSV log to the columnar layout. Returns the provenance
+    record written to meta.json.
+    """
+    if out_dir is None:
+        out_dir = os.path.splitext(csv_path)[0] + ".airmlog"
+    os.makedirs(out_dir, exist_ok=True)
+
+    index = []
+    status_counts: Dict[str, int] = {}
+    n_rows = 0
+    n_skipped = 0
+    n_rollovers = 0
+    n_adc_clipped = 0
+    n_nonmonotonic = 0
+    state = {"wrap_offset": 0, "last_ms": -1}
+
+    with open(csv_path, "rb") as src, \
+            open(os.path.join(out_dir, "time.u32"), "wb") as f_time, \
+            open(os.path.join(out_dir, "adc.u16"), "wb") as f_adc:
+        while True:
+            lines = list(itertools.islice(src, chunk_rows))
+            if not lines:
+                break
+            t_raw, adc, status, skipped = _parse_block(lines)
+            n_skipped += skipped
+            for key, count in status.items():
+                status_counts[key] = status_counts.get(key, 0) + count
+            if t_raw.size == 0:
+                continue
+
+            # Unwrap millis() rollover; drop rows that step backwards
+            t_ms, keep, wraps = _unwrap_millis(t_raw, state)
+            n_rollovers += wraps
+            n_nonmonotonic += int(keep.size - np.count_nonzero(keep))
+            t_ms, adc = t_ms[keep], adc[keep]
+            if t_ms.size == 0:
+                continue
+
+            base = int(t_ms[0])
+            offsets = t_ms - base
+            if offsets.max() >= MILLIS_WRAP:
+                raise ValueError(f"Chunk starting at row {n_rows} spans more than 2^32 ms; reduce chunk_rows.")
+
+            n_adc_clipped += int(np.count_nonzero((adc < 0) | (adc > 0xFFFF)))
+            f_time.write(offsets.astype("<u4").tobytes())
+            f_adc.write(np.clip(adc, 0, 0xFFFF).astype("<u2").tobytes())
+            index.append((n_rows, t_ms.size, base, int(t_ms[-1])))
+            n_rows += t_ms.size
+
+    np.save(os.path.join(out_dir, "index.npy"), np.array(index, dtype=INDEX_DTYPE))
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "source_path": os.path.abspath(csv_path),
+        "source_sha256": _sha256(csv_path),
+        "source_bytes": os.path.getsize(csv_path),
+        "ingested_utc": datetime.utcnow().isoformat() + "Z",
+        "n_rows": n_rows,
+        "n_chunks": len(index),
+        "chunk_rows": chunk_rows,
+        "n_skipped_lines": n_skipped,
+        "n_millis_rollovers": n_rollovers,
+        "n_dropped_nonmonotonic": n_nonmonotonic,
+        "n_adc_clipped": n_adc_clipped,
+        "status_counts": status_counts,
+        "columns": {"time": "<u4 offset from chunk base_ms", "adc": "<u2 Theta_ADC"},
+    }
+    with open(os.path.join(out_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+# ----------------------------- Reader -----------------------------
+
+class FirmwareLog:
+    """Zero-copy view of an ingested log (see module docstring for the layout)."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported airmlog format version {self.meta.get('format_version')}.")
+        self.index = np.load(os.path.join(path, "index.npy"))
+        n = int(self.meta["n_rows"])
+        self.time_offsets = np.memmap(os.path.join(path, "time.u32"), dtype="<u4", mode="r", shape=(n,)) if n else np.empty(0, "<u4")
+        self.adc = np.memmap(os.path.join(path, "adc.u16"), dtype="<u2", mode="r", shape=(n,)) if n else np.empty(0, "<u2")
+
+    def __len__(self) -> int:
+        return int(self.meta["n_rows"])
+
+    def _rows_time_ms(self, start: int, stop: int) -> np.ndarray:
+        """Unwrapped int64 ms for rows [start, stop)."""
+        out = np.empty(stop - start, dtype=np.int64)
+        c0 = int(np.searchsorted(self.index["row_start"], start, side="right")) - 1
+        row = start
+        for c in range(max(c0, 0), len(self.index)):
+            rs, nr, base = (int(self.index["row_start"][c]), int(self.index["n_rows"][c]), int(self.index["base_ms"][c]))
+            if row >= stop:
+                break
+            hi = min(rs + nr, stop)
+            out[row - start:hi - start] = self.time_offsets[row:hi].astype(np.int64) + base
+            row = hi
+        return out
+
+    def row_range(self, t0_ms: Optional[int] = None, t1_ms: Optional[int] = None) -> Tuple[int, int]:
+        """Rows with t0_ms <= time < t1_ms; only the boundary chunks are read."""
+        start = 0 if t0_ms is None else self._search(t0_ms)
+        stop = len(self) if t1_ms is None else self._search(t1_ms)
+        return start, max(start, stop)
+
+    def _search(self, t_ms: int) -> int:
+        c = int(np.searchsorted(self.index["last_ms"], t_ms, side="left"))
+        if c >= len(self.index):
+            return len(self)
+        rs, nr, base = (int(self.index["row_start"][c]), int(self.index["n_rows"][c]), int(self.index["base_ms"][c]))
+        off = max(t_ms - base, 0)
+        return rs + int(np.searchsorted(self.time_offsets[rs:rs + nr], off, side="left"))
+
+    def slice_time(self, t0_s: Optional[float] = None, t1_s: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(time_ms int64, adc uint16 memmap view) for t0_s <= t < t1_s (seconds since reset)."""
+        start, stop = self.row_range(
+            None if t0_s is None else int(round(t0_s * 1000.0)),
+            None if t1_s is None else int(round(t1_s * 1000.0)),
+        )
+        return self._rows_time_ms(start, stop), self.adc[start:stop]
+
+    def iter_chunks(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """(time_ms float64, adc float64) per stored chunk, like read_firmware_csv_chunks."""
+        for rs, nr, base, _ in self.index:
+            rs, nr = int(rs), int(nr)
+            t_ms = self.time_offsets[rs:rs + nr].astype(np.int64) + int(base)
+            yield t_ms.astype(float), self.adc[rs:rs + nr].astype(float)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert firmware CSV logs to the columnar .airmlog layout.")
+    parser.add_argument("csv", nargs="+", help="firmware CSV log(s)")
+    parser.add_argument("--out", default=None, help="output directory (single input only)")
+    parser.add_argument("--chunk-rows", type=int, default=65536)
+    args = parser.parse_args()
+    if args.out is not None and len(args.csv) > 1:
+        parser.error("--out requires a single input file")
+
+    for path in args.csv:
+        meta = ingest_csv(path, out_dir=args.out, chunk_rows=args.chunk_rows)
+        print(
+            f"{path}: rows={meta['n_rows']} chunks={meta['n_chunks']} "
+            f"rollovers={meta['n_millis_rollovers']} skipped={meta['n_skipped_lines']} "
+            f"non-monotonic={meta['n_dropped_nonmonotonic']} "
+            f"status={meta['status_counts']} sha256={meta['source_sha256'][:12]}"
+        )
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+AIRM Hardware Parameter Map — hardware_map.py
+---------------------------------------------
+GO-threshold alpha as a function of the hardware parameters (I0, kappa, Q,
+noise_asd_rad_sqrt_hz, fs_hz), to compare candidate fibers and optical
+levers without editing SimConfig by hand.
+
+- points: a full grid (`points` log-spaced values per axis) or a Latin
+  hypercube of `samples` points in log space over the given ranges; fields
+  without a range keep the base SimConfig value
+- every point goes through derived_params first: infeasible points (fs too
+  low for f0, trim / decimation limits) are pruned before anything is
+  integrated and recorded with the reason
+- per point: null distribution (n_null draws) + adaptive threshold search
+  (adaptive_sweep.py) over [alpha_min, alpha_max]; no run directory
+- scheduling: the noise level does not enter the equation of motion, so
+  points differing only in noise_asd_rad_sqrt_hz form one task and share
+  their noise-free trajectories (null and every alpha the searches visit).
+  Demodulation plans depend only on (fs, f0) for a given base config and
+  are cached per process. Tasks run on a pool of cfg.workers processes,
+  each task single-threaded.
+- every point draws its noise from the same cfg.seed streams (common
+  random numbers), so neighbouring points differ by the hardware, not by
+  the draw
+
+Output (out_dir):
+    hardware_map.npz   names, values (n_points x n_params), feasible,
+                       alpha_threshold, alpha_threshold_sigma, status
+                       (codes into status_names), null_mu_hz, null_sigma_hz,
+                       n_realizations; grid runs also store axis_<name> and
+                       grid_shape so alpha_threshold.reshape(grid_shape) is
+                       the map
+    hardware_map.json  base config, ranges, infeasible points and reasons,
+                       sharing statistics, wall time
+
+    python hardware_map.py [--points 3] [--lhs N] [--workers W]
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, replace
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Sweepable SimConfig fields (all positive scale parameters, sampled in log space)
+HARDWARE_FIELDS = ("I0", "kappa", "Q", "noise_asd_rad_sqrt_hz", "fs_hz")
+
+# Status codes stored in hardware_map.npz (adaptive_sweep statuses + pruned)
+STATUS_NAMES = ("converged", "statistics_limited", "max_evals", "below_alpha_min", "above_alpha_max", "infeasible")
+
+# Demodulation plans kept per worker process
+PLAN_CACHE_SIZE = 4
+
+_PLANS: Dict[Tuple[float, float], object] = {}
+
+
+def sample_points(
+    ranges: Mapping[str, Tuple[float, float]],
+    method: str = "grid",
+    points: int = 3,
+    samples: int = 16,
+    seed: int = 0,
+) -> Tuple[List[str], np.ndarray, Optional[List[np.ndarray]]]:
+    """
+    (names, values of shape (n_points, n_params), grid axes or None).
+    Grid points are ordered like itertools.product over the axes.
+    """
+    names = list(ranges)
+    for name in names:
+        if name not in HARDWARE_FIELDS:
+            raise ValueError(f"'{name}' is not a hardware parameter (expected one of {', '.join(HARDWARE_FIELDS)}).")
+        lo, hi = ranges[name]
+        if not 0.0 < lo <= hi:
+            raise ValueError(f"Range of '{name}' must satisfy 0 < lo <= hi, got ({lo}, {hi}).")
+    log_lo = np.log10([ranges[n][0] for n in names])
+    log_hi = np.log10([ranges[n][1] for n in names])
+    if method == "grid":
+        axes = [np.logspace(a, b, points if b > a else 1) for a, b in zip(log_lo, log_hi)]
+        return names, np.array(list(itertools.product(*axes)), dtype=float).reshape(-1, len(names)), axes
+    if method == "lhs":
+        # One sample per stratum and axis, strata independently permuted
+        rng = np.random.default_rng(seed)
+        u = np.stack([(rng.permutation(samples) + rng.random(samples)) / samples for _ in names], axis=1)
+        return names, 10.0 ** (log_lo + u * (log_hi - log_lo)), None
+    raise ValueError(f"Unknown sampling method {method!r} (expected 'grid' or 'lhs').")
+
+
+def prune(cfg, names: Sequence[str], values: np.ndarray) -> Tuple[List[object], Dict[int, str]]:
+    """Per-point configs (None where infeasible) and {index: derived_params error}."""
+    from sensitivity_analysis import derived_params
+
+    configs: List[object] = []
+    infeasible: Dict[int, str] = {}
+    for i, row in enumerate(values):
+        point = replace(cfg, **dict(zip(names, (float(v) for v in row))))
+        try:
+            derived_params(point)
+        except ValueError as exc:
+            infeasible[i] = str(exc)
+            point = None
+        configs.append(point)
+    return configs, infeasible
+
+
+def trajectory_key(cfg) -> Tuple[float, ...]:
+    """Fields that set the noise-free trajectory (everything hardware but the noise)."""
+    return tuple(float(getattr(cfg, name)) for name in HARDWARE_FIELDS if name != "noise_asd_rad_sqrt_hz")
+
+
+def _plan(cfg, dp: Dict[str, float]):
+    """DemodPlan for cfg, shared by every point with the same (fs, f0) in this process."""
+    from demod_plan import demod_plan_from_config
+
+    key = (float(cfg.fs_hz), float(f"{dp['f0']:.12e}"))
+    if key not in _PLANS:
+        if len(_PLANS) >= PLAN_CACHE_SIZE:
+            _PLANS.pop(next(iter(_PLANS)))
+        _PLANS[key] = demod_plan_from_config(cfg, dp)
+    return _PLANS[key]
+
+
+def _map_task(task: List[Tuple[int, object]]) -> Tuple[List[Tuple[int, Dict[str, object]]], int]:
+    """Points sharing one trajectory key -> ([(index, result), ...], trajectories integrated)."""
+    from adaptive_sweep import adaptive_threshold_search
+    from sensitivity_analysis import GO_SNR_THRESHOLD, derived_params, integrate_theta, run_realization_tasks
+
+    theta_cache: Dict[float, np.ndarray] = {}
+    out = []
+    for index, cfg in task:
+        t_start = time.perf_counter()
+        dp = derived_params(cfg)
+        plan = _plan(cfg, dp)
+        if 0.0 not in theta_cache:
+            theta_cache[0.0] = integrate_theta(0.0, cfg, dp, plan.t_eval)
+        n_null = cfg.n_null if cfg.n_null > 0 else cfg.n_realizations
+        null_true, _ = run_realization_tasks({0: theta_cache[0.0]}, cfg, dp, plan, n=n_null, rows=[0])
+        null_mu = float(np.mean(null_true[0]))
+        null_sigma = float(np.std(null_true[0], ddof=1))
+        search = adaptive_threshold_search(
+            cfg, dp, plan, null_mu, null_sigma, GO_SNR_THRESHOLD, theta_cache=theta_cache
+        )["summary"]
+        out.append((index, {
+            "status": search["status"],
+            "alpha_threshold": search["alpha_threshold"],
+            "alpha_threshold_sigma": search["alpha_threshold_sigma"],
+            "null_mu_hz": null_mu,
+            "null_sigma_hz": null_sigma,
+            "n_realizations": n_null + search["n_realizations_total"],
+            "wall_s": time.perf_counter() - t_start,
+        }))
+    return out, len(theta_cache)
+
+
+def run_hardware_map(
+    cfg,
+    ranges: Mapping[str, Tuple[float, float]],
+    method: str = "grid",
+    points: int = 3,
+    samples: int = 16,
+    out_dir: Optional[str] = None,
+) -> Dict[str, object]:
+    """
+    Threshold-alpha map over `ranges` ({field: (lo, hi)}) around the base
+    config `cfg`. Returns the arrays stored in hardware_map.npz plus the
+    JSON metadata; writes both when out_dir is given.
+    """
+    if (cfg.n_null if cfg.n_null > 0 else cfg.n_realizations) < 2:
+        raise ValueError("The map needs n_null (or n_realizations) >= 2 for a null spread.")
+    names, values, axes = sample_points(ranges, method=method, points=points, samples=samples, seed=cfg.seed)
+    configs, infeasible = prune(replace(cfg, workers=1, profile=False), names, values)
+    print(f"[map] {len(values)} points, {len(infeasible)} infeasible (pruned)")
+
+    # One task per trajectory key, sorted so equal plans run back to back
+    groups: Dict[Tuple[float, ...], List[Tuple[int, object]]] = {}
+    for i, point in enumerate(configs):
+        if point is not None:
+            groups.setdefault(trajectory_key(point), []).append((i, point))
+    tasks = [groups[key] for key in sorted(groups)]
+
+    t_start = time.perf_counter()
+    if cfg.workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(cfg.workers, len(tasks))) as pool:
+            results = list(pool.map(_map_task, tasks))
+    else:
+        results = [_map_task(task) for task in tasks]
+    wall = time.perf_counter() - t_start
+
+    n = len(values)
+    arrays: Dict[str, np.ndarray] = {
+        "names": np.array(names),
+        "values": values,
+        "feasible": np.array([point is not None for point in configs]),
+        "alpha_threshold": np.full(n, np.nan),
+        "alpha_threshold_sigma": np.full(n, np.nan),
+        "status": np.full(n, STATUS_NAMES.index("infeasible"), dtype=np.int8),
+        "status_names": np.array(STATUS_NAMES),
+        "null_mu_hz": np.full(n, np.nan),
+        "null_sigma_hz": np.full(n, np.nan),
+        "n_realizations": np.zeros(n, dtype=np.int32),
+    }
+    for rows, _ in results:
+        for i, r in rows:
+            arrays["status"][i] = STATUS_NAMES.index(r["status"])
+            for key in ("alpha_threshold", "alpha_threshold_sigma"):
+                if r[key] is not None:
+                    arrays[key][i] = r[key]
+            for key in ("null_mu_hz", "null_sigma_hz", "n_realizations"):
+                arrays[key][i] = r[key]
+    if axes is not None:
+        arrays["grid_shape"] = np.array([a.size for a in axes])
+        arrays.update({f"axis_{name}": axis for name, axis in zip(names, axes)})
+
+    meta: Dict[str, object] = {
+        "base_config": asdict(cfg),
+        "ranges": {k: list(v) for k, v in ranges.items()},
+        "method": method,
+        "n_points": n,
+        "n_feasible": n - len(infeasible),
+        "infeasible": {str(i): reason for i, reason in infeasible.items()},
+        "n_tasks": len(tasks),
+        "n_trajectories": int(sum(k for _, k in results)),
+        "wall_s": wall,
+    }
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+        np.savez_compressed(os.path.join(out_dir, "hardware_map.npz"), **arrays)
+        with open(os.path.join(out_dir, "hardware_map.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+    return {"arrays": arrays, "meta": meta}
+
+
+def print_map(result: Dict[str, object]) -> None:
+    arrays, meta = result["arrays"], result["meta"]
+    names = [str(n) for n in arrays["names"]]
+    print("\n=== HARDWARE MAP ===")
+    print(" | ".join(f"{n:>12s}" for n in names) + " | alpha_threshold        | status")
+    for i, row in enumerate(arrays["values"]):
+        a, s = arrays["alpha_threshold"][i], arrays["alpha_threshold_sigma"][i]
+        thr = f"{a:.3e} +/- {s:.1e}" if math.isfinite(a) else "-"
+        print(" | ".join(f"{v:12.3e}" for v in row) + f" | {thr:22s} | {arrays['status_names'][arrays['status'][i]]}")
+    print(
+        f"{meta['n_feasible']}/{meta['n_points']} feasible | {meta['n_tasks']} tasks | "
+        f"{meta['n_trajectories']} trajectories | wall={meta['wall_s']:.1f} s"
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from sensitivity_analysis import SimConfig
+
+    ap = argparse.ArgumentParser(description="Threshold-alpha map over kappa x noise (demo ranges).")
+    ap.add_argument("--points", type=int, default=3)
+    ap.add_argument("--lhs", type=int, default=0, help="Latin-hypercube samples instead of the grid")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    cfg = SimConfig(
+        duration_s=12.0 * 3600.0, fs_hz=1.0, solver="exact", n_realizations=8, workers=args.workers,
+        theta0_rad=1.0e-4, alpha_min=1.0e-11, alpha_max=1.0e-6,
+    )
+    # kappa = 1e-2 puts f0 at 0.5 Hz, too high for fs = 1 Hz: pruned
+    ranges = {"kappa": (1.0e-4, 1.0e-2), "noise_asd_rad_sqrt_hz": (3.0e-9, 3.0e-8)}
+    result = run_hardware_map(
+        cfg, ranges, method="lhs" if args.lhs else "grid", points=args.points, samples=args.lhs
+    )
+    print_map(result)
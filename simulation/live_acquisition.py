@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+AIRM Live Acquisition — live_acquisition.py
+-------------------------------------------
+asyncio service that reads the `Time_ms,Theta_ADC,Status` stream of
+InertiaSpinner.ino (Docs/Analysis.md §2) from a serial port, a pty or a
+pipe while the run is in progress:
+
+    <out>/raw.csv      # every byte received, in order (firmware_log.ingest_csv input)
+    <out>/live.jsonl   # one status record per publish interval
+
+The reader is an event-loop callback (loop.add_reader) that only appends
+bytes to a buffer, so the port is drained no matter what the rest of the
+service is doing. Disk writes run on a single I/O thread, one in flight at
+a time, so raw.csv is written in arrival order without blocking the loop.
+If the buffer ever reaches MAX_PENDING_BYTES the reader pauses and the
+kernel tty buffer holds the rest; nothing is discarded.
+
+Complete lines are parsed with the firmware_log.py rules (vectorized fast
+path, millis() rollover unwrap) and fed, as theta_rad = (Theta_ADC -
+adc_offset) * K, to the causal StreamingDemodulator. Every publish_s of
+firmware time a record is published with
+
+    delta_f_hz       mean detrended delta_f over the last interval
+    amp_target_hz    coherent amplitude at f_target since the start
+    amp_false_hz     same at f_false (Gate-0 wrong-frequency channel)
+    snr              amp_target / median amplitude at LIVE_NOISE_REFS
+                     off-target frequencies above f_target
+
+plus line / row / gap counters (each covering the stream up to the
+record's t_s, however the bytes arrived) and the resident set size.
+Estimates lag the stream by the demodulator's trim_s hold-back.
+
+Memory is bounded by MAX_PENDING_BYTES plus the demodulator's
+O(trim_s * fs) state, independent of how long the acquisition runs.
+
+    python -m airm live --port /dev/ttyACM0 --rad-per-adc K [--out DIR]
+    python live_acquisition.py --demo-hours 24     # emulated firmware on a local pty
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from firmware_log import _parse_block, _unwrap_millis
+from out_of_core import current_rss_bytes
+from streaming_demod import StreamingDemodulator
+
+# Tier-1 firmware: Serial.begin(9600), one row per log_interval_ms = 1000
+FIRMWARE_BAUD = 9600
+FIRMWARE_FS_HZ = 1.0
+
+# Firmware time between published records
+LIVE_PUBLISH_S = 300.0
+
+# Noise references: LIVE_NOISE_REFS frequencies f_target + k * LIVE_NOISE_STEP_HZ,
+# k = 2 .. LIVE_NOISE_REFS + 1 (above f_target, clear of f_spin and f_spin - f_sid)
+LIVE_NOISE_STEP_HZ = 1.0e-5
+LIVE_NOISE_REFS = 10
+
+# A row spacing above GAP_FACTOR nominal intervals counts as a gap
+GAP_FACTOR = 1.5
+
+READ_BYTES = 1 << 16
+MAX_PENDING_BYTES = 1 << 22
+
+
+def open_serial(path: str, baud: int = FIRMWARE_BAUD) -> int:
+    """Non-blocking fd of `path`; a tty (serial port or pty) is set raw at `baud`."""
+    import termios
+    import tty
+
+    fd = os.open(path, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+    if os.isatty(fd):
+        speed = getattr(termios, f"B{int(baud)}", None)
+        if speed is None:
+            os.close(fd)
+            raise ValueError(f"Unsupported baud rate {baud}.")
+        tty.setraw(fd, termios.TCSANOW)  # the default TCSAFLUSH would discard rows already queued
+        attrs = termios.tcgetattr(fd)
+        attrs[2] |= termios.CLOCAL | termios.CREAD
+        attrs[4] = attrs[5] = speed
+        termios.tcsetattr(fd, termios.TCSANOW, attrs)
+    return fd
+
+
+class LiveAcquisition:
+    """
+    One acquisition from the readable, non-blocking fd `fd` into `out_dir`.
+    run() returns when the stream ends (EOF / peer closed) or `stop` is set.
+    """
+
+    def __init__(
+        self,
+        fd: int,
+        out_dir: str,
+        demod: StreamingDemodulator,
+        rad_per_adc: float,
+        adc_offset: float = 0.0,
+        publish_s: float = LIVE_PUBLISH_S,
+        on_publish: Optional[Callable[[Dict[str, object]], None]] = None,
+    ) -> None:
+        if len(demod.f_refs) < 3:
+            raise ValueError("demod.f_refs must be (f_target, f_false, noise references...).")
+        self.fd = fd
+        self.out_dir = out_dir
+        self.demod = demod
+        self.rad_per_adc = float(rad_per_adc)
+        self.adc_offset = float(adc_offset)
+        self.publish_s = float(publish_s)
+        self.on_publish = on_publish
+        self.interval_ms = 1000.0 / demod.fs_hz
+
+        self._buf = bytearray()
+        self._partial = b""
+        self._wake: Optional[asyncio.Event] = None
+        self._reading = False
+        self._eof = False
+        self._unwrap = {"wrap_offset": 0, "last_ms": -1}
+        self._next_publish: Optional[float] = None
+        self._t_fed = 0.0  # firmware time [s] of the last row fed to the demodulator
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="airm-live-io")
+
+        self.counts = {
+            "bytes": 0,
+            "lines": 0,
+            "rows": 0,
+            "skipped_lines": 0,
+            "dropped_nonmonotonic": 0,
+            "millis_rollovers": 0,
+            "gaps": 0,
+            "missing_rows": 0,
+            "reader_pauses": 0,
+            "published": 0,
+        }
+        self.status_counts: Dict[str, int] = {}
+        self.peak_pending_bytes = 0
+        self.peak_rss_bytes = 0
+        self.last: Optional[Dict[str, object]] = None
+
+    # -------- reader (event-loop callback) --------
+
+    def _on_readable(self) -> None:
+        try:
+            data = os.read(self.fd, READ_BYTES)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""  # EIO: the pty / serial peer went away
+        if data:
+            self._buf += data
+            self.peak_pending_bytes = max(self.peak_pending_bytes, len(self._buf))
+            if len(self._buf) >= MAX_PENDING_BYTES:
+                self._pause()
+                self.counts["reader_pauses"] += 1
+        else:
+            self._pause()
+            self._eof = True
+        self._wake.set()
+
+    def _pause(self) -> None:
+        if self._reading:
+            asyncio.get_running_loop().remove_reader(self.fd)
+            self._reading = False
+
+    def _resume(self) -> None:
+        if not self._reading and not self._eof:
+            asyncio.get_running_loop().add_reader(self.fd, self._on_readable)
+            self._reading = True
+
+    # -------- consumer --------
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> Dict[str, object]:
+        loop = asyncio.get_running_loop()
+        os.makedirs(self.out_dir, exist_ok=True)
+        raw = open(os.path.join(self.out_dir, "raw.csv"), "ab")
+        records = open(os.path.join(self.out_dir, "live.jsonl"), "a", encoding="utf-8")
+        self._wake = asyncio.Event()
+        stopper = None
+        if stop is not None:
+            async def _stop() -> None:
+                await stop.wait()
+                self._wake.set()
+            stopper = asyncio.ensure_future(_stop())
+        pending = None
+        self._resume()
+        try:
+            while True:
+                await self._wake.wait()
+                self._wake.clear()
+                data = bytes(self._buf)
+                self._buf.clear()
+                self._resume()
+                if data:
+                    # At most one write in flight: ordered, and bounded by MAX_PENDING_BYTES
+                    if pending is not None:
+                        await pending
+                    pending = loop.run_in_executor(self._io, raw.write, data)
+                    for rec in self._consume(data):
+                        await loop.run_in_executor(self._io, _append_record, records, rec, raw)
+                if self._eof or (stop is not None and stop.is_set()):
+                    break
+            if pending is not None:
+                await pending
+            # Final record for whatever followed the last publish boundary
+            rec = self._record()
+            if rec is not None:
+                await loop.run_in_executor(self._io, _append_record, records, rec, raw)
+        finally:
+            self._pause()
+            if stopper is not None:
+                stopper.cancel()
+            raw.close()
+            records.close()
+            self._io.shutdown(wait=True)
+        return self.summary()
+
+    def _consume(self, data: bytes) -> List[Dict[str, object]]:
+        """Parse the complete lines in data, feed the demodulator, return due records."""
+        lines = (self._partial + data).split(b"\n")
+        self._partial = lines.pop()
+        if not lines:
+            return []
+        lines = [line + b"\n" for line in lines]
+        t_raw, adc, status, _, row_line = _parse_block(lines, line_index=True)
+        for key, count in status.items():
+            self.status_counts[key] = self.status_counts.get(key, 0) + count
+
+        # Per-line byte offsets and skip flags, so every counter can be
+        # attributed to the publish interval its line belongs to
+        line_end = np.cumsum([len(line) for line in lines])
+        skip = np.ones(len(lines), dtype=bool)
+        skip[row_line] = False
+        for i in np.flatnonzero(skip):
+            skip[i] = bool(lines[i].strip())
+
+        wrap_before = self._unwrap["wrap_offset"]
+        last_ms = self._unwrap["last_ms"]
+        t_ms, keep, _ = _unwrap_millis(t_raw, self._unwrap)
+        kept = np.flatnonzero(keep)
+        t_ms, adc = t_ms[kept], adc[kept]
+        offsets = t_ms - t_raw[kept]
+        # Spacing before each kept row (the very first row has no predecessor)
+        steps = np.diff(t_ms, prepend=last_ms if last_ms >= 0 else t_ms[:1])
+        t_s = t_ms / 1000.0
+        theta = (adc - self.adc_offset) * self.rad_per_adc
+        if self._next_publish is None and t_s.size:
+            self._next_publish = float(t_s[0]) + self.publish_s
+
+        def count(lo: int, hi: int, line_lo: int, line_hi: int, prev_offset: int) -> None:
+            """Counters for kept rows lo..hi-1 and lines line_lo..line_hi-1."""
+            c = self.counts
+            c["lines"] += line_hi - line_lo
+            if line_hi > line_lo:
+                c["bytes"] += int(line_end[line_hi - 1] - (line_end[line_lo - 1] if line_lo else 0))
+            c["skipped_lines"] += int(np.count_nonzero(skip[line_lo:line_hi]))
+            rows_in = (row_line >= line_lo) & (row_line < line_hi)
+            c["dropped_nonmonotonic"] += int(np.count_nonzero(rows_in & ~keep))
+            c["rows"] += hi - lo
+            c["millis_rollovers"] += int(np.count_nonzero(np.diff(offsets[lo:hi], prepend=prev_offset)))
+            gaps = steps[lo:hi][steps[lo:hi] > GAP_FACTOR * self.interval_ms]
+            c["gaps"] += gaps.size
+            c["missing_rows"] += int(np.sum(np.round(gaps / self.interval_ms) - 1))
+
+        # Split at publish boundaries so records do not depend on how bytes
+        # arrived: a record counts exactly the lines up to its last row
+        out = []
+        lo = line_lo = 0
+        prev_offset = wrap_before
+        while self._next_publish is not None:
+            hi = int(np.searchsorted(t_s, self._next_publish, side="left"))
+            if hi >= t_s.size:
+                break
+            line_hi = int(row_line[kept[hi]])
+            self._feed(t_s[lo:hi], theta[lo:hi])
+            count(lo, hi, line_lo, line_hi, prev_offset)
+            if hi > lo:
+                prev_offset = int(offsets[hi - 1])
+            rec = self._record()
+            if rec is not None:
+                out.append(rec)
+            self._next_publish += self.publish_s
+            lo, line_lo = hi, line_hi
+        self._feed(t_s[lo:], theta[lo:])
+        count(lo, t_s.size, line_lo, len(lines), prev_offset)
+        return out
+
+    def _feed(self, t_s: np.ndarray, theta: np.ndarray) -> None:
+        if t_s.size:
+            self.demod.process(t_s, theta)
+            self._t_fed = float(t_s[-1])
+
+    def _record(self) -> Optional[Dict[str, object]]:
+        snap = self.demod.snapshot()
+        if snap is None:
+            return None
+        amps = snap["amplitude_hz"]
+        noise = float(np.median(amps[2:]))
+        rss = current_rss_bytes()
+        if rss is not None:
+            self.peak_rss_bytes = max(self.peak_rss_bytes, rss)
+        rec = {
+            "utc": datetime.utcnow().isoformat() + "Z",
+            "t_s": self._t_fed,
+            "delta_f_hz": snap["delta_f_hz"],
+            "amp_target_hz": amps[0],
+            "amp_false_hz": amps[1],
+            "noise_amp_hz": noise,
+            "snr": amps[0] / noise if noise > 0 else float("nan"),
+            "n_samples_used": snap["n_samples_used"],
+            "pending_bytes": len(self._buf),
+            "rss_mb": None if rss is None else rss / 2**20,
+            **self.counts,
+        }
+        self.counts["published"] += 1
+        self.last = rec
+        if self.on_publish is not None:
+            self.on_publish(rec)
+        return rec
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "out_dir": self.out_dir,
+            "f_refs_hz": list(self.demod.f_refs),
+            "counts": dict(self.counts),
+            "status_counts": dict(self.status_counts),
+            "unterminated_bytes": len(self._partial),
+            "peak_pending_bytes": self.peak_pending_bytes,
+            "peak_rss_mb": self.peak_rss_bytes / 2**20 if self.peak_rss_bytes else None,
+            "last": self.last,
+        }
+
+
+def _append_record(records, rec: Dict[str, object], raw) -> None:
+    """I/O thread: append one record and make raw.csv durable up to this point."""
+    records.write(json.dumps(rec) + "\n")
+    records.flush()
+    raw.flush()
+    os.fsync(raw.fileno())
+
+
+def live_refs(dp: Dict[str, float]) -> List[float]:
+    """(f_target, f_false, noise references...) projected by the live demodulator."""
+    noise = [dp["f_target"] + k * LIVE_NOISE_STEP_HZ for k in range(2, LIVE_NOISE_REFS + 2)]
+    return [dp["f_target"], dp["f_false"], *noise]
+
+
+def acquisition_from_config(
+    cfg,
+    fd: int,
+    out_dir: str,
+    rad_per_adc: float,
+    adc_offset: float = 0.0,
+    publish_s: float = LIVE_PUBLISH_S,
+    on_publish: Optional[Callable[[Dict[str, object]], None]] = None,
+) -> LiveAcquisition:
+    """LiveAcquisition with f0, f_target, the low-pass and trim from a SimConfig."""
+    from sensitivity_analysis import derived_params
+
+    dp = derived_params(cfg)
+    demod = StreamingDemodulator(dp["f0"], cfg.fs_hz, cfg.lp_cutoff_hz, cfg.lp_order, cfg.trim_s, live_refs(dp))
+    return LiveAcquisition(fd, out_dir, demod, rad_per_adc, adc_offset, publish_s, on_publish)
+
+
+def print_record(rec: Dict[str, object]) -> None:
+    print(
+        f"[live] t={rec['t_s'] / 3600.0:7.2f} h | rows={rec['rows']} gaps={rec['gaps']} "
+        f"skipped={rec['skipped_lines']} | delta_f={rec['delta_f_hz']:+.3e} Hz "
+        f"A(f_target)={rec['amp_target_hz']:.3e} Hz A(f_false)={rec['amp_false_hz']:.3e} Hz "
+        f"SNR={rec['snr']:.2f}"
+    )
+
+
+# ----------------------------- Demo (pty stand-in) -----------------------------
+
+async def run_pty_demo(cfg, alpha: float, rad_per_adc: float, out_dir: str, speed: float = 0.0) -> Dict[str, object]:
+    """An emulated firmware run (firmware_emulator.py) on a local pty; the service reads the other end."""
+    from firmware_emulator import DEFAULT_ADC_OFFSET, Sink, emit, emulated_blocks
+
+    sink = Sink("pty")
+    fd = open_serial(sink.path, FIRMWARE_BAUD)
+    acq = acquisition_from_config(cfg, fd, out_dir, rad_per_adc, DEFAULT_ADC_OFFSET, on_publish=print_record)
+
+    def produce() -> Dict[str, object]:
+        sent = emit(emulated_blocks(cfg, alpha, rad_per_adc), sink.write, speed)
+        # Hanging up discards whatever the slave side has not read yet, so
+        # wait until every byte has reached the service
+        while acq.counts["bytes"] < sent["bytes"]:
+            time.sleep(0.01)
+        sink.close()
+        return sent
+
+    loop = asyncio.get_running_loop()
+    producer = loop.run_in_executor(None, produce)
+    try:
+        summary = await acq.run()
+        sent = await producer
+    finally:
+        os.close(fd)
+    summary["sent_lines"] = sent["lines"]
+    return summary
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from airm.artifacts import output_dir
+    from sensitivity_analysis import SimConfig
+
+    ap = argparse.ArgumentParser(description="Live acquisition of a simulated firmware run over a local pty.")
+    ap.add_argument("--demo-hours", type=float, default=24.0)
+    ap.add_argument("--alpha", type=float, default=1.0e-6, help="injected alpha of the simulated run")
+    ap.add_argument("--rad-per-adc", type=float, default=1.0e-6)
+    ap.add_argument("--speed", type=float, default=0.0, help="emulator pace in x real time (0 = as fast as possible)")
+    ap.add_argument("--out", default=None, help="output directory (default runs/<UTC>-live/)")
+    args = ap.parse_args()
+
+    # ~400-count carrier; readout noise of ~1 count RMS dithers the 10-bit
+    # quantization (without it the quantized ringdown leaves spurs in delta_f)
+    cfg = SimConfig(
+        fs_hz=FIRMWARE_FS_HZ,
+        duration_s=args.demo_hours * 3600.0,
+        theta0_rad=400.0 * args.rad_per_adc,
+        noise_asd_rad_sqrt_hz=math.sqrt(2.0) * args.rad_per_adc,
+        ivp_method="DOP853",
+    )
+    out_dir = output_dir("live", args.out)
+    t_start = time.perf_counter()
+    summary = asyncio.run(run_pty_demo(cfg, args.alpha, args.rad_per_adc, out_dir, args.speed))
+    wall = time.perf_counter() - t_start
+    print(
+        f"sent={summary['sent_lines']} lines received={summary['counts']['lines']} "
+        f"rows={summary['counts']['rows']} skipped={summary['counts']['skipped_lines']} | "
+        f"{cfg.duration_s / wall:.0f}x real time | peak RSS {summary['peak_rss_mb']:.0f} MiB"
+    )
+    print(f"outputs: {out_dir}")
@@ -0,0 +1,597 @@
+#!/usr/bin/env python3
+"""
+AIRM Out-of-Core Mode — out_of_core.py
+--------------------------------------
+Memory-bounded version of
+
+    integrate -> + noise -> IQ mix at f0 -> low-pass -> trim/decimate ->
+    unwrap -> detrend -> delta_f -> coherent projection / narrowband PSD
+
+for simulated durations whose full-rate arrays do not fit in RAM (a 30-day
+campaign at 5 Hz is 13M samples, ~100 MB per float64 array and a dozen
+arrays per realization on the batch path).
+
+- Integration runs in segments; each segment starts from the
+  (theta, theta_dot) state at the last sample of the previous one
+  (the configured solve_ivp backend, or the exact stepper via
+  run_state_exact_params).
+- Full-length intermediates live in raw files in a work directory and are
+  touched only through short-lived np.memmap windows, so they occupy the
+  page cache, not this process's resident set.
+- The zero-phase low-pass reproduces scipy's sosfiltfilt (odd extension,
+  steady-state initial conditions) as a chunked forward pass to disk and a
+  chunked backward pass, with the filter state carried across chunks.
+- Unwrapping carries the last phase across chunks, the linear detrend uses
+  running least-squares sums, the derivative reads a 2-sample halo around
+  each chunk, and projection sums / PSD segments are accumulated per
+  chunk (Projector.sums with start=..., ZoomSpectrum.update).
+
+With float64 storage every result matches the batch path to rounding
+(solve_ivp also restarts its step-size control at segment boundaries).
+
+Precision: the noise-free trajectory and the forward-filtered I/Q are
+stored as float32 only when float32 rounding of the largest |theta| seen,
+max|theta| * 2^-23 / sqrt(12) rms, is below FLOAT32_NOISE_FRACTION of the
+readout noise at that stage (per sample for theta; after the low-pass,
+noise_rms * sqrt(lp_cutoff / fs), for I/Q). Phase and delta_f are always
+float64: the unwrapped phase grows while the signal stays ~1e-8 rad.
+
+RAM budget: chunk and segment lengths are derived from the budget left
+after the fixed tables of a stage (projector, spectrum), and the resident
+set is checked against it (growth over the value at construction, from
+/proc/self/statm) after every chunk; MemoryBudgetExceeded is raised when it
+is exceeded or when the budget cannot hold a single chunk. preflight()
+sizes every stage before any work, so the latter fails before integrating.
+
+    python out_of_core.py [--days 2] [--budget-mb 64]
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.signal import butter, sosfilt, sosfilt_zi
+
+import profiling
+from demod_plan import _derivative, max_decimation
+from projection import Projector
+from systematics import require_constant_stiffness, require_white_noise
+from zoom_psd import ZoomSpectrum
+
+# Working-set estimates (bytes per sample of one chunk / segment), used to
+# size chunks from the budget; the resident-set check is the enforcement
+DEMOD_BYTES_PER_SAMPLE = 160
+INTEGRATE_BYTES_PER_SAMPLE = 256
+SPECTRUM_BYTES_PER_SAMPLE = 64  # per sample of each (overlapping) segment
+
+# Share of the budget, after a stage's fixed tables, one chunk's working set
+# may take (the rest covers filter state and allocator slack)
+BUDGET_CHUNK_FRACTION = 0.5
+
+# float32 storage only if its rounding stays below this share of the noise
+FLOAT32_NOISE_FRACTION = 1.0e-3
+
+
+class MemoryBudgetExceeded(MemoryError):
+    pass
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Current resident set size (Linux /proc); None where unavailable."""
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class MemoryBudget:
+    """RAM budget of one out-of-core run: chunk sizing + resident-set checks."""
+
+    def __init__(self, budget_mb: float) -> None:
+        if budget_mb <= 0:
+            raise ValueError("budget_mb must be positive.")
+        self.budget_bytes = int(budget_mb * 2**20)
+        self.baseline = current_rss_bytes()
+        self.peak_bytes = 0
+
+    def chunk(self, bytes_per_sample: float, minimum: int = 1, multiple: int = 1, fixed: int = 0) -> int:
+        """
+        Samples per chunk for this working-set density (a multiple of
+        `multiple`), next to `fixed` bytes of tables held for the stage.
+        """
+        n = int(max(0, self.budget_bytes - fixed) * BUDGET_CHUNK_FRACTION // bytes_per_sample)
+        n -= n % multiple
+        if n < max(minimum, multiple):
+            need = (max(minimum, multiple) * bytes_per_sample / BUDGET_CHUNK_FRACTION + fixed) / 2**20
+            raise MemoryBudgetExceeded(
+                f"budget of {self.budget_bytes / 2**20:.1f} MiB cannot hold one chunk (need >= {need:.1f} MiB)."
+            )
+        return n
+
+    def check(self, where: str) -> None:
+        rss = current_rss_bytes()
+        if rss is None or self.baseline is None:
+            return
+        used = rss - self.baseline
+        self.peak_bytes = max(self.peak_bytes, used)
+        if used > self.budget_bytes:
+            raise MemoryBudgetExceeded(
+                f"{where}: resident set grew by {used / 2**20:.1f} MiB, budget is {self.budget_bytes / 2**20:.1f} MiB."
+            )
+
+
+class DiskArray:
+    """1-D array in a raw file, read and written through short-lived np.memmap windows."""
+
+    def __init__(self, path: str, n: int, dtype) -> None:
+        self.path = path
+        self.n = int(n)
+        self.dtype = np.dtype(dtype)
+        with open(path, "wb") as f:
+            f.truncate(self.n * self.dtype.itemsize)
+
+    def _window(self, lo: int, n: int, mode: str) -> np.memmap:
+        return np.memmap(self.path, dtype=self.dtype, mode=mode, offset=lo * self.dtype.itemsize, shape=(n,))
+
+    def read(self, lo: int, hi: int) -> np.ndarray:
+        """Samples lo .. hi - 1 as an in-memory float64 array."""
+        if hi <= lo:
+            return np.empty(0)
+        mm = self._window(lo, hi - lo, "r")
+        out = np.array(mm, dtype=float)
+        del mm
+        return out
+
+    def write(self, lo: int, values: np.ndarray) -> None:
+        if len(values) == 0:
+            return
+        mm = self._window(lo, len(values), "r+")
+        mm[:] = values
+        del mm
+
+    def remove(self) -> None:
+        os.remove(self.path)
+
+
+def float32_allowed(peak: float, noise_rms: float) -> bool:
+    """float32 rounding rms of values up to `peak` is below FLOAT32_NOISE_FRACTION * noise_rms."""
+    rounding_rms = peak * float(np.finfo(np.float32).eps) / math.sqrt(12.0)
+    return rounding_rms <= FLOAT32_NOISE_FRACTION * noise_rms
+
+
+class OutOfCoreRun:
+    """
+    One trajectory (integrate) and any number of noise realizations on top of
+    it (realization), within a RAM budget. Use as a context manager; a work
+    directory created here is removed on exit.
+    """
+
+    def __init__(
+        self,
+        cfg,
+        dp: Dict[str, float],
+        budget_mb: float,
+        work_dir: Optional[str] = None,
+        float32: bool = True,
+    ) -> None:
+        require_white_noise(cfg, "out-of-core mode")
+        self.cfg = cfg
+        self.dp = dp
+        self.budget = MemoryBudget(budget_mb)
+        self.float32 = bool(float32)
+        self._own_dir = work_dir is None
+        self.work_dir = tempfile.mkdtemp(prefix="airm-ooc-") if work_dir is None else work_dir
+        os.makedirs(self.work_dir, exist_ok=True)
+
+        self.dt = dp["dt"]
+        # Same length and sample times (i * dt) as np.arange(0, duration_s, dt)
+        self.n = int(math.ceil(cfg.duration_s / self.dt))
+        self.sos = butter(cfg.lp_order, cfg.lp_cutoff_hz / (cfg.fs_hz / 2.0), btype="low", output="sos")
+        self.zi = sosfilt_zi(self.sos)
+        # sosfiltfilt's default odd-extension length
+        ntaps = 2 * len(self.sos) + 1 - min(int((self.sos[:, 2] == 0).sum()), int((self.sos[:, 5] == 0).sum()))
+        self.edge = 3 * ntaps
+        if self.n <= self.edge:
+            raise ValueError(f"duration_s too short: need more than {self.edge} samples.")
+
+        q = int(cfg.decimate)
+        if not 1 <= q <= max_decimation(cfg.fs_hz, cfg.lp_cutoff_hz):
+            raise ValueError(f"decimate={q} not allowed for fs={cfg.fs_hz} Hz, lp_cutoff={cfg.lp_cutoff_hz} Hz.")
+        self.decimate = q
+        # Kept samples k0, k0 + q, ... <= k1: the batch trim mask
+        # (t >= trim_s) & (t <= duration_s - trim_s), then every q-th
+        k0 = int(math.ceil(cfg.trim_s / self.dt))
+        while k0 > 0 and (k0 - 1) * self.dt >= cfg.trim_s:
+            k0 -= 1
+        while k0 * self.dt < cfg.trim_s:
+            k0 += 1
+        k1 = min(self.n - 1, int(math.floor((cfg.duration_s - cfg.trim_s) / self.dt)))
+        while k1 * self.dt > cfg.duration_s - cfg.trim_s:
+            k1 -= 1
+        while k1 + 1 < self.n and (k1 + 1) * self.dt <= cfg.duration_s - cfg.trim_s:
+            k1 += 1
+        if k1 - k0 < 2 * q:
+            raise ValueError("trim_s too large relative to duration_s.")
+        self.k0 = k0
+        self.n_keep = (k1 - k0) // q + 1
+        self.h = self.dt * q
+        t_first = k0 * self.dt
+        t_last = (k0 + (self.n_keep - 1) * q) * self.dt
+        self.t_mean = 0.5 * (t_first + t_last)
+        self.t_ss = self.h * self.h * self.n_keep * (self.n_keep * self.n_keep - 1) / 12.0
+
+        self.theta: Optional[DiskArray] = None
+        self.delta_f: Optional[DiskArray] = None
+        self.precision: Dict[str, object] = {}
+        self._projectors: Dict[Tuple[float, ...], Projector] = {}
+
+    def __enter__(self) -> "OutOfCoreRun":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._own_dir:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.work_dir, name)
+
+    def _t_keep(self, lo: int, hi: int) -> np.ndarray:
+        return (self.k0 + self.decimate * np.arange(lo, hi)) * self.dt
+
+    # -------- trajectory --------
+
+    def _segment(self, alpha, t, y, drive_torque) -> Tuple[np.ndarray, Tuple[float, float]]:
+        cfg, dp = self.cfg, self.dp
+        if t.size == 1:
+            return np.array([y[0]]), y
+        if cfg.solver == "exact":
+            from exact_stepper import run_state_exact_params
+
+            require_constant_stiffness(cfg, "solver 'exact'")
+
+            theta, theta_dot = run_state_exact_params(
+                t, alpha, dp["f_target"], cfg.phi, cfg.I0, cfg.kappa, dp["gamma"], y,
+                drive_torque=drive_torque, drive_omega=2.0 * math.pi * dp["f0"],
+            )
+            return theta, (float(theta[-1]), float(theta_dot[-1]))
+        if cfg.solver == "solve_ivp":
+            from solvers import integrate_ivp
+
+            sol = integrate_ivp(alpha, cfg, dp, t, y0=y, t_span=(t[0], t[-1]), drive_torque=drive_torque)
+            return sol.y[0], (float(sol.y[0, -1]), float(sol.y[1, -1]))
+        raise ValueError(f"out-of-core mode supports solver 'solve_ivp' or 'exact', not '{cfg.solver}'.")
+
+    def integrate(self, alpha: float, drive_torque: float = 0.0) -> None:
+        """Noise-free theta in segments with state handoff; picks its storage precision."""
+        seg = self.budget.chunk(INTEGRATE_BYTES_PER_SAMPLE, minimum=2)
+        theta64 = DiskArray(self._path("theta_f64.bin"), self.n, np.float64)
+        y = (float(self.cfg.theta0_rad), float(self.cfg.theta_dot0))
+        peak = 0.0
+        with profiling.stage("integrate", alloc=False):
+            for lo in range(0, self.n, seg):
+                hi = min(self.n, lo + seg)
+                # One extra sample: the state there starts the next segment
+                t = np.arange(lo, min(self.n, hi + 1)) * self.dt
+                theta, y = self._segment(alpha, t, y, drive_torque)
+                theta64.write(lo, theta[:hi - lo])
+                peak = max(peak, float(np.max(np.abs(theta))))
+                self.budget.check("integrate")
+                del theta, t
+
+        noise = self.dp["noise_rms_per_sample"]
+        noise_lp = noise * math.sqrt(self.cfg.lp_cutoff_hz / self.cfg.fs_hz)
+        theta_f32 = self.float32 and float32_allowed(peak, noise)
+        self.filtered_dtype = np.float32 if self.float32 and float32_allowed(peak, noise_lp) else np.float64
+        self.precision = {
+            "theta_max_rad": peak,
+            "theta": "float32" if theta_f32 else "float64",
+            "filtered_iq": np.dtype(self.filtered_dtype).name,
+            "phase": "float64",
+            "delta_f": "float64",
+        }
+        if not theta_f32:
+            self.theta = theta64
+            return
+        self.theta = DiskArray(self._path("theta_f32.bin"), self.n, np.float32)
+        chunk = self.budget.chunk(DEMOD_BYTES_PER_SAMPLE)
+        for lo in range(0, self.n, chunk):
+            self.theta.write(lo, theta64.read(lo, min(self.n, lo + chunk)))
+        theta64.remove()
+
+    def preflight(self, freqs: Sequence[float] = (), psd: Optional[Tuple[Sequence[float], int]] = None) -> None:
+        """
+        Size the chunks of every stage (projection onto freqs, narrowband_psd
+        with psd = (freqs, nperseg)) against the budget; raises
+        MemoryBudgetExceeded now instead of after integrating.
+        """
+        self.budget.chunk(INTEGRATE_BYTES_PER_SAMPLE, minimum=2)
+        self.budget.chunk(DEMOD_BYTES_PER_SAMPLE, minimum=self.edge + 1)
+        self._projection_chunk(self.projector(freqs) if len(freqs) else None)
+        if psd is not None:
+            self._spectrum(*psd)
+
+    # -------- one realization --------
+
+    def projector(self, freqs: Sequence[float]) -> Projector:
+        key = tuple(float(f) for f in freqs)
+        if key not in self._projectors:
+            self._projectors[key] = Projector.uniform_grid(self.k0 * self.dt, self.h, self.n_keep, key)
+        return self._projectors[key]
+
+    def _projection_chunk(self, projector: Optional[Projector]) -> int:
+        if projector is None:
+            return self.budget.chunk(DEMOD_BYTES_PER_SAMPLE)
+        return self.budget.chunk(DEMOD_BYTES_PER_SAMPLE, multiple=projector.block, fixed=projector.nbytes)
+
+    def realization(
+        self,
+        rng: np.random.Generator,
+        freqs: Sequence[float] = (),
+        keep_delta_f: bool = False,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        theta + noise from rng (same draws as one batch-path realization) ->
+        delta_f. Returns (amplitude, phase) at freqs; with keep_delta_f the
+        series is also kept on disk for narrowband_psd().
+        """
+        if self.theta is None:
+            raise RuntimeError("integrate() first.")
+        phase = self._filtered_phase(rng)
+        slope, intercept = self._unwrap_detrend_sums(phase)
+
+        projector = self.projector(freqs) if len(freqs) else None
+        sxc = np.zeros(len(freqs))
+        sxs = np.zeros(len(freqs))
+        if keep_delta_f:
+            self.delta_f = DiskArray(self._path("delta_f.bin"), self.n_keep, np.float64)
+        chunk = self._projection_chunk(projector)
+        for lo in range(0, self.n_keep, chunk):
+            hi = min(self.n_keep, lo + chunk)
+            # 2-sample halo: np.gradient / 4th-order stencil neighbours
+            a, b = max(0, lo - 2), min(self.n_keep, hi + 2)
+            with stage_timer("phase"):
+                u = phase.read(a, b)
+                u -= slope * self._t_keep(a, b) + intercept
+            with stage_timer("derivative"):
+                d = _derivative(u, self.h, high_order=self.decimate > 1)[lo - a:hi - a]
+                d /= 2.0 * np.pi
+            if projector is not None:
+                with stage_timer("projection"):
+                    c, s = projector.sums(d, start=lo)
+                    sxc += c
+                    sxs += s
+            if keep_delta_f:
+                self.delta_f.write(lo, d)
+            self.budget.check("delta_f")
+            del u, d
+        phase.remove()
+        if projector is None:
+            return np.empty(0), np.empty(0)
+        return projector.amplitude_phase(sxc, sxs)
+
+    def _filtered_phase(self, rng: np.random.Generator) -> DiskArray:
+        """Wrapped phase at the kept samples after the zero-phase low-pass."""
+        n, edge, sos, zi = self.n, self.edge, self.sos, self.zi
+        sigma = self.dp["noise_rms_per_sample"]
+        w0 = 2.0 * math.pi * self.dp["f0"]
+        fwd = [DiskArray(self._path(f"fwd_{c}.bin"), n + 2 * edge, self.filtered_dtype) for c in "IQ"]
+        chunk = self.budget.chunk(DEMOD_BYTES_PER_SAMPLE, minimum=edge + 1)
+
+        # Forward pass over the odd-extended I/Q; fwd position = sample + edge
+        state = [None, None]
+        tail = [np.empty(0), np.empty(0)]
+        for lo in range(0, n, chunk):
+            hi = min(n, lo + chunk)
+            with stage_timer("noise"):
+                x = self.theta.read(lo, hi)
+                x += sigma * rng.standard_normal(hi - lo)
+            with stage_timer("mix"):
+                t = np.arange(lo, hi) * self.dt
+                iq = (x * np.cos(w0 * t), x * np.sin(w0 * t))
+                np.negative(iq[1], out=iq[1])
+            self.budget.check("mix")
+            del x, t
+            with stage_timer("filter"):
+                for c in range(2):
+                    v = iq[c]
+                    if lo == 0:
+                        left = 2.0 * v[0] - v[edge:0:-1]
+                        y, state[c] = sosfilt(sos, left, zi=zi * left[0])
+                        fwd[c].write(0, y)
+                    y, state[c] = sosfilt(sos, v, zi=state[c])
+                    fwd[c].write(edge + lo, y)
+                    tail[c] = np.concatenate((tail[c], v[-(edge + 1):]))[-(edge + 1):]
+            self.budget.check("filter forward")
+            del iq, y
+        for c in range(2):
+            right = 2.0 * tail[c][-1] - tail[c][-2::-1]
+            y, _ = sosfilt(sos, right, zi=state[c])
+            fwd[c].write(edge + n, y)
+
+        # Backward pass; only kept samples are turned into phase
+        phase = DiskArray(self._path("phase.bin"), self.n_keep, np.float64)
+        m = n + 2 * edge
+        state = [zi * fwd[c].read(m - 1, m)[0] for c in range(2)]
+        q = self.decimate
+        for hi in range(m, 0, -chunk):
+            lo = max(0, hi - chunk)
+            out = []
+            with stage_timer("filter"):
+                for c in range(2):
+                    y, state[c] = sosfilt(sos, fwd[c].read(lo, hi)[::-1], zi=state[c])
+                    out.append(y)
+            # Kept sample i sits at fwd position i + edge, reversed index hi - 1 - (i + edge)
+            j_lo = max(0, -(-(lo - edge - self.k0) // q))
+            j_hi = min(self.n_keep - 1, (hi - 1 - edge - self.k0) // q)
+            if j_lo <= j_hi:
+                idx = hi - 1 - edge - (self.k0 + q * np.arange(j_lo, j_hi + 1))
+                with stage_timer("phase"):
+                    phase.write(j_lo, np.arctan2(out[1][idx], out[0][idx]))
+            self.budget.check("filter backward")
+            del out, y
+        for arr in fwd:
+            arr.remove()
+        return phase
+
+    def _unwrap_detrend_sums(self, phase: DiskArray) -> Tuple[float, float]:
+        """Unwrap in place with the phase carried across chunks; (slope, intercept) of the line fit."""
+        chunk = self.budget.chunk(DEMOD_BYTES_PER_SAMPLE)
+        last_wrapped = last = None
+        s_p = s_pt = 0.0
+        with stage_timer("phase"):
+            for lo in range(0, self.n_keep, chunk):
+                hi = min(self.n_keep, lo + chunk)
+                w = phase.read(lo, hi)
+                if last is None:
+                    u = np.unwrap(w)
+                else:
+                    u = np.unwrap(np.concatenate(([last_wrapped], w)))[1:] + (last - last_wrapped)
+                last_wrapped, last = float(w[-1]), float(u[-1])
+                phase.write(lo, u)
+                s_p += float(np.sum(u))
+                s_pt += float(u @ (self._t_keep(lo, hi) - self.t_mean))
+                self.budget.check("unwrap")
+                del w, u
+        slope = s_pt / self.t_ss
+        return slope, s_p / self.n_keep - slope * self.t_mean
+
+    def project(self, freqs: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+        """(amplitude, phase) of the kept delta_f at freqs, streamed."""
+        if self.delta_f is None:
+            raise RuntimeError("realization(..., keep_delta_f=True) first.")
+        projector = self.projector(freqs)
+        sxc = np.zeros(projector.freqs.size)
+        sxs = np.zeros(projector.freqs.size)
+        chunk = self._projection_chunk(projector)
+        for lo in range(0, self.n_keep, chunk):
+            c, s = projector.sums(self.delta_f.read(lo, min(self.n_keep, lo + chunk)), start=lo)
+            sxc += c
+            sxs += s
+            self.budget.check("projection")
+        return projector.amplitude_phase(sxc, sxs)
+
+    def _spectrum(self, freqs: Sequence[float], nperseg: int) -> Tuple[ZoomSpectrum, int]:
+        """ZoomSpectrum of the kept series and its chunk length, sized after its tables."""
+        nperseg = min(int(nperseg), self.n_keep)
+        spec = ZoomSpectrum(self.cfg.fs_hz / self.decimate, freqs, nperseg)
+        chunk = self.budget.chunk(SPECTRUM_BYTES_PER_SAMPLE, minimum=nperseg, fixed=spec.nbytes)
+        spec.batch_segments = chunk // nperseg
+        return spec, chunk
+
+    def narrowband_psd(self, freqs: Sequence[float], nperseg: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Welch-equivalent PSD of the kept delta_f on `freqs` (zoom_psd.ZoomSpectrum), streamed."""
+        if self.delta_f is None:
+            raise RuntimeError("realization(..., keep_delta_f=True) first.")
+        n = self.delta_f.n
+        spec, chunk = self._spectrum(freqs, nperseg)
+        for lo in range(0, n, chunk):
+            block = self.delta_f.read(lo, min(lo + chunk, n))
+            spec.update(block)
+            self.budget.check("psd")
+            del block
+        return spec.psd()
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "budget_mb": self.budget.budget_bytes / 2**20,
+            "peak_rss_growth_mb": self.budget.peak_bytes / 2**20,
+            "n_samples": self.n,
+            "n_kept": self.n_keep,
+            "precision": dict(self.precision),
+        }
+
+
+def stage_timer(name: str):
+    """profiling.stage without allocation tracking (tracemalloc would count the chunk buffers twice)."""
+    return profiling.stage(name, alloc=False)
+
+
+# ----------------------------- Validation -----------------------------
+
+def compare_with_batch(
+    cfg,
+    alpha: float,
+    budget_mb: float,
+    n_realizations: int = 2,
+) -> Dict[str, object]:
+    """
+    Amplitudes at f_target / f_false from the batch path and from the
+    out-of-core path (float64 and float32 storage) with the same noise draws.
+    """
+    from demod_plan import demod_plan_from_config
+    from sensitivity_analysis import derived_params, integrate_theta, process_realizations
+
+    dp = derived_params(cfg)
+    freqs = (dp["f_target"], dp["f_false"])
+    plan = demod_plan_from_config(cfg, dp)
+    t_start = time.perf_counter()
+    theta = integrate_theta(alpha, cfg, dp, plan.t_eval)
+    batch = np.column_stack(process_realizations(theta, n_realizations, cfg, dp, np.random.default_rng(cfg.seed), plan=plan))
+    t_batch = time.perf_counter() - t_start
+    del theta, plan
+
+    out: Dict[str, object] = {"batch_s": t_batch, "batch_amps": batch.tolist()}
+    for float32 in (False, True):
+        t_start = time.perf_counter()
+        with OutOfCoreRun(cfg, dp, budget_mb, float32=float32) as ooc:
+            ooc.preflight(freqs)
+            ooc.integrate(alpha)
+            rng = np.random.default_rng(cfg.seed)
+            amps = np.array([ooc.realization(rng, freqs)[0] for _ in range(n_realizations)])
+            key = "float32" if float32 else "float64"
+            out[key] = {
+                "seconds": time.perf_counter() - t_start,
+                "max_rel_diff": float(np.max(np.abs(amps - batch) / np.abs(batch))),
+                **ooc.summary(),
+            }
+    return out
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from sensitivity_analysis import SimConfig, derived_params
+
+    ap = argparse.ArgumentParser(description="Out-of-core mode: batch cross-check and a long memory-bounded run.")
+    ap.add_argument("--days", type=float, default=2.0, help="duration of the memory-bounded run")
+    ap.add_argument("--budget-mb", type=float, default=64.0)
+    ap.add_argument("--solver", default="exact", choices=("exact", "solve_ivp"))
+    args = ap.parse_args()
+
+    print("\n=== OUT-OF-CORE vs BATCH (6 h, same noise draws) ===")
+    cfg = SimConfig(duration_s=6 * 3600.0, solver=args.solver)
+    cmp = compare_with_batch(cfg, alpha=1.0e-10, budget_mb=args.budget_mb)
+    print(f"batch: {cmp['batch_s']:.2f} s")
+    for key in ("float64", "float32"):
+        r = cmp[key]
+        print(
+            f"{key}: {r['seconds']:.2f} s | max rel diff={r['max_rel_diff']:.2e} | "
+            f"theta={r['precision']['theta']} filtered={r['precision']['filtered_iq']} | "
+            f"RSS growth={r['peak_rss_growth_mb']:.1f} MiB"
+        )
+
+    print(f"\n=== {args.days:g}-DAY RUN, {args.budget_mb:g} MiB BUDGET ===")
+    cfg = SimConfig(duration_s=args.days * 86400.0, solver=args.solver)
+    dp = derived_params(cfg)
+    t_start = time.perf_counter()
+    with OutOfCoreRun(cfg, dp, args.budget_mb) as ooc:
+        ooc.preflight((dp["f_target"], dp["f_false"]))
+        ooc.integrate(1.0e-10)
+        amps, _ = ooc.realization(np.random.default_rng(cfg.seed), (dp["f_target"], dp["f_false"]))
+        s = ooc.summary()
+    batch_mb = 12 * 8 * s["n_samples"] / 2**20
+    print(f"samples={s['n_samples']} | amp_true={amps[0]:.3e} Hz | amp_false={amps[1]:.3e} Hz")
+    print(
+        f"RSS growth={s['peak_rss_growth_mb']:.1f} MiB (batch path ~{batch_mb:.0f} MiB) | "
+        f"precision={s['precision']} | {time.perf_counter() - t_start:.1f} s"
+    )
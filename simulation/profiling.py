@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+AIRM Stage Profiling — profiling.py
+-----------------------------------
+Opt-in instrumentation of the simulation / analysis stages
+(SimConfig.profile = True, or enable() around any call):
+
+    stage("filter")      wall / CPU time, calls and peak allocation of one
+                         leaf stage (noise, mix, filter, phase, derivative,
+                         projection; integrate without allocations)
+    section("null")      wall / CPU time of a coarse run_sensitivity phase
+    count("rhs_evals")   event counters (solve_ivp RHS evaluations, ...)
+
+Allocations are measured with tracemalloc started and stopped around each
+leaf stage, never process-wide: tracing every Python allocation would
+slow the RK45 right-hand side several-fold.
+
+With profiling disabled every hook is a single global lookup returning a
+shared no-op context manager, so the hooks stay in production code paths.
+
+Work done in pool workers is captured per task and merged into the
+parent's totals; each finished realization is written as one line of the
+per-realization trace (JSON lines) with its batch's stage times.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+_PROFILER: Optional["Profiler"] = None
+_NULL = contextlib.nullcontext()
+
+
+class Profiler:
+    """Aggregated stage timings, allocation peaks and counters of one process."""
+
+    def __init__(self, track_allocations: bool = True, trace_path: Optional[str] = None) -> None:
+        # name -> [calls, wall_s, cpu_s, max_wall_s, alloc_peak_bytes]
+        self.stages: Dict[str, List[float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.track_allocations = track_allocations
+        self.pid = os.getpid()
+        self.traced_peak = 0
+        self._captures: List[Dict[str, object]] = []
+        self._trace = open(trace_path, "w", encoding="utf-8") if trace_path else None
+        self.trace_path = trace_path
+
+    def close(self) -> None:
+        if self._trace is not None:
+            self._trace.close()
+            self._trace = None
+
+    def _add(self, target: Dict[str, List[float]], name: str, wall: float, cpu: float, peak: int) -> None:
+        s = target.get(name)
+        if s is None:
+            target[name] = [1, wall, cpu, wall, peak]
+        else:
+            s[0] += 1
+            s[1] += wall
+            s[2] += cpu
+            s[3] = max(s[3], wall)
+            s[4] = max(s[4], peak)
+
+    @contextlib.contextmanager
+    def stage(self, name: str, alloc: bool = True):
+        # Nested inside another traced stage: time only
+        track = alloc and self.track_allocations and not tracemalloc.is_tracing()
+        if track:
+            tracemalloc.start()
+        c0, w0 = time.process_time(), time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - w0
+            cpu = time.process_time() - c0
+            peak = 0
+            if track:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                self.traced_peak = max(self.traced_peak, peak)
+            self._add(self.stages, name, wall, cpu, peak)
+            for cap in self._captures:
+                self._add(cap["stages"], name, wall, cpu, peak)
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + int(n)
+        for cap in self._captures:
+            cap["counters"][name] = cap["counters"].get(name, 0) + int(n)
+
+    @contextlib.contextmanager
+    def capture(self):
+        """Collect the stages and counters recorded inside the block (one pool task)."""
+        cap: Dict[str, object] = {"pid": os.getpid(), "stages": {}, "counters": {}, "traced_peak": 0}
+        self._captures.append(cap)
+        try:
+            yield cap
+        finally:
+            self._captures.remove(cap)
+            cap["traced_peak"] = self.traced_peak
+
+    def merge(self, captured: Dict[str, object]) -> None:
+        """Add what a capture() block recorded in another process."""
+        for name, (calls, wall, cpu, max_wall, peak) in captured["stages"].items():
+            s = self.stages.setdefault(name, [0, 0.0, 0.0, 0.0, 0])
+            s[0] += calls
+            s[1] += wall
+            s[2] += cpu
+            s[3] = max(s[3], max_wall)
+            s[4] = max(s[4], peak)
+        for name, n in captured["counters"].items():
+            self.counters[name] = self.counters.get(name, 0) + n
+        self.traced_peak = max(self.traced_peak, captured["traced_peak"])
+
+    def trace(self, record: Dict[str, object]) -> None:
+        if self._trace is not None:
+            self._trace.write(json.dumps(record) + "\n")
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "stages": {
+                name: {
+                    "calls": int(s[0]),
+                    "wall_s": s[1],
+                    "cpu_s": s[2],
+                    "mean_wall_s": s[1] / s[0] if s[0] else 0.0,
+                    "max_wall_s": s[3],
+                    "alloc_peak_mb": s[4] / 2**20,
+                }
+                for name, s in sorted(self.stages.items(), key=lambda kv: -kv[1][1])
+            },
+            "counters": dict(self.counters),
+            "traced_peak_mb": self.traced_peak / 2**20,
+            "track_allocations": self.track_allocations,
+            "trace_path": self.trace_path,
+        }
+
+
+# ----------------------------- Hooks -----------------------------
+
+def enable(track_allocations: bool = True, trace_path: Optional[str] = None) -> Profiler:
+    """Install a fresh process-wide profiler."""
+    global _PROFILER
+    disable()
+    _PROFILER = Profiler(track_allocations=track_allocations, trace_path=trace_path)
+    return _PROFILER
+
+
+def disable() -> Optional[Profiler]:
+    """Remove (and close) the process-wide profiler; returns it for its summary."""
+    global _PROFILER
+    prof, _PROFILER = _PROFILER, None
+    # A profiler inherited through fork belongs to the parent: closing it
+    # here would flush the parent's trace buffer a second time
+    if prof is not None and prof.pid == os.getpid():
+        prof.close()
+    return prof
+
+
+def active() -> Optional[Profiler]:
+    """The profiler of this process (None if off or only inherited through fork)."""
+    return _PROFILER if _PROFILER is not None and _PROFILER.pid == os.getpid() else None
+
+
+def stage(name: str, alloc: bool = True):
+    """Context manager timing a leaf stage (no-op when profiling is off)."""
+    return _NULL if _PROFILER is None else _PROFILER.stage(name, alloc=alloc)
+
+
+def section(name: str):
+    """Context manager timing a coarse phase; no allocation tracking."""
+    return _NULL if _PROFILER is None else _PROFILER.stage(name, alloc=False)
+
+
+def count(name: str, n: int = 1) -> None:
+    if _PROFILER is not None:
+        _PROFILER.count(name, n)
+
+
+def capture():
+    """Context yielding the stages recorded inside it (None when profiling is off)."""
+    return contextlib.nullcontext(None) if _PROFILER is None else _PROFILER.capture()
+
+
+def merge(captured: Optional[Dict[str, object]]) -> None:
+    """Fold a capture() result from a worker process into this process's totals."""
+    if _PROFILER is not None and captured is not None and captured["pid"] != os.getpid():
+        _PROFILER.merge(captured)
+
+
+def record_batch(alpha_index: int, start: int, amps_true, amps_false, batch: Optional[Dict[str, object]]) -> None:
+    """
+    Merge a batch captured in a worker process and write one trace line per
+    realization of the batch.
+    """
+    if _PROFILER is None or batch is None:
+        return
+    merge(batch)
+    stage_s = {name: s[1] for name, s in batch["stages"].items()}
+    for j, (a_true, a_false) in enumerate(zip(amps_true, amps_false)):
+        _PROFILER.trace({
+            "alpha_index": int(alpha_index),
+            "realization": int(start + j),
+            "amp_true_hz": float(a_true),
+            "amp_false_hz": float(a_false),
+            "batch_start": int(start),
+            "batch_size": len(amps_true),
+            "pid": batch["pid"],
+            "batch_stage_s": stage_s,
+        })
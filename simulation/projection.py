@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+AIRM Multi-Frequency Coherent Projection — projection.py
+--------------------------------------------------------
+Coherent amplitude and phase of one series (or a stack of realizations)
+at a whole set of frequencies in a single pass over the data.
+
+Convention (identical to `matched_amp` in sensitivity_analysis.py):
+
+    c_f, s_f = cos/sin(2*pi*f*t) normalized to unit RMS over t
+    a_f = mean(x * c_f),  b_f = mean(x * s_f)
+    amplitude_f = sqrt(a_f^2 + b_f^2),  phase_f = atan2(b_f, a_f)
+
+On a uniform grid t_k = t0 + k*dt the complex template factorizes per
+block of B samples:
+
+    exp(i*w*t_k) = exp(i*w*(t0 + m*B*dt)) * exp(i*w*j*dt),   k = m*B + j
+
+so one (B x F) base block is built once and every block of data costs a
+single (R x B) @ (B x F) matrix product plus F complex rotations. The
+unit-RMS normalizations sum(cos^2), sum(sin^2) are geometric series and are
+evaluated in closed form. No N x F temporary is ever formed; trig work is
+O(B*F + n_blocks*F) instead of O(N*F).
+
+For a dense, uniformly spaced frequency grid (>= CZT_MIN_FREQS points,
+e.g. a discrimination curve) the sums are instead one chirp-z transform
+per series, O(N log N) rather than O(N*F):
+
+    sum_k x_k exp(i*w_f*t_k) = exp(i*w_f*t0) * conj(ZoomFFT(x)(f))   (real x)
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.signal import ZoomFFT
+
+DEFAULT_BLOCK = 4096
+
+# Uniform frequency grids at least this dense are projected with a chirp-z
+# transform (three FFTs of ~N + F points) instead of the blocked products
+# (break-even near F ~ 150 at N ~ 1.7e5; the blocked BLAS path wins below)
+CZT_MIN_FREQS = 128
+
+
+class Projector:
+    """Reusable projection onto `freqs` for a fixed time axis `t`."""
+
+    def __init__(self, t: np.ndarray, freqs: Sequence[float], block: int = DEFAULT_BLOCK) -> None:
+        t = np.asarray(t, dtype=float)
+        self.freqs = np.atleast_1d(np.asarray(freqs, dtype=float))
+        self.n = t.size
+        if self.n < 2:
+            raise ValueError("Projection needs at least two samples.")
+        self.block = int(min(block, self.n))
+        self.t0 = float(t[0])
+        self.dt = float(t[1] - t[0])
+        self.uniform = bool(np.allclose(np.diff(t), self.dt, rtol=1e-9, atol=0.0))
+        self._t = None if self.uniform else t
+
+        w = 2.0 * np.pi * self.freqs
+        if self.uniform:
+            self._init_uniform()
+        else:
+            self.sum_cc = np.zeros(self.freqs.size)
+            self.sum_ss = np.zeros(self.freqs.size)
+            for lo in range(0, self.n, self.block):
+                arg = np.multiply.outer(t[lo:lo + self.block], w)
+                self.sum_cc += np.sum(np.cos(arg) ** 2, axis=0)
+                self.sum_ss += np.sum(np.sin(arg) ** 2, axis=0)
+
+    @classmethod
+    def uniform_grid(cls, t0: float, dt: float, n: int, freqs: Sequence[float], block: int = DEFAULT_BLOCK) -> "Projector":
+        """Projector for t_k = t0 + k*dt, k < n, without materializing t."""
+        if n < 2:
+            raise ValueError("Projection needs at least two samples.")
+        self = cls.__new__(cls)
+        self.freqs = np.atleast_1d(np.asarray(freqs, dtype=float))
+        self.n = int(n)
+        self.block = int(min(block, self.n))
+        self.t0 = float(t0)
+        self.dt = float(dt)
+        self.uniform = True
+        self._t = None
+        self._init_uniform()
+        return self
+
+    def _init_uniform(self) -> None:
+        w = 2.0 * np.pi * self.freqs
+        self.sum_cc, self.sum_ss = _closed_form_norms(w, self.t0, self.dt, self.n)
+        df = np.diff(self.freqs)
+        self.czt = bool(self.freqs.size >= CZT_MIN_FREQS and np.allclose(df, df[0], rtol=1e-9, atol=0.0) and df[0] > 0)
+        if self.czt:
+            self._zooms: dict = {}
+            return
+        j = np.arange(self.block) * self.dt
+        # (B x F) base block, split into real parts for real-valued BLAS
+        self._base_c = np.cos(np.multiply.outer(j, w))
+        self._base_s = np.sin(np.multiply.outer(j, w))
+        starts = self.t0 + np.arange(0, self.n, self.block) * self.dt
+        self._rot = np.exp(1j * np.multiply.outer(starts, w))  # (n_blocks x F)
+
+    @property
+    def nbytes(self) -> int:
+        if self.uniform and self.czt:
+            return 0
+        if self.uniform:
+            return int(self._base_c.nbytes + self._base_s.nbytes + self._rot.nbytes)
+        return int(self._t.nbytes)
+
+    def sums(self, x: np.ndarray, start: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Raw sum(x*cos), sum(x*sin) with shape x.shape[:-1] + (F,).
+
+        x is the whole axis, or with `start` (chunked input) samples
+        start .. start + x.shape[-1] - 1, start a multiple of the block
+        size; the partial sums of consecutive chunks add up to the full sums.
+        """
+        x = np.asarray(x, dtype=float)
+        nx = x.shape[-1]
+        if start is None:
+            if nx != self.n:
+                raise ValueError(f"x has {nx} samples, projector was built for {self.n}.")
+            start = 0
+        elif start % self.block or start + nx > self.n:
+            raise ValueError(
+                f"chunk {start}..{start + nx - 1} does not fit the {self.n}-sample axis "
+                f"or does not start on a multiple of {self.block}."
+            )
+        lead = x.shape[:-1]
+        x2 = x.reshape(-1, nx)
+        if self.uniform and self.czt:
+            acc = self._czt_sums(x2, start)
+            return acc.real.reshape(lead + (-1,)), acc.imag.reshape(lead + (-1,))
+        acc = np.zeros((x2.shape[0], self.freqs.size), dtype=complex)
+        w = 2.0 * np.pi * self.freqs
+
+        for lo in range(0, nx, self.block):
+            xb = x2[:, lo:lo + self.block]
+            nb = xb.shape[1]
+            if self.uniform:
+                # sum_j x_j * exp(i*w*j*dt), rotated to the block start
+                local = xb @ self._base_c[:nb] + 1j * (xb @ self._base_s[:nb])
+                acc += local * self._rot[(start + lo) // self.block]
+            else:
+                arg = np.multiply.outer(self._t[start + lo:start + lo + nb], w)
+                acc += xb @ np.cos(arg) + 1j * (xb @ np.sin(arg))
+
+        return acc.real.reshape(lead + (-1,)), acc.imag.reshape(lead + (-1,))
+
+    def _czt_sums(self, x2: np.ndarray, start: int) -> np.ndarray:
+        """Complex sums over a (R x nx) chunk starting at sample `start` via one zoom FFT per row."""
+        nx = x2.shape[1]
+        if nx not in self._zooms:
+            self._zooms[nx] = ZoomFFT(
+                nx, [self.freqs[0], self.freqs[-1]], m=self.freqs.size, fs=1.0 / self.dt, endpoint=True
+            )
+        w = 2.0 * np.pi * self.freqs
+        return np.conj(self._zooms[nx](x2, axis=-1)) * np.exp(1j * w * (self.t0 + start * self.dt))
+
+    def __call__(self, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(amplitude, phase), each with shape x.shape[:-1] + (F,)."""
+        return self.amplitude_phase(*self.sums(x))
+
+    def amplitude_phase(self, sxc: np.ndarray, sxs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(amplitude, phase) from the raw sums of sums()."""
+        a = sxc / (self.n * np.sqrt(self.sum_cc / self.n))
+        b = sxs / (self.n * np.sqrt(self.sum_ss / self.n))
+        return np.sqrt(a * a + b * b), np.arctan2(b, a)
+
+
+def _closed_form_norms(w: np.ndarray, t0: float, dt: float, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    sum_k cos^2(w*t_k) and sum_k sin^2(w*t_k) on t_k = t0 + k*dt:
+    cos^2 = (1 + cos 2x)/2, and sum_k exp(2i*w*t_k) is a geometric series.
+    """
+    r = np.exp(2j * w * dt)
+    first = np.exp(2j * w * t0)
+    near_one = np.abs(1.0 - r) < 1e-12
+    denom = np.where(near_one, 1.0, 1.0 - r)
+    s2 = np.where(near_one, n * first, first * (1.0 - r ** n) / denom)
+    return 0.5 * (n + s2.real), 0.5 * (n - s2.real)
+
+
+def project(
+    x: np.ndarray,
+    t: np.ndarray,
+    freqs: Sequence[float],
+    block: int = DEFAULT_BLOCK,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    One-shot projection of x (time on the last axis) onto every frequency.
+
+    Returns (amplitude, phase), each with shape x.shape[:-1] + (len(freqs),).
+    """
+    return Projector(t, freqs, block=block)(x)
+
+
+def _explicit_amp(x: np.ndarray, t: np.ndarray, f_ref: float) -> np.ndarray:
+    """Reference: explicit full-length unit-RMS cos/sin templates, one frequency at a time."""
+    c = np.cos(2.0 * np.pi * f_ref * t)
+    s = np.sin(2.0 * np.pi * f_ref * t)
+    c /= np.sqrt(np.mean(c * c))
+    s /= np.sqrt(np.mean(s * s))
+    a = np.mean(x * c, axis=-1)
+    b = np.mean(x * s, axis=-1)
+    return np.sqrt(a * a + b * b)
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    fs = 2.0
+    t = np.arange(600.0, 48.0 * 3600.0 - 600.0, 1.0 / fs)
+    f_target = 1.0 / 1000.0 + 1.0 / (23.9345 * 3600.0)
+    x = 1e-9 * np.cos(2.0 * math.pi * f_target * t + 0.3) + 1e-8 * rng.standard_normal((8, t.size))
+
+    print("\n=== MULTI-FREQUENCY PROJECTION vs EXPLICIT TEMPLATES ===")
+    for n_f in (1, 2, 8, 32, 128, 512):
+        freqs = f_target * (1.0 + np.linspace(-0.1, 0.1, n_f))
+        t_start = time.perf_counter()
+        amp, _ = Projector(t, freqs)(x)
+        t_proj = time.perf_counter() - t_start
+        t_start = time.perf_counter()
+        ref = np.stack([_explicit_amp(x, t, f) for f in freqs], axis=-1)
+        t_ref = time.perf_counter() - t_start
+        err = float(np.max(np.abs(amp / ref - 1.0)))
+        print(
+            f"F={n_f:4d} | projector={t_proj * 1e3:8.1f} ms | explicit templates={t_ref * 1e3:8.1f} ms | "
+            f"speed-up={t_ref / t_proj:6.1f}x | max rel err={err:.1e}"
+        )
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+AIRM Run Catalog — run_catalog.py
+---------------------------------
+SQLite index over simulation/runs/<RUN_ID>/ (run_meta.json +
+alpha_sweep.csv), so runs can be compared without re-parsing the tree.
+
+Tables:
+    runs         one row per run: every scalar SimConfig field and derived
+                 parameter as its own column (Q, kappa, fs_hz, f0, ...),
+                 null statistics, decision, peak RSS, full run_meta JSON
+    alpha_rows   one row per alpha_sweep.csv line
+    sweep        view: alpha_rows joined with runs
+
+Indexing is incremental: a run is re-read only when its run_meta.json
+changed (mtime/size), and runs whose directory disappeared are dropped.
+Columns for new SimConfig fields are added on the fly.
+
+    python run_catalog.py index
+    python run_catalog.py query "Q >= 1e5 AND best_snr_vs_null < 10"
+    python run_catalog.py rows "alpha > 1e-11 AND snr_vs_null > 10" --columns run_id,alpha,snr_vs_null
+
+Queries take a SQL WHERE clause; this is a local, single-user store.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+RUNS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "runs")
+DEFAULT_DB = os.path.join(RUNS_DIR, "catalog.sqlite")
+
+# Fixed columns of `runs`; config / derived columns are added as seen
+CORE_COLUMNS = {
+    "run_id": "TEXT PRIMARY KEY",
+    "run_dir": "TEXT NOT NULL",
+    "meta_mtime": "REAL",
+    "meta_size": "INTEGER",
+    "timestamp_utc": "TEXT",
+    "config_hash": "TEXT",
+    "null_mu_hz": "REAL",
+    "null_sigma_hz": "REAL",
+    "null_n": "INTEGER",
+    "null_p_go_empirical": "REAL",
+    "null_p_go_rayleigh": "REAL",
+    "go_threshold_snr": "REAL",
+    "best_alpha": "REAL",
+    "best_snr_vs_null": "REAL",
+    "go": "INTEGER",
+    "alpha_threshold": "REAL",
+    "alpha_threshold_sigma": "REAL",
+    "peak_rss_mb": "REAL",
+    "n_alpha_rows": "INTEGER",
+    "meta_json": "TEXT",
+}
+
+ALPHA_COLUMNS = (
+    "alpha",
+    "mean_amp_true_hz",
+    "std_amp_true_hz",
+    "mean_amp_false_hz",
+    "false_over_true",
+    "snr_vs_null",
+)
+
+INDEXED_COLUMNS = ("Q", "best_snr_vs_null", "go", "timestamp_utc", "config_hash")
+
+
+def _sql_type(value: object) -> str:
+    if isinstance(value, bool) or isinstance(value, int):
+        return "INTEGER"
+    if isinstance(value, float):
+        return "REAL"
+    return "TEXT"
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def flatten_meta(meta: Dict[str, object]) -> Dict[str, object]:
+    """run_meta.json -> one `runs` row (without run_dir / mtime bookkeeping)."""
+    row: Dict[str, object] = {}
+    config = meta.get("config", {})
+    derived = meta.get("derived", {})
+    for key, value in config.items():
+        if isinstance(value, (bool, int, float, str)):
+            row[key] = value
+    for key, value in derived.items():
+        if isinstance(value, (bool, int, float, str)):
+            row[key if key not in config else f"derived_{key}"] = value
+
+    null = meta.get("null", {})
+    p_go = null.get("tail", {}).get("p_values", {}).get("go_threshold", {})
+    decision = meta.get("decision", {})
+    row.update({
+        "timestamp_utc": meta.get("timestamp_utc"),
+        "config_hash": meta.get("config_hash"),
+        "null_mu_hz": null.get("null_mu_hz"),
+        "null_sigma_hz": null.get("null_sigma_hz"),
+        "null_n": null.get("n"),
+        "null_p_go_empirical": p_go.get("empirical"),
+        "null_p_go_rayleigh": p_go.get("rayleigh"),
+        "go_threshold_snr": decision.get("go_threshold_snr"),
+        "best_alpha": decision.get("best_alpha"),
+        "best_snr_vs_null": decision.get("best_snr_vs_null"),
+        "go": None if "go" not in decision else int(bool(decision["go"])),
+        "alpha_threshold": decision.get("alpha_threshold"),
+        "alpha_threshold_sigma": decision.get("alpha_threshold_sigma"),
+        "peak_rss_mb": meta.get("resources", {}).get("peak_rss_mb"),
+        "meta_json": json.dumps(meta),
+    })
+    return row
+
+
+def read_alpha_sweep(path: str) -> List[Tuple[float, ...]]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return [tuple(float(r[c]) for c in ALPHA_COLUMNS) for r in csv.DictReader(f)]
+
+
+class RunCatalog:
+    """SQLite catalog of sensitivity runs."""
+
+    def __init__(self, db_path: str = DEFAULT_DB) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self._create()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "RunCatalog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -------- schema --------
+
+    def _create(self) -> None:
+        cols = ", ".join(f"{_quote(k)} {v}" for k, v in CORE_COLUMNS.items())
+        alpha_cols = ", ".join(f"{_quote(c)} REAL" for c in ALPHA_COLUMNS)
+        with self.conn:
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS runs ({cols})")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS alpha_rows ("
+                "run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE, "
+                f"row INTEGER NOT NULL, {alpha_cols}, PRIMARY KEY (run_id, row))"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS alpha_rows_alpha ON alpha_rows(alpha)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS alpha_rows_snr ON alpha_rows(snr_vs_null)")
+            self.conn.execute(
+                "CREATE VIEW IF NOT EXISTS sweep AS "
+                "SELECT runs.*, alpha_rows.row, "
+                + ", ".join(f"alpha_rows.{_quote(c)}" for c in ALPHA_COLUMNS)
+                + " FROM alpha_rows JOIN runs USING (run_id)"
+            )
+        self._columns = {r["name"] for r in self.conn.execute("PRAGMA table_info(runs)")}
+        with self.conn:
+            for key in INDEXED_COLUMNS:
+                if key in self._columns:
+                    self._create_index(key)
+
+    def _ensure_columns(self, row: Dict[str, object]) -> None:
+        for key, value in row.items():
+            if key in self._columns or value is None:
+                continue
+            self.conn.execute(f"ALTER TABLE runs ADD COLUMN {_quote(key)} {_sql_type(value)}")
+            self._columns.add(key)
+            if key in INDEXED_COLUMNS:
+                self._create_index(key)
+
+    def _create_index(self, column: str) -> None:
+        self.conn.execute(f"CREATE INDEX IF NOT EXISTS {_quote('runs_' + column)} ON runs({_quote(column)})")
+
+    # -------- indexing --------
+
+    def index(self, runs_dir: str = RUNS_DIR) -> Dict[str, int]:
+        """Add new / changed runs under runs_dir and drop vanished ones."""
+        known = {
+            r["run_id"]: (r["run_dir"], r["meta_mtime"], r["meta_size"])
+            for r in self.conn.execute("SELECT run_id, run_dir, meta_mtime, meta_size FROM runs")
+        }
+        seen = set()
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+        with self.conn:
+            entries = sorted(os.scandir(runs_dir), key=lambda e: e.name) if os.path.isdir(runs_dir) else []
+            for entry in entries:
+                meta_path = os.path.join(entry.path, "run_meta.json")
+                if not entry.is_dir() or not os.path.exists(meta_path):
+                    continue
+                # The directory name is the run_id run_sensitivity wrote
+                run_id = entry.name
+                run_dir = os.path.abspath(entry.path)
+                st = os.stat(meta_path)
+                seen.add(run_id)
+                if known.get(run_id) == (run_dir, st.st_mtime, st.st_size):
+                    counts["unchanged"] += 1
+                    continue
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                counts["updated" if run_id in known else "added"] += 1
+                self._upsert(run_id, run_dir, st, meta)
+            root = os.path.join(os.path.abspath(runs_dir), "")
+            for run_id, (run_dir, _, _) in known.items():
+                if run_id not in seen and run_dir.startswith(root):
+                    self.conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+                    counts["removed"] += 1
+        return counts
+
+    def _upsert(self, run_id: str, run_dir: str, st: os.stat_result, meta: Dict[str, object]) -> None:
+        row = flatten_meta(meta)
+        rows = read_alpha_sweep(os.path.join(run_dir, "alpha_sweep.csv"))
+        row.update({
+            "run_id": run_id,
+            "run_dir": run_dir,
+            "meta_mtime": st.st_mtime,
+            "meta_size": st.st_size,
+            "n_alpha_rows": len(rows),
+        })
+        self._ensure_columns(row)
+        self.conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+        keys = list(row)
+        self.conn.execute(
+            f"INSERT INTO runs ({', '.join(_quote(k) for k in keys)}) VALUES ({', '.join('?' * len(keys))})",
+            [row[k] for k in keys],
+        )
+        self.conn.executemany(
+            f"INSERT INTO alpha_rows (run_id, row, {', '.join(ALPHA_COLUMNS)}) VALUES (?, ?{', ?' * len(ALPHA_COLUMNS)})",
+            [(run_id, i) + r for i, r in enumerate(rows)],
+        )
+
+    # -------- queries --------
+
+    def query(
+        self,
+        where: str = "",
+        params: Sequence[object] = (),
+        columns: Optional[Sequence[str]] = None,
+        order_by: Optional[str] = None,
+        limit: Optional[int] = None,
+        table: str = "runs",
+    ) -> List[Dict[str, object]]:
+        """
+        Rows of `runs` (or the `sweep` view) matching a SQL WHERE clause.
+        Without `columns`, every column except the raw meta_json is returned.
+        """
+        if table not in ("runs", "sweep"):
+            raise ValueError("table must be 'runs' or 'sweep'.")
+        if not columns:
+            columns = [r[1] for r in self.conn.execute(f"PRAGMA table_info({table})") if r[1] != "meta_json"]
+        select = ", ".join(_quote(c) for c in columns)
+        sql = f"SELECT {select} FROM {table}"
+        if where:
+            sql += f" WHERE {where}"
+        if order_by:
+            sql += f" ORDER BY {order_by}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return [dict(r) for r in self.conn.execute(sql, tuple(params))]
+
+    def alpha_rows(self, run_id: str) -> List[Dict[str, object]]:
+        cur = self.conn.execute("SELECT * FROM alpha_rows WHERE run_id = ? ORDER BY row", (run_id,))
+        return [dict(r) for r in cur]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Index and query simulation/runs.")
+    ap.add_argument("--db", default=DEFAULT_DB)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p_index = sub.add_parser("index", help="(re-)index new or changed run directories")
+    p_index.add_argument("--runs-dir", default=RUNS_DIR)
+    for name, help_text in (("query", "filter runs"), ("rows", "filter per-alpha rows (sweep view)")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("where", nargs="?", default="", help='SQL WHERE clause, e.g. "Q >= 1e5 AND best_snr_vs_null < 10"')
+        p.add_argument("--columns", default=None, help="comma-separated columns to print")
+        p.add_argument("--order-by", default=None)
+        p.add_argument("--limit", type=int, default=None)
+    args = ap.parse_args()
+
+    with RunCatalog(args.db) as cat:
+        if args.cmd == "index":
+            t_start = time.perf_counter()
+            counts = cat.index(args.runs_dir)
+            print(" | ".join(f"{k}={v}" for k, v in counts.items()) + f" | {time.perf_counter() - t_start:.2f} s")
+        else:
+            default_cols = (
+                "run_id,Q,noise_asd_rad_sqrt_hz,best_alpha,best_snr_vs_null,go" if args.cmd == "query"
+                else "run_id,Q,alpha,snr_vs_null,false_over_true"
+            )
+            columns = (args.columns or default_cols).split(",")
+            t_start = time.perf_counter()
+            rows = cat.query(args.where, columns=columns, order_by=args.order_by, limit=args.limit,
+                             table="runs" if args.cmd == "query" else "sweep")
+            elapsed = time.perf_counter() - t_start
+            print("\t".join(columns))
+            for r in rows:
+                print("\t".join("" if r[c] is None else (f"{r[c]:.6g}" if isinstance(r[c], float) else str(r[c])) for c in columns))
+            print(f"({len(rows)} rows, {elapsed * 1e3:.1f} ms)")
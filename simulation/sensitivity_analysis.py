@@ -21,24 +21,26 @@ from __future__ import annotations
 import os
 import json
 import math
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, asdict
 from datetime import datetime
-from typing import Tuple, Dict, List
+from typing import Tuple, Dict, List, Optional, Sequence
 
 import numpy as np
-from scipy.integrate import solve_ivp
-from scipy.signal import butter, filtfilt
 
-# Optional plotting (script still works without it)
-try:
-    import matplotlib.pyplot as plt
-    HAS_MPL = True
-except Exception:
-    HAS_MPL = False
+from checkpoint import Checkpoint, missing_batches
+from demod_plan import DemodPlan, demod_plan_from_config, max_decimation
+from null_engine import save_null_distribution, tail_stats
+import profiling
+from projection import project
+from systematics import add_colored_noise, add_readout_noise, kappa_factor, stiffness_enabled
 
 
 # ----------------------------- Config -----------------------------
 
+# GO if the best SNR_vs_null reaches this value
+GO_SNR_THRESHOLD = 10.0
+
 @dataclass
 class SimConfig:
     # Hardware parameters
@@ -61,19 +63,57 @@ class SimConfig:
     # Noise model (one-sided ASD convention)
     noise_asd_rad_sqrt_hz: float = 1.0e-8  # rad/sqrt(Hz)
 
+    # Systematics (systematics.py; 0 = off). Colored readout noise quoted
+    # as ASD at 1 Hz, and kappa(t) = kappa * (1 + diurnal thermal term +
+    # linear creep + lines at k * f_spin of amplitude spin_line_frac / k)
+    flicker_asd_1hz: float = 0.0      # rad/sqrt(Hz) at 1 Hz, ASD ~ f^-1/2
+    random_walk_asd_1hz: float = 0.0  # rad/sqrt(Hz) at 1 Hz, ASD ~ 1/f
+    kappa_thermal_frac: float = 0.0
+    kappa_creep_per_day: float = 0.0
+    spin_line_frac: float = 0.0
+    spin_line_harmonics: int = 2
+
     # Analysis
     lp_cutoff_hz: float = 0.01
     lp_order: int = 6
     trim_s: float = 600.0  # trim edges / startup transient
+    decimate: int = 1      # keep every n-th filtered baseband sample before phase extraction
 
     # Monte Carlo
     n_realizations: int = 10
+    n_null: int = 0             # noise-only draws for the null distribution (0 = n_realizations)
+    realization_batch: int = 8  # noise realizations demodulated together (2-D arrays)
+    seed: int = 0               # root of the per-(alpha, realization) SeedSequence streams
+    workers: int = 1            # process-pool size for the sweep (1 = in-process)
+    profile: bool = False       # per-stage timings -> run_meta.json["profile"] + profile_trace.jsonl
+
+    # Trajectory integrator: "solve_ivp" (backend below), "rk4_ensemble"
+    # or "exact" (closed-form transition matrix per sample, see exact_stepper.py)
+    solver: str = "solve_ivp"
+    rk4_substeps: int = 4
+
+    # solve_ivp backend (solvers.py): "RK45", "DOP853", "LSODA" or "Radau"
+    # (the last two with the analytic Jacobian), its tolerances, and an
+    # optional numba-compiled RHS (falls back to airm_eom without numba)
+    ivp_method: str = "RK45"
+    ivp_rtol: float = 1.0e-9
+    ivp_atol: float = 1.0e-12
+    jit_rhs: bool = False
 
     # Alpha sweep
     alpha_min: float = 1.0e-14
     alpha_max: float = 1.0e-10
     alpha_points: int = 13  # logspace points
 
+    # "grid": alpha_points log-spaced alphas, n_realizations each.
+    # "adaptive": bracket and bisect the GO-threshold crossing inside
+    # [alpha_min, alpha_max], adding realizations only where the SNR
+    # interval straddles the threshold (see adaptive_sweep.py)
+    sweep_mode: str = "grid"
+    adaptive_rel_precision: float = 0.05  # stop when alpha_hi / alpha_lo - 1 <= this
+    adaptive_max_realizations: int = 160  # per-alpha realization cap
+    adaptive_max_evals: int = 24
+
     # Run metadata
     run_tag: str = "sim"
 
@@ -81,6 +121,19 @@ class SimConfig:
 def ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
+def peak_rss_mb() -> Dict[str, float]:
+    """Peak resident set size of this process and its (pool) children, in MiB."""
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return {}
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    unit = 1.0 / 2**20 if os.uname().sysname == "Darwin" else 1.0 / 2**10
+    return {
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit,
+        "peak_rss_children_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit,
+    }
+
 
 # -------------------------- Derived params --------------------------
 
@@ -106,6 +159,13 @@ def derived_params(cfg: SimConfig) -> Dict[str, float]:
     if 2.0 * cfg.trim_s >= cfg.duration_s:
         raise ValueError("trim_s too large relative to duration_s.")
 
+    q_max = max_decimation(cfg.fs_hz, cfg.lp_cutoff_hz)
+    if not 1 <= cfg.decimate <= q_max:
+        raise ValueError(
+            f"decimate={cfg.decimate} would alias the baseband: "
+            f"use 1 <= decimate <= {q_max} for fs_hz={cfg.fs_hz}, lp_cutoff_hz={cfg.lp_cutoff_hz}."
+        )
+
     return {
         "gamma": gamma,
         "f0": f0,
@@ -122,122 +182,392 @@ def derived_params(cfg: SimConfig) -> Dict[str, float]:
 def epsilon_total(t: float, alpha: float, f_target: float, phi: float) -> float:
     return alpha * math.cos(2.0 * math.pi * f_target * t + phi)
 
-def airm_eom(t: float, y: np.ndarray, alpha: float, cfg: SimConfig, dp: Dict[str, float]) -> List[float]:
+def airm_eom(
+    t: float,
+    y: np.ndarray,
+    alpha: float,
+    cfg: SimConfig,
+    dp: Dict[str, float],
+    drive_torque: float = 0.0,
+) -> List[float]:
+    """
+    theta_ddot of the modulated pendulum. drive_torque [N*m] adds a
+    numerical carrier-maintenance drive tau*sin(omega0*t) (no sideband
+    content; keeps long runs from ringing down).
+    """
     theta, theta_dot = float(y[0]), float(y[1])
     eps = epsilon_total(t, alpha, dp["f_target"], cfg.phi)
-    theta_ddot = (-dp["gamma"] * theta_dot - cfg.kappa * theta) / (cfg.I0 * (1.0 + eps))
+    drive = drive_torque * math.sin(2.0 * math.pi * dp["f0"] * t) if drive_torque else 0.0
+    kappa = cfg.kappa * kappa_factor(t, cfg) if stiffness_enabled(cfg) else cfg.kappa
+    theta_ddot = (drive - dp["gamma"] * theta_dot - kappa * theta) / (cfg.I0 * (1.0 + eps))
     return [theta_dot, theta_ddot]
 
-def run_theta(alpha: float, cfg: SimConfig, dp: Dict[str, float], t_eval: np.ndarray) -> np.ndarray:
-    y0 = [cfg.theta0_rad, cfg.theta_dot0]
-    sol = solve_ivp(
-        lambda t, y: airm_eom(t, y, alpha, cfg, dp),
-        [0.0, cfg.duration_s],
-        y0,
-        t_eval=t_eval,
-        method="RK45",
-        rtol=1e-9,
-        atol=1e-12,
-    )
-    return sol.y[0]
+def airm_jacobian(t: float, y: np.ndarray, alpha: float, cfg: SimConfig, dp: Dict[str, float]) -> np.ndarray:
+    """d(theta_dot, theta_ddot) / d(theta, theta_dot) of airm_eom (the drive is state-independent)."""
+    inertia = cfg.I0 * (1.0 + epsilon_total(t, alpha, dp["f_target"], cfg.phi))
+    kappa = cfg.kappa * kappa_factor(t, cfg) if stiffness_enabled(cfg) else cfg.kappa
+    return np.array([[0.0, 1.0], [-kappa / inertia, -dp["gamma"] / inertia]])
+
+def run_theta(
+    alpha: float,
+    cfg: SimConfig,
+    dp: Dict[str, float],
+    t_eval: np.ndarray,
+    drive_torque: float = 0.0,
+    rtol: Optional[float] = None,
+    atol: Optional[float] = None,
+) -> np.ndarray:
+    """solve_ivp trajectory with the configured backend (tolerances default to cfg.ivp_rtol / ivp_atol)."""
+    from solvers import integrate_ivp
+
+    return integrate_ivp(alpha, cfg, dp, t_eval, drive_torque=drive_torque, rtol=rtol, atol=atol).y[0]
+
+def integrate_theta(alpha: float, cfg: SimConfig, dp: Dict[str, float], t_eval: np.ndarray) -> np.ndarray:
+    """Noise-free theta on t_eval using the integrator selected by cfg.solver."""
+    with profiling.stage("integrate", alloc=False):
+        if cfg.solver == "solve_ivp":
+            return run_theta(alpha, cfg, dp, t_eval)
+        if cfg.solver == "rk4_ensemble":
+            from ensemble import run_theta_rk4
+            return run_theta_rk4(alpha, cfg, dp, t_eval, substeps=cfg.rk4_substeps)
+        if cfg.solver == "exact":
+            from exact_stepper import run_theta_exact
+            return run_theta_exact(alpha, cfg, dp, t_eval)
+    raise ValueError(f"Unknown solver '{cfg.solver}'.")
+
+def integrate_thetas(
+    alphas: np.ndarray,
+    cfg: SimConfig,
+    dp: Dict[str, float],
+    t_eval: np.ndarray,
+    pool: Optional[ProcessPoolExecutor] = None,
+) -> np.ndarray:
+    """Noise-free theta for every alpha, shape (len(alphas), len(t_eval))."""
+    if cfg.solver == "rk4_ensemble":
+        from ensemble import run_theta_ensemble
+        return run_theta_ensemble(np.asarray(alphas, dtype=float), cfg, dp, t_eval, substeps=cfg.rk4_substeps)
+    if pool is not None:
+        tasks = [(float(a), cfg, dp, t_eval) for a in alphas]
+        results = list(pool.map(_integrate_task, tasks))
+        for _, captured in results:
+            profiling.merge(captured)
+        return np.stack([theta for theta, _ in results])
+    return np.stack([integrate_theta(float(a), cfg, dp, t_eval) for a in alphas])
+
+def _integrate_task(task: Tuple[float, SimConfig, Dict[str, float], np.ndarray]) -> Tuple[np.ndarray, Optional[Dict[str, object]]]:
+    with profiling.capture() as captured:
+        theta = integrate_theta(*task)
+    return theta, captured
+
+def checkpointed_thetas(
+    alphas: np.ndarray,
+    cfg: SimConfig,
+    dp: Dict[str, float],
+    t_eval: np.ndarray,
+    checkpoint: Checkpoint,
+    first_index: int = 0,
+    pool: Optional[ProcessPoolExecutor] = None,
+) -> np.ndarray:
+    """integrate_thetas, reusing trajectories stored for alpha_index first_index + i."""
+    thetas = [checkpoint.load_theta(first_index + i, a) for i, a in enumerate(alphas)]
+    todo = [i for i, theta in enumerate(thetas) if theta is None]
+    if todo:
+        new = integrate_thetas(np.asarray(alphas, dtype=float)[todo], cfg, dp, t_eval, pool=pool)
+        for i, theta in zip(todo, new):
+            checkpoint.save_theta(first_index + i, alphas[i], theta)
+            thetas[i] = theta
+    return np.stack(thetas)
 
 
 # ----------------------------- Analysis -----------------------------
 
-def matched_amp(x: np.ndarray, t: np.ndarray, f_ref: float) -> float:
-    c = np.cos(2.0 * np.pi * f_ref * t)
-    s = np.sin(2.0 * np.pi * f_ref * t)
+def matched_amp(x: np.ndarray, t: np.ndarray, f_ref: float):
+    """
+    Coherent amplitude of x at f_ref (unit-RMS cos/sin templates). x may be
+    1-D (returns float) or a stack of realizations with time on the last
+    axis (returns an array). See projection.py for the multi-frequency form.
+    """
+    amp = project(x, t, (f_ref,))[0][..., 0]
+    return float(amp) if np.ndim(amp) == 0 else amp
 
-    # Normalize templates to unit RMS so amplitude is comparable across durations
-    c /= np.sqrt(np.mean(c * c))
-    s /= np.sqrt(np.mean(s * s))
+def demod_amplitudes(theta_noisy: np.ndarray, plan: DemodPlan, dp: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    IQ demod -> low-pass -> phase -> delta_f -> coherent projection for a
+    (n_realizations, n_samples) stack of noisy theta series, using the
+    precomputed arrays in `plan`.
 
-    a = float(np.mean(x * c))
-    b = float(np.mean(x * s))
-    return math.sqrt(a * a + b * b)
+    Returns (amp_true, amp_false), each of shape (n_realizations,).
+    """
+    delta_f = plan.delta_f(theta_noisy)
+    with profiling.stage("projection"):
+        amps, _ = plan.project(delta_f, (dp["f_target"], dp["f_false"]))
+    return amps[..., 0], amps[..., 1]
+
+def add_noise_batch(
+    theta: np.ndarray,
+    sigma: float,
+    rngs: List[np.random.Generator],
+    out: Optional[np.ndarray] = None,
+    cfg: Optional[SimConfig] = None,
+) -> np.ndarray:
+    """
+    theta + sigma * N(0, 1), one row per generator, written into `out` if
+    given; plus cfg's colored readout noise (systematics.py), if any.
+    """
+    if out is None:
+        out = np.empty((len(rngs), theta.size), dtype=float)
+    for row, rng in zip(out, rngs):
+        rng.standard_normal(out=row)
+    out *= sigma
+    out += theta
+    if cfg is not None:
+        add_colored_noise(out, cfg, rngs)
+    return out
+
+def process_realizations(
+    theta: np.ndarray,
+    n: int,
+    cfg: SimConfig,
+    dp: Dict[str, float],
+    rng: np.random.Generator,
+    plan: Optional[DemodPlan] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    n noise realizations on top of one noise-free trajectory theta.
 
-def process_one_realization(alpha: float, cfg: SimConfig, dp: Dict[str, float], rng: np.random.Generator) -> Tuple[float, float]:
+    Noise is drawn and demodulated in batches of cfg.realization_batch rows;
+    the draw order matches n sequential calls to process_one_realization.
+    """
+    if plan is None:
+        plan = demod_plan_from_config(cfg, dp)
+    amps_true = np.empty(n, dtype=float)
+    amps_false = np.empty(n, dtype=float)
+    batch = max(1, int(cfg.realization_batch))
+    for start in range(0, n, batch):
+        k = min(batch, n - start)
+        # Add measurement noise (discrete samples)
+        with profiling.stage("noise"):
+            theta_noisy = add_readout_noise(theta, cfg, dp, rng, k)
+        amps_true[start:start + k], amps_false[start:start + k] = demod_amplitudes(theta_noisy, plan, dp)
+    return amps_true, amps_false
+
+def process_one_realization(
+    alpha: float,
+    cfg: SimConfig,
+    dp: Dict[str, float],
+    rng: np.random.Generator,
+    plan: Optional[DemodPlan] = None,
+) -> Tuple[float, float]:
     """
     Returns:
       amp_true  - recovered amplitude at f_target (Hz)
       amp_false - recovered amplitude at f_false  (Hz)
     """
-    dt = dp["dt"]
-    t_eval = np.arange(0.0, cfg.duration_s, dt)
-
-    theta = run_theta(alpha, cfg, dp, t_eval)
-
-    # Add measurement noise (discrete samples)
-    theta_noisy = theta + dp["noise_rms_per_sample"] * rng.standard_normal(theta.shape)
+    if plan is None:
+        plan = demod_plan_from_config(cfg, dp)
+    theta = integrate_theta(alpha, cfg, dp, plan.t_eval)
+    amps_true, amps_false = process_realizations(theta, 1, cfg, dp, rng, plan=plan)
+    return float(amps_true[0]), float(amps_false[0])
 
-    # IQ demod at f0
-    cos_ref = np.cos(2.0 * np.pi * dp["f0"] * t_eval)
-    sin_ref = np.sin(2.0 * np.pi * dp["f0"] * t_eval)
-    I = theta_noisy * cos_ref
-    Q = -theta_noisy * sin_ref
 
-    # Low-pass filter to isolate baseband
-    b, a = butter(cfg.lp_order, cfg.lp_cutoff_hz / (cfg.fs_hz / 2.0), btype="low")
-    I_lp = filtfilt(b, a, I)
-    Q_lp = filtfilt(b, a, Q)
+# ----------------------------- Parallel execution -----------------------------
 
-    # Trim to avoid filtfilt edge artifacts + startup transient
-    mask = (t_eval >= cfg.trim_s) & (t_eval <= (cfg.duration_s - cfg.trim_s))
-    t = t_eval[mask]
-    I_lp = I_lp[mask]
-    Q_lp = Q_lp[mask]
-
-    # Phase -> detrend -> delta_f
-    phase = np.unwrap(np.arctan2(Q_lp, I_lp))
-    slope, intercept = np.polyfit(t, phase, 1)
-    phase_dt = phase - (slope * t + intercept)
-    dphase_dt = np.gradient(phase_dt, dt)
-    delta_f = dphase_dt / (2.0 * np.pi)
-
-    amp_true = matched_amp(delta_f, t, dp["f_target"])
-    amp_false = matched_amp(delta_f, t, dp["f_false"])
-    return amp_true, amp_false
+def realization_rng(cfg: SimConfig, alpha_index: int, realization: int) -> np.random.Generator:
+    """
+    Independent noise stream for one (alpha, realization) task, spawned from
+    cfg.seed. alpha_index 0 is the null; sweep alphas start at 1.
+    """
+    return np.random.default_rng(np.random.SeedSequence(cfg.seed, spawn_key=(alpha_index, realization)))
+
+# Per-process state installed by _init_worker (trajectories are shared once
+# per worker instead of being pickled with every task)
+_WORKER: Dict[str, object] = {}
+
+def _init_worker(thetas, cfg: SimConfig, dp: Dict[str, float], plan: DemodPlan) -> None:
+    _WORKER["thetas"] = thetas
+    _WORKER["cfg"] = cfg
+    _WORKER["dp"] = dp
+    _WORKER["plan"] = plan
+    _WORKER["buffer"] = np.empty((max(1, int(cfg.realization_batch)), plan.t_eval.size), dtype=float)
+    if cfg.profile and profiling.active() is None:
+        profiling.enable()
+
+def _realization_batch_task(task: Tuple) -> Tuple[np.ndarray, np.ndarray, Optional[Dict[str, object]]]:
+    """
+    (amps_true, amps_false, captured stage timings or None). A task is
+    (alpha_index, start, k), or (alpha_index, start, k, theta) when the
+    trajectory is shipped with it instead of installed by _init_worker.
+    """
+    alpha_index, start, k = task[:3]
+    theta = task[3] if len(task) > 3 else _WORKER["thetas"][alpha_index]
+    cfg = _WORKER["cfg"]
+    dp = _WORKER["dp"]
+    with profiling.capture() as captured:
+        rngs = [realization_rng(cfg, alpha_index, start + i) for i in range(k)]
+        with profiling.stage("noise"):
+            theta_noisy = add_noise_batch(theta, dp["noise_rms_per_sample"], rngs, out=_WORKER["buffer"][:k], cfg=cfg)
+        amps_true, amps_false = demod_amplitudes(theta_noisy, _WORKER["plan"], dp)
+    return amps_true, amps_false, captured
+
+def run_realization_tasks(
+    thetas,
+    cfg: SimConfig,
+    dp: Dict[str, float],
+    plan: DemodPlan,
+    pool: Optional[ProcessPoolExecutor] = None,
+    n: Optional[int] = None,
+    rows: Optional[Sequence[int]] = None,
+    start: int = 0,
+    checkpoint: Optional[Checkpoint] = None,
+    ship_thetas: bool = False,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Realizations start .. start + n - 1 (n defaults to cfg.n_realizations)
+    for each trajectory thetas[i], i in rows (default: all rows). thetas is
+    a 2-D array or a {alpha_index: theta} mapping; i is also the noise
+    stream's alpha_index. With a checkpoint, finished realizations are
+    loaded instead of recomputed and new ones are recorded as they arrive.
+
+    Tasks are (alpha_index, batch of cfg.realization_batch realizations).
+    Batch composition and noise streams depend only on cfg, never on the
+    number of workers, so the result is bit-identical for any pool size.
+    ship_thetas sends each task's trajectory along with it, for a pool whose
+    workers were initialized before thetas existed (adaptive_sweep.py).
+
+    Returns (amps_true, amps_false), each of shape (len(rows), n).
+    """
+    n = cfg.n_realizations if n is None else int(n)
+    rows = list(range(len(thetas))) if rows is None else [int(i) for i in rows]
+    batch = max(1, int(cfg.realization_batch))
+    amps_true = np.empty((len(rows), n), dtype=float)
+    amps_false = np.empty((len(rows), n), dtype=float)
+    done = np.zeros((len(rows), n), dtype=bool)
+    if checkpoint is not None:
+        for j, i in enumerate(rows):
+            checkpoint.fill(i, start, amps_true[j], amps_false[j], done[j])
+    tasks = [(i, start + s, k) for j, i in enumerate(rows) for s, k in missing_batches(done[j], batch)]
+    if ship_thetas and pool is not None:
+        tasks = [(i, r, k, thetas[i]) for i, r, k in tasks]
+
+    if pool is None:
+        _init_worker(thetas, cfg, dp, plan)
+        results = (_realization_batch_task(task) for task in tasks)
+    else:
+        chunksize = max(1, len(tasks) // (4 * max(1, cfg.workers)))
+        results = pool.map(_realization_batch_task, tasks, chunksize=chunksize)
+
+    out_row = {i: j for j, i in enumerate(rows)}
+    for (i, r, k, *_), (a_true, a_false, captured) in zip(tasks, results):
+        amps_true[out_row[i], r - start:r - start + k] = a_true
+        amps_false[out_row[i], r - start:r - start + k] = a_false
+        profiling.record_batch(i, r, a_true, a_false, captured)
+        if checkpoint is not None:
+            checkpoint.add(i, r, a_true, a_false)
+    if checkpoint is not None:
+        checkpoint.flush()
+    return amps_true, amps_false
+
+
+# ----------------------------- Plots -----------------------------
+
+def save_sweep_plots(rows: List[Dict[str, float]], go_snr_threshold: float, out_dir: str) -> bool:
+    """
+    snr_sweep.png and falsification_ratio.png. matplotlib is optional and
+    imported only here; figures are drawn on the Agg canvas without pyplot,
+    so nothing ever opens a window. Returns False if matplotlib is missing.
+    """
+    try:
+        from matplotlib.figure import Figure
+    except ImportError:
+        return False
+    al = np.array([r["alpha"] for r in rows], dtype=float)
+    for name, y, ref, ylabel, title in (
+        ("snr_sweep.png", "snr_vs_null", go_snr_threshold, "SNR vs null", "AIRM Sensitivity Sweep"),
+        ("falsification_ratio.png", "false_over_true", 0.1, "false/true ratio", "Falsification Check (Lower is better)"),
+    ):
+        fig = Figure()
+        ax = fig.subplots()
+        ax.semilogx(al, np.array([r[y] for r in rows], dtype=float))
+        ax.axhline(ref, linestyle="--")
+        ax.set_xlabel("alpha")
+        ax.set_ylabel(ylabel)
+        ax.set_title(title)
+        ax.grid(True, which="both")
+        fig.tight_layout()
+        fig.savefig(os.path.join(out_dir, name), dpi=160)
+    return True
 
 
 # ----------------------------- Main sweep -----------------------------
 
-def run_sensitivity(cfg: SimConfig) -> Dict[str, object]:
+def run_sensitivity(cfg: SimConfig, run_dir: Optional[str] = None) -> Dict[str, object]:
+    """
+    Null + alpha sweep + GO/NO-GO. Progress is checkpointed into the run
+    directory; passing an existing run_dir resumes (or, with larger
+    realization counts, extends) that run — see checkpoint.py.
+    """
     dp = derived_params(cfg)
 
-    run_id = f"{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}-{cfg.run_tag}"
-    base_dir = os.path.join(os.path.dirname(__file__), "runs", run_id)
+    if run_dir is None:
+        run_id = f"{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}-{cfg.run_tag}"
+        base_dir = os.path.join(os.path.dirname(__file__), "runs", run_id)
+    else:
+        base_dir = os.path.abspath(run_dir)
+        run_id = os.path.basename(base_dir)
     ensure_dir(base_dir)
-
-    rng = np.random.default_rng(0)
-
-    # Alpha grid
-    alphas = np.logspace(np.log10(cfg.alpha_min), np.log10(cfg.alpha_max), cfg.alpha_points)
+    ckpt = Checkpoint(base_dir, cfg)
+    if ckpt.n_records:
+        print(f"[checkpoint] {ckpt.n_records} finished realizations in {base_dir}")
+    if cfg.profile:
+        profiling.enable(trace_path=os.path.join(base_dir, "profile_trace.jsonl"))
+
+    # Alpha grid (adaptive mode picks its own alphas after the null)
+    if cfg.sweep_mode == "grid":
+        alphas = np.logspace(np.log10(cfg.alpha_min), np.log10(cfg.alpha_max), cfg.alpha_points)
+    elif cfg.sweep_mode == "adaptive":
+        alphas = np.empty(0)
+    else:
+        raise ValueError(f"Unknown sweep_mode {cfg.sweep_mode!r} (expected 'grid' or 'adaptive').")
+
+    # Noise-free trajectories: integrated once per alpha (row 0 is the null),
+    # every Monte Carlo realization reuses them
+    plan = demod_plan_from_config(cfg, dp)
+    t_eval = plan.t_eval
+    n_null = cfg.n_null if cfg.n_null > 0 else cfg.n_realizations
+    sweep_rows = range(1, len(alphas) + 1)
+    if cfg.workers > 1:
+        with profiling.section("trajectories"), ProcessPoolExecutor(max_workers=cfg.workers) as pool:
+            thetas = checkpointed_thetas(np.concatenate(([0.0], alphas)), cfg, dp, t_eval, ckpt, pool=pool)
+        initargs = (thetas, cfg, dp, plan)
+        with ProcessPoolExecutor(max_workers=cfg.workers, initializer=_init_worker, initargs=initargs) as pool:
+            with profiling.section("null"):
+                null_true, null_false = run_realization_tasks(thetas, cfg, dp, plan, pool=pool, n=n_null, rows=[0], checkpoint=ckpt)
+            with profiling.section("sweep"):
+                all_true, all_false = run_realization_tasks(thetas, cfg, dp, plan, pool=pool, rows=sweep_rows, checkpoint=ckpt)
+    else:
+        with profiling.section("trajectories"):
+            thetas = checkpointed_thetas(np.concatenate(([0.0], alphas)), cfg, dp, t_eval, ckpt)
+        with profiling.section("null"):
+            null_true, null_false = run_realization_tasks(thetas, cfg, dp, plan, n=n_null, rows=[0], checkpoint=ckpt)
+        with profiling.section("sweep"):
+            all_true, all_false = run_realization_tasks(thetas, cfg, dp, plan, rows=sweep_rows, checkpoint=ckpt)
 
     # Null distribution (alpha=0)
-    null_true = []
-    null_false = []
-    for _ in range(cfg.n_realizations):
-        a_true, a_false = process_one_realization(0.0, cfg, dp, rng)
-        null_true.append(a_true)
-        null_false.append(a_false)
-
-    null_true = np.array(null_true, dtype=float)
+    null_true, null_false = null_true[0], null_false[0]
     null_mu = float(np.mean(null_true))
     null_sigma = float(np.std(null_true, ddof=1)) if len(null_true) > 1 else float(np.std(null_true))
 
     # Sweep
-    rows = []
-    for alpha in alphas:
-        amps_true = []
-        amps_false = []
-        for _ in range(cfg.n_realizations):
-            a_true, a_false = process_one_realization(float(alpha), cfg, dp, rng)
-            amps_true.append(a_true)
-            amps_false.append(a_false)
-
-        amps_true = np.array(amps_true, dtype=float)
-        amps_false = np.array(amps_false, dtype=float)
+    sweep = list(zip(alphas, all_true, all_false))
+    adaptive = None
+    if cfg.sweep_mode == "adaptive":
+        from adaptive_sweep import adaptive_threshold_search
+        with profiling.section("adaptive"):
+            search = adaptive_threshold_search(cfg, dp, plan, null_mu, null_sigma, GO_SNR_THRESHOLD, checkpoint=ckpt)
+        sweep, adaptive = search["points"], search["summary"]
 
+    rows = []
+    for alpha, amps_true, amps_false in sweep:
         mean_true = float(np.mean(amps_true))
         std_true = float(np.std(amps_true, ddof=1)) if len(amps_true) > 1 else float(np.std(amps_true))
 
@@ -264,20 +594,30 @@ def run_sensitivity(cfg: SimConfig) -> Dict[str, object]:
         )
 
     # Decide GO/NO-GO at target alpha (default: compare last point)
-    go_snr_threshold = 10.0
+    go_snr_threshold = GO_SNR_THRESHOLD
     best = max(rows, key=lambda r: r["snr_vs_null"])
     go = bool(best["snr_vs_null"] >= go_snr_threshold)
 
+    # Null tail: single-realization false-alarm probability at the GO
+    # amplitude and at the best alpha's mean amplitude
+    null_tail = tail_stats(null_true, thresholds={
+        "go_threshold": null_mu + go_snr_threshold * null_sigma,
+        "best_alpha_mean": best["mean_amp_true_hz"],
+    })
+    save_null_distribution(os.path.join(base_dir, "null_distribution.npz"), null_true, null_false, seed=cfg.seed)
+
     # Save outputs
     meta = {
         "run_id": run_id,
         "timestamp_utc": datetime.utcnow().isoformat() + "Z",
         "config": asdict(cfg),
+        "config_hash": ckpt.config_hash,
         "derived": dp,
         "null": {
             "null_mu_hz": null_mu,
             "null_sigma_hz": null_sigma,
-            "n": int(cfg.n_realizations),
+            "n": int(n_null),
+            "tail": null_tail,
         },
         "decision": {
             "go_threshold_snr": go_snr_threshold,
@@ -285,8 +625,19 @@ def run_sensitivity(cfg: SimConfig) -> Dict[str, object]:
             "best_snr_vs_null": best["snr_vs_null"],
             "go": go,
         },
+        "resources": {
+            "demod_plan_mb": plan.nbytes / 2**20,
+            **peak_rss_mb(),
+        },
     }
 
+    if adaptive is not None:
+        meta["adaptive"] = adaptive
+        meta["decision"]["alpha_threshold"] = adaptive["alpha_threshold"]
+        meta["decision"]["alpha_threshold_sigma"] = adaptive["alpha_threshold_sigma"]
+    if cfg.profile:
+        meta["profile"] = profiling.disable().summary()
+
     with open(os.path.join(base_dir, "run_meta.json"), "w", encoding="utf-8") as f:
         json.dump(meta, f, indent=2)
 
@@ -299,32 +650,10 @@ def run_sensitivity(cfg: SimConfig) -> Dict[str, object]:
                 f"{r['alpha']:.16e},{r['mean_amp_true_hz']:.16e},{r['std_amp_true_hz']:.16e},"
                 f"{r['mean_amp_false_hz']:.16e},{r['false_over_true']:.16e},{r['snr_vs_null']:.16e}\n"
             )
+    # Trajectories are only needed to resume an unfinished run
+    ckpt.discard_thetas()
 
-    # Plot (optional)
-    if HAS_MPL:
-        al = np.array([r["alpha"] for r in rows], dtype=float)
-        snr = np.array([r["snr_vs_null"] for r in rows], dtype=float)
-        ftr = np.array([r["false_over_true"] for r in rows], dtype=float)
-
-        plt.figure()
-        plt.semilogx(al, snr)
-        plt.axhline(go_snr_threshold, linestyle="--")
-        plt.xlabel("alpha")
-        plt.ylabel("SNR vs null")
-        plt.title("AIRM Sensitivity Sweep")
-        plt.grid(True, which="both")
-        plt.tight_layout()
-        plt.savefig(os.path.join(base_dir, "snr_sweep.png"), dpi=160)
-
-        plt.figure()
-        plt.semilogx(al, ftr)
-        plt.axhline(0.1, linestyle="--")
-        plt.xlabel("alpha")
-        plt.ylabel("false/true ratio")
-        plt.title("Falsification Check (Lower is better)")
-        plt.grid(True, which="both")
-        plt.tight_layout()
-        plt.savefig(os.path.join(base_dir, "falsification_ratio.png"), dpi=160)
+    save_sweep_plots(rows, go_snr_threshold, base_dir)
 
     # Final printout
     print("\n--- SUMMARY ---")
@@ -332,8 +661,20 @@ def run_sensitivity(cfg: SimConfig) -> Dict[str, object]:
     print(f"f0={dp['f0']:.6f} Hz | fs={cfg.fs_hz:.3f} Hz | dt={dp['dt']:.3f} s")
     print(f"noise_asd={cfg.noise_asd_rad_sqrt_hz:.2e} rad/sqrt(Hz)")
     print(f"noise_rms_per_sample={dp['noise_rms_per_sample']:.2e} rad")
-    print(f"null_mu={null_mu:.3e} Hz | null_sigma={null_sigma:.3e} Hz")
+    print(f"null_mu={null_mu:.3e} Hz | null_sigma={null_sigma:.3e} Hz (n={n_null})")
+    p_go = null_tail["p_values"]["go_threshold"]
+    print(f"null tail @ GO threshold: p_empirical={p_go['empirical']:.2e} | p_rayleigh={p_go['rayleigh']:.2e}")
+    if "peak_rss_mb" in meta["resources"]:
+        print(f"peak_rss={meta['resources']['peak_rss_mb']:.1f} MiB | demod_plan={meta['resources']['demod_plan_mb']:.1f} MiB")
     print(f"BEST: alpha={best['alpha']:.2e} | SNR_vs_null={best['snr_vs_null']:.2f} | false/true={best['false_over_true']:.3f}")
+    if adaptive is not None:
+        if adaptive["alpha_threshold"] is not None:
+            print(
+                f"GO threshold: alpha={adaptive['alpha_threshold']:.3e} +/- {adaptive['alpha_threshold_sigma']:.1e} "
+                f"({adaptive['status']}, {adaptive['n_realizations_total']} realizations)"
+            )
+        else:
+            print(f"GO threshold: {adaptive['status']}")
     print("DECISION:", "GO" if go else "NO-GO")
     print(f"outputs: {base_dir}")
 
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+AIRM Solver Backends — solvers.py
+---------------------------------
+Registry of the solve_ivp backends behind SimConfig.solver = "solve_ivp",
+selected by SimConfig.ivp_method with tolerances ivp_rtol / ivp_atol:
+
+    RK45    explicit Runge-Kutta 5(4) (the historical default)
+    DOP853  explicit Runge-Kutta 8(5,3): far fewer steps at tight tolerances
+    LSODA   Adams / BDF switching, analytic Jacobian
+    Radau   implicit Runge-Kutta (Radau IIA, order 5), analytic Jacobian
+
+The Jacobian of airm_eom is analytic (sensitivity_analysis.airm_jacobian):
+
+    d theta_ddot / d theta     = -kappa / m(t)
+    d theta_ddot / d theta_dot = -gamma / m(t),    m(t) = I0 * (1 + eps(t))
+
+so the implicit methods never fall back to finite differences.
+
+SimConfig.jit_rhs compiles the right-hand side with numba when it is
+installed; without numba (and by default, or with kappa(t) systematics)
+airm_eom itself is the RHS.
+numba stays an optional dependency; backend_report() records whether the
+JIT was active.
+
+Every solve_ivp trajectory (integrate_theta / run_theta, the signal and
+null runs of the full analysis, out-of-core segments) goes through
+integrate_ivp, so one configuration sets the method and tolerances of all
+of them.
+
+    python solvers.py [--duration-h 6] [--alpha 1e-10]
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+import profiling
+from systematics import stiffness_enabled
+
+try:
+    import numba
+except ImportError:  # optional: jit_rhs falls back to airm_eom
+    numba = None
+
+
+@dataclass(frozen=True)
+class IVPBackend:
+    method: str       # scipy.integrate.solve_ivp method
+    jacobian: bool    # pass the analytic Jacobian
+    description: str
+
+
+IVP_BACKENDS: Dict[str, IVPBackend] = {
+    "RK45": IVPBackend("RK45", False, "explicit Runge-Kutta 5(4)"),
+    "DOP853": IVPBackend("DOP853", False, "explicit Runge-Kutta 8(5,3)"),
+    "LSODA": IVPBackend("LSODA", True, "Adams/BDF switching, analytic Jacobian"),
+    "Radau": IVPBackend("Radau", True, "implicit Runge-Kutta (Radau IIA), analytic Jacobian"),
+}
+
+_JIT_RHS: Optional[Callable] = None
+
+
+def backend(name: str) -> IVPBackend:
+    if name not in IVP_BACKENDS:
+        raise ValueError(f"Unknown ivp_method '{name}' (expected one of {', '.join(IVP_BACKENDS)}).")
+    return IVP_BACKENDS[name]
+
+
+def _jit_rhs() -> Callable:
+    """numba-compiled airm_eom (same arithmetic), compiled on first use."""
+    global _JIT_RHS
+    if _JIT_RHS is None:
+        @numba.njit(cache=True)
+        def rhs(t, y, alpha, w_mod, phi, w_drive, drive, gamma, kappa, I0):
+            out = np.empty(2)
+            eps = alpha * math.cos(w_mod * t + phi)
+            tau = drive * math.sin(w_drive * t) if drive != 0.0 else 0.0
+            out[0] = y[1]
+            out[1] = (tau - gamma * y[1] - kappa * y[0]) / (I0 * (1.0 + eps))
+            return out
+
+        _JIT_RHS = rhs
+    return _JIT_RHS
+
+
+def rhs_functions(
+    alpha: float,
+    cfg,
+    dp: Dict[str, float],
+    drive_torque: float = 0.0,
+) -> Tuple[Callable, Callable, bool]:
+    """(fun(t, y), jac(t, y), jit_active) for solve_ivp."""
+    from sensitivity_analysis import airm_eom, airm_jacobian
+
+    def jac(t, y):
+        return airm_jacobian(t, y, alpha, cfg, dp)
+
+    if cfg.jit_rhs and numba is not None and not stiffness_enabled(cfg):
+        rhs = _jit_rhs()
+        args = (
+            float(alpha), 2.0 * math.pi * dp["f_target"], float(cfg.phi), 2.0 * math.pi * dp["f0"],
+            float(drive_torque), dp["gamma"], float(cfg.kappa), float(cfg.I0),
+        )
+        return (lambda t, y: rhs(t, y, *args)), jac, True
+    return (lambda t, y: airm_eom(t, y, alpha, cfg, dp, drive_torque)), jac, False
+
+
+def integrate_ivp(
+    alpha: float,
+    cfg,
+    dp: Dict[str, float],
+    t_eval: np.ndarray,
+    y0: Optional[Sequence[float]] = None,
+    t_span: Optional[Tuple[float, float]] = None,
+    drive_torque: float = 0.0,
+    rtol: Optional[float] = None,
+    atol: Optional[float] = None,
+):
+    """
+    solve_ivp result (both state components on t_eval) for the configured
+    backend. t_span defaults to [0, duration_s], y0 to (theta0, theta_dot0),
+    rtol / atol to cfg.ivp_rtol / cfg.ivp_atol.
+    """
+    b = backend(cfg.ivp_method)
+    fun, jac, _ = rhs_functions(alpha, cfg, dp, drive_torque)
+    sol = solve_ivp(
+        fun,
+        [0.0, cfg.duration_s] if t_span is None else [float(t_span[0]), float(t_span[1])],
+        [cfg.theta0_rad, cfg.theta_dot0] if y0 is None else [float(y0[0]), float(y0[1])],
+        t_eval=t_eval,
+        method=b.method,
+        rtol=cfg.ivp_rtol if rtol is None else rtol,
+        atol=cfg.ivp_atol if atol is None else atol,
+        **({"jac": jac} if b.jacobian else {}),
+    )
+    if not sol.success:
+        raise RuntimeError(f"solve_ivp ({b.method}) failed: {sol.message}")
+    profiling.count("rhs_evals", sol.nfev)
+    if sol.njev:
+        profiling.count("jac_evals", sol.njev)
+    return sol
+
+
+# ----------------------------- Report -----------------------------
+
+def backend_report(
+    cfg,
+    alpha: float = 1.0e-10,
+    methods: Sequence[str] = tuple(IVP_BACKENDS),
+) -> Dict[str, object]:
+    """
+    RHS / Jacobian evaluations, wall time and error of every backend at the
+    configured tolerances (with and without the JIT RHS when numba is
+    installed), against the exact-discretization stepper.
+
+    Phase error: max |arg(z * conj(z_ref))| with z = theta - i*theta_dot/omega0,
+    the instantaneous carrier phase; amplitude error: max |theta - theta_ref|
+    relative to max |theta_ref|.
+    """
+    from exact_stepper import run_state_exact_params
+    from sensitivity_analysis import derived_params
+
+    dp = derived_params(cfg)
+    t_eval = np.arange(0.0, cfg.duration_s, dp["dt"])
+    w0 = 2.0 * math.pi * dp["f0"]
+    y0 = (cfg.theta0_rad, cfg.theta_dot0)
+
+    t_start = time.perf_counter()
+    theta_ref, dot_ref = run_state_exact_params(t_eval, alpha, dp["f_target"], cfg.phi, cfg.I0, cfg.kappa, dp["gamma"], y0)
+    wall_ref = time.perf_counter() - t_start
+    z_ref = theta_ref - 1j * dot_ref / w0
+    scale = float(np.max(np.abs(theta_ref)))
+
+    rows = []
+    for name in methods:
+        for jit in (False, True) if numba is not None else (False,):
+            run_cfg = replace(cfg, ivp_method=name, jit_rhs=jit)
+            if jit:
+                integrate_ivp(alpha, run_cfg, dp, t_eval[:2])  # compile outside the timing
+            t_start = time.perf_counter()
+            sol = integrate_ivp(alpha, run_cfg, dp, t_eval)
+            wall = time.perf_counter() - t_start
+            z = sol.y[0] - 1j * sol.y[1] / w0
+            rows.append({
+                "backend": name,
+                "jit": jit,
+                "nfev": int(sol.nfev),
+                "njev": int(sol.njev),
+                "wall_s": wall,
+                "max_phase_err_rad": float(np.max(np.abs(np.angle(z * np.conj(z_ref))))),
+                "max_rel_err": float(np.max(np.abs(sol.y[0] - theta_ref)) / scale),
+            })
+    return {
+        "alpha": float(alpha),
+        "duration_s": float(cfg.duration_s),
+        "rtol": float(cfg.ivp_rtol),
+        "atol": float(cfg.ivp_atol),
+        "numba": numba is not None,
+        "reference": {"backend": "exact", "wall_s": wall_ref},
+        "rows": rows,
+    }
+
+
+def print_backend_report(report: Dict[str, object]) -> None:
+    print("\n=== SOLVER BACKENDS ===")
+    print(
+        f"alpha={report['alpha']:.1e} | T={report['duration_s'] / 3600.0:.1f} h | "
+        f"rtol={report['rtol']:.0e} atol={report['atol']:.0e} | numba={'yes' if report['numba'] else 'no (NumPy RHS)'}"
+    )
+    print(f"{'backend':>8s} {'jit':>4s} {'nfev':>9s} {'njev':>6s} {'wall [s]':>9s} {'phase err [rad]':>16s} {'rel err':>9s}")
+    for r in report["rows"]:
+        print(
+            f"{r['backend']:>8s} {'yes' if r['jit'] else 'no':>4s} {r['nfev']:9d} {r['njev']:6d} "
+            f"{r['wall_s']:9.2f} {r['max_phase_err_rad']:16.2e} {r['max_rel_err']:9.2e}"
+        )
+    print(f"{'exact':>8s} {'':>4s} {'-':>9s} {'-':>6s} {report['reference']['wall_s']:9.2f} {'(reference)':>16s}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from sensitivity_analysis import SimConfig
+
+    ap = argparse.ArgumentParser(description="Accuracy / cost of the solve_ivp backends vs the exact stepper.")
+    ap.add_argument("--duration-h", type=float, default=6.0)
+    ap.add_argument("--alpha", type=float, default=1.0e-10)
+    args = ap.parse_args()
+    print_backend_report(backend_report(SimConfig(duration_s=args.duration_h * 3600.0), alpha=args.alpha))
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+AIRM Systematics Injection — systematics.py
+-------------------------------------------
+Simulated versions of the couplings in Docs/Systematics.md, all off by
+default (SimConfig fields, zero = disabled):
+
+Readout noise on top of the white ASD (per realization, FFT synthesis):
+
+    flicker_asd_1hz       S(f) = A^2 * (1 Hz / f)      optical lever / electronics 1/f
+    random_walk_asd_1hz   S(f) = A^2 * (1 Hz / f)^2    equilibrium random walk (fiber creep)
+
+Stiffness inside the EOM (per trajectory, i.e. once per alpha):
+
+    kappa(t) = kappa * (1 + kappa_thermal_frac * sin(2*pi*t / SOLAR_DAY_S)
+                          + kappa_creep_per_day * t / SOLAR_DAY_S
+                          + sum_k (spin_line_frac / k) * cos(2*pi*k*f_spin*t)),  k = 1 .. spin_line_harmonics
+
+The thermal and creep terms are the slow temperature / fiber drifts; the
+spin lines are narrowband disturbances (e.g. magnetic coupling of the
+rotating spinner) that put delta_f lines at k * f_spin, next to f_target.
+
+Colored noise is synthesized per row as the inverse real FFT of complex
+Gaussian bins scaled by sqrt(S(f_k) * fs * n / 4) (DC bin zero), which
+gives a one-sided periodogram expectation S(f_k) on the rfft grid. The
+scaling vector is cached per (n, fs, amplitudes); the draws come from each
+row's own generator after its white noise, and the inverse FFT runs over
+the whole batch at once. Memory is ~3x the (realization_batch, n) noise
+buffer the white-noise path already holds, for any record length.
+
+With every field at zero the draws, trajectories and config hashes are
+exactly those of the white-noise-only code.
+
+    python systematics.py     # PSD slopes of the synthesized noise + delta_f lines at k*f_spin
+"""
+
+from __future__ import annotations
+
+import math
+from functools import lru_cache
+from typing import Sequence, Union
+
+import numpy as np
+
+SOLAR_DAY_S = 86400.0
+
+
+def colored_noise_enabled(cfg) -> bool:
+    return bool(cfg.flicker_asd_1hz or cfg.random_walk_asd_1hz)
+
+
+def stiffness_enabled(cfg) -> bool:
+    return bool(cfg.kappa_thermal_frac or cfg.kappa_creep_per_day or cfg.spin_line_frac)
+
+
+def require_constant_stiffness(cfg, where: str) -> None:
+    if stiffness_enabled(cfg):
+        raise ValueError(f"{where} assumes a constant kappa; use solver 'solve_ivp' or 'rk4_ensemble' with kappa systematics.")
+
+
+def require_white_noise(cfg, where: str) -> None:
+    if colored_noise_enabled(cfg):
+        raise ValueError(f"{where} draws noise in segments; colored readout noise needs the whole series (in-memory path).")
+
+
+# ----------------------------- Stiffness -----------------------------
+
+def kappa_factor(t: Union[float, np.ndarray], cfg) -> Union[float, np.ndarray]:
+    """kappa(t) / kappa; t may be a float (EOM right-hand side) or an array."""
+    trig = np if isinstance(t, np.ndarray) else math
+    day = t / SOLAR_DAY_S
+    out = 1.0 + cfg.kappa_thermal_frac * trig.sin(2.0 * math.pi * day) + cfg.kappa_creep_per_day * day
+    if cfg.spin_line_frac:
+        for k in range(1, int(cfg.spin_line_harmonics) + 1):
+            out = out + (cfg.spin_line_frac / k) * trig.cos(2.0 * math.pi * k * cfg.f_spin * t)
+    return out
+
+
+# ----------------------------- Colored noise -----------------------------
+
+def colored_psd(f: np.ndarray, flicker_asd_1hz: float, random_walk_asd_1hz: float) -> np.ndarray:
+    """One-sided PSD [rad^2/Hz] of the colored readout terms (f > 0)."""
+    f = np.asarray(f, dtype=float)
+    return flicker_asd_1hz ** 2 / f + random_walk_asd_1hz ** 2 / (f * f)
+
+
+@lru_cache(maxsize=8)
+def _bin_scale(n: int, fs_hz: float, flicker_asd_1hz: float, random_walk_asd_1hz: float) -> np.ndarray:
+    f = np.fft.rfftfreq(n, d=1.0 / fs_hz)
+    scale = np.zeros(f.size)
+    scale[1:] = np.sqrt(colored_psd(f[1:], flicker_asd_1hz, random_walk_asd_1hz) * fs_hz * n / 4.0)
+    if n % 2 == 0:
+        scale[-1] *= math.sqrt(2.0)  # Nyquist bin is real: its imaginary draw is discarded
+    return scale
+
+
+def add_colored_noise(x: np.ndarray, cfg, rngs: Sequence[np.random.Generator]) -> np.ndarray:
+    """
+    x (rows, n) += flicker + random-walk readout noise in place, row i drawn
+    from rngs[i] (the same generator may serve several rows). 1-D x is one row.
+    """
+    if not colored_noise_enabled(cfg):
+        return x
+    rows = x.reshape(-1, x.shape[-1])
+    n = rows.shape[1]
+    scale = _bin_scale(n, float(cfg.fs_hz), float(cfg.flicker_asd_1hz), float(cfg.random_walk_asd_1hz))
+    spec = np.empty((rows.shape[0], scale.size), dtype=complex)
+    for row, rng in zip(spec, rngs):
+        z = rng.standard_normal((2, scale.size))
+        row.real = z[0]
+        row.imag = z[1]
+    spec *= scale
+    rows += np.fft.irfft(spec, n=n, axis=-1)
+    return x
+
+
+def add_readout_noise(theta: np.ndarray, cfg, dp, rng: np.random.Generator, k: int = 0) -> np.ndarray:
+    """
+    theta + white readout noise (+ colored terms): k stacked realizations
+    of shape (k, n), or one series of theta's shape for k = 0. The white
+    draws are those of the plain `theta + sigma * rng.standard_normal(...)`.
+    """
+    shape = (k, theta.size) if k else theta.shape
+    out = theta + dp["noise_rms_per_sample"] * rng.standard_normal(shape)
+    return add_colored_noise(out, cfg, [rng] * (k or 1))
+
+
+# ----------------------------- Validation -----------------------------
+
+if __name__ == "__main__":
+    import time
+    from dataclasses import replace
+
+    from scipy.signal import welch
+
+    from demod_plan import demod_plan_from_config
+    from sensitivity_analysis import SimConfig, derived_params, integrate_theta, process_realizations
+
+    cfg = SimConfig(
+        duration_s=48.0 * 3600.0,
+        flicker_asd_1hz=1.0e-9,
+        random_walk_asd_1hz=1.0e-11,
+        realization_batch=8,
+    )
+    dp = derived_params(cfg)
+    n = int(round(cfg.duration_s * cfg.fs_hz))
+    rng = np.random.default_rng(0)
+
+    print("\n=== COLORED READOUT NOISE ===")
+    for name, fl, rw, slope in (("flicker", 1.0e-9, 0.0, -1.0), ("random walk", 0.0, 1.0e-11, -2.0)):
+        x = np.zeros((8, n))
+        add_colored_noise(x, replace(cfg, flicker_asd_1hz=fl, random_walk_asd_1hz=rw), [rng] * 8)
+        f, pxx = welch(x, fs=cfg.fs_hz, nperseg=2**16)
+        band = (f > 1.0e-3) & (f < 1.0e-1)
+        fit = np.polyfit(np.log10(f[band]), np.log10(pxx.mean(axis=0)[band]), 1)[0]
+        ratio = np.median(pxx.mean(axis=0)[band] / colored_psd(f[band], fl, rw))
+        print(f"{name:12s}: PSD slope {fit:+.2f} (expected {slope:+.0f}) | Welch / model = {ratio:.3f}")
+
+    base = replace(cfg, flicker_asd_1hz=0.0, random_walk_asd_1hz=0.0)
+    plan = demod_plan_from_config(base, dp)
+    theta = integrate_theta(0.0, base, dp, plan.t_eval)
+    for label, run_cfg in (("white only", base), ("white + colored", cfg)):
+        t_start = time.perf_counter()
+        process_realizations(theta, 32, run_cfg, dp, np.random.default_rng(1), plan=plan)
+        print(f"{label:16s}: 32 realizations x {n} samples in {time.perf_counter() - t_start:.2f} s")
+
+    print("\n=== STIFFNESS LINES AT k * f_spin ===")
+    line_cfg = replace(base, spin_line_frac=1.0e-7, kappa_thermal_frac=1.0e-5, noise_asd_rad_sqrt_hz=1.0e-11)
+    theta = integrate_theta(0.0, line_cfg, dp, plan.t_eval)
+    delta_f = plan.delta_f(theta[None, :])
+    freqs = (line_cfg.f_spin, 2.0 * line_cfg.f_spin, dp["f_target"], dp["f_false"])
+    amps = plan.project(delta_f, freqs)[0][0]
+    expected = dp["f0"] * line_cfg.spin_line_frac / 2.0 / math.sqrt(2.0)
+    for f_ref, amp in zip(("f_spin", "2 f_spin", "f_target", "f_false"), amps):
+        print(f"A({f_ref:8s}) = {amp:.3e} Hz")
+    print(f"expected at f_spin ~ f0 * frac / 2 / sqrt(2) = {expected:.3e} Hz (unit-RMS template)")